@@ -1,3 +1,6 @@
+-- Report views over the levelupapi tables. Written in standard SQL, so
+-- they can be created on SQLite and PostgreSQL alike.
+
 CREATE VIEW GAMES_BY_USER AS
 SELECT
     g.*,
@@ -11,9 +14,9 @@ JOIN
 ;
 
 CREATE VIEW EVENTS_BY_USER AS
-SELECT event.id, game.title as game_name, event.description, event.date, event.time, organizer.id as gamer_id, organizer.first_name || " " || organizer.last_name as full_name 
+SELECT event.id, game.title as game_name, event.description, event.date, event.time, gamer.id as gamer_id, organizer.first_name || ' ' || organizer.last_name as full_name
 FROM levelupapi_event as event
 JOIN levelupapi_game as game on game.id = event.game_id
 JOIN levelupapi_gamer as gamer on gamer.id = event.organizer_id
 JOIN auth_user as organizer on organizer.id = gamer.user_id
-;
\ No newline at end of file
+;
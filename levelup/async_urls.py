@@ -0,0 +1,10 @@
+"""levelup URL Configuration with the async read views in front
+
+ROOT_URLCONF points here instead of levelup.urls when ASYNC_READ_VIEWS is
+on. GET requests for the events, games and game types lists are served by
+levelupapi.views.async_views; everything else is routed as in levelup.urls.
+"""
+from levelup.urls import urlpatterns as api_urlpatterns
+from levelupapi.views.async_views import urlpatterns as async_read_urlpatterns
+
+urlpatterns = async_read_urlpatterns + api_urlpatterns
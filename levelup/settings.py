@@ -18,6 +18,10 @@ from pathlib import Path
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 
+def env_flag(name, default=False):
+    return os.environ.get(name, str(default)).lower() in ('1', 'true', 'yes', 'on')
+
+
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/4.0/howto/deployment/checklist/
 
@@ -48,13 +52,44 @@ INSTALLED_APPS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.TokenAuthentication',
+        'levelupapi.authentication.GamerTokenAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # JSON goes through orjson when it is installed and the json module
+    # when it is not; the output is the same either way
+    'DEFAULT_RENDERER_CLASSES': [
+        'levelupapi.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'levelupapi.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
+# Default number of rows per page for the paginated list endpoints. Clients
+# can ask for a different size with `?page_size=`, up to API_MAX_PAGE_SIZE
+API_PAGE_SIZE = int(os.environ.get('API_PAGE_SIZE', 50))
+API_MAX_PAGE_SIZE = int(os.environ.get('API_MAX_PAGE_SIZE', 500))
+
+# How many authenticated tokens each process remembers, and for how many
+# seconds, before looking them up in the database again
+TOKEN_CACHE_SIZE = int(os.environ.get('TOKEN_CACHE_SIZE', 1024))
+TOKEN_CACHE_TTL = int(os.environ.get('TOKEN_CACHE_TTL', 300))
+
+# How many word starts of game titles and makers each process keeps for
+# /games/suggest, at roughly 100 bytes each
+SUGGEST_INDEX_SIZE = int(os.environ.get('SUGGEST_INDEX_SIZE', 200000))
+
+# Responses smaller than this many bytes are not compressed, and the
+# compression levels used for gzip (1-9) and, with `brotli` installed, brotli (0-11)
+COMPRESSION_MIN_LENGTH = int(os.environ.get('COMPRESSION_MIN_LENGTH', 1024))
+COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', 6))
+COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', 5))
+
 CORS_ORIGIN_WHITELIST = (
     'http://localhost:3000',
     'http://127.0.0.1:3000'
@@ -62,6 +97,7 @@ CORS_ORIGIN_WHITELIST = (
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'levelupapi.compression.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -71,7 +107,14 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-ROOT_URLCONF = 'levelup.urls'
+# With ASYNC_READ_VIEWS=true the events, games and game types lists are
+# served by async views (levelupapi.views.async_views) that read with the
+# async ORM. Run under an ASGI server (levelup.asgi) to benefit from them.
+# Django's ASGI handler buffers the streamed report exports in memory, so
+# large exports are better served by a WSGI server.
+ASYNC_READ_VIEWS = env_flag('ASYNC_READ_VIEWS')
+
+ROOT_URLCONF = 'levelup.async_urls' if ASYNC_READ_VIEWS else 'levelup.urls'
 
 TEMPLATES = [
     {
@@ -94,14 +137,110 @@ WSGI_APPLICATION = 'levelup.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/4.0/ref/settings/#databases
-
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+#
+# SQLite in db.sqlite3 unless DB_ENGINE says otherwise. For production use
+# PostgreSQL (`pip install "psycopg[binary,pool]"`):
+# DB_ENGINE=django.db.backends.postgresql
+# DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT
+#
+# DB_CONN_MAX_AGE keeps each process's connection open for that many
+# seconds instead of opening one per request ('none' keeps it for good),
+# and DB_CONN_HEALTH_CHECKS=true checks a kept connection still works
+# before reusing it. DB_POOL=true uses psycopg's connection pool instead,
+# holding DB_POOL_MIN_SIZE to DB_POOL_MAX_SIZE connections per process.
+
+DB_ENGINE = os.environ.get('DB_ENGINE', 'django.db.backends.sqlite3')
+
+if DB_ENGINE == 'django.db.backends.sqlite3':
+    DATABASES = {
+        'default': {
+            'ENGINE': DB_ENGINE,
+            'NAME': os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': {
+                # Writers take turns on the database file; wait for it
+                # rather than failing with "database is locked"
+                'timeout': int(os.environ.get('DB_SQLITE_TIMEOUT', 20)),
+            },
+        }
     }
+else:
+    DB_CONN_MAX_AGE = os.environ.get('DB_CONN_MAX_AGE', '60')
+    DATABASES = {
+        'default': {
+            'ENGINE': DB_ENGINE,
+            'NAME': os.environ.get('DB_NAME', 'levelup'),
+            'USER': os.environ.get('DB_USER', ''),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', ''),
+            'PORT': os.environ.get('DB_PORT', ''),
+            'CONN_MAX_AGE': None if DB_CONN_MAX_AGE.lower() == 'none' else int(DB_CONN_MAX_AGE),
+            'CONN_HEALTH_CHECKS': env_flag('DB_CONN_HEALTH_CHECKS', True),
+            'OPTIONS': {},
+        }
+    }
+    if env_flag('DB_POOL'):
+        # The pool hands connections out and takes them back itself, so
+        # Django must not keep them open as well
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+        }
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.0/topics/cache/
+#
+# The collection version stamps behind the API's ETags are kept here, so
+# run more than one server process only with a shared backend, e.g.
+# CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+# CACHE_LOCATION=redis://127.0.0.1:6379
+# Set WEB_CONCURRENCY to the number of server processes (gunicorn and
+# uvicorn read it for their worker count too); with more than one, the
+# server refuses to start on a local memory backend.
+#
+# Serialized API responses are kept in their own cache so they cannot push
+# the version stamps out. It can use any backend, e.g.
+# RESPONSE_CACHE_BACKEND=django.core.cache.backends.filebased.FileBasedCache
+# RESPONSE_CACHE_LOCATION=/var/tmp/levelup_responses
+#
+# The pieces the gamers' calendar feeds are put together from are kept in
+# a third cache, configured the same way with CALENDAR_CACHE_*. It has to
+# be shared between processes as well.
+
+WEB_CONCURRENCY = int(os.environ.get('WEB_CONCURRENCY', 1))
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'levelup'),
+    },
+    'responses': {
+        'BACKEND': os.environ.get(
+            'RESPONSE_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.environ.get('RESPONSE_CACHE_LOCATION', 'levelup-responses'),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 1000)),
+        },
+    },
+    'calendars': {
+        'BACKEND': os.environ.get(
+            'CALENDAR_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.environ.get('CALENDAR_CACHE_LOCATION', 'levelup-calendars'),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('CALENDAR_CACHE_MAX_ENTRIES', 10000)),
+        },
+    },
 }
 
+RESPONSE_CACHE_ALIAS = 'responses'
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get('RESPONSE_CACHE_TIMEOUT', 300))
+
+CALENDAR_CACHE_ALIAS = 'calendars'
+CALENDAR_CACHE_TIMEOUT = int(os.environ.get('CALENDAR_CACHE_TIMEOUT', 86400))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class LevelupapiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'levelupapi'
+
+    def ready(self):
+        # Connect the handlers that keep the stored counters up to date
+        from levelupapi import signals  # pylint: disable=unused-import,import-outside-toplevel
+        from levelupapi.caching import require_shared_caches  # pylint: disable=import-outside-toplevel
+        require_shared_caches()
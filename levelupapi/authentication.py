@@ -0,0 +1,106 @@
+"""Authentication classes for the Level Up API"""
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+
+from levelupapi.caching import LRUCache
+
+# Recently seen token keys mapped to their (user, token), with the user's
+# gamer already loaded on to the user. Entries are dropped by the handlers
+# in levelupapi.signals when the token, user or gamer changes, and expire
+# after TOKEN_CACHE_TTL seconds so other processes pick up changes they
+# were not signalled about.
+token_cache = LRUCache(
+    maxsize=settings.TOKEN_CACHE_SIZE,
+    ttl=settings.TOKEN_CACHE_TTL,
+)
+
+
+class GamerTokenAuthentication(TokenAuthentication):
+    """Token authentication that also resolves the gamer behind the token
+
+    The token, its user and the user's gamer profile are loaded with a
+    single joined query, and the gamer is attached to the request as
+    `request.gamer` so views do not have to look it up again. Users
+    without a gamer profile (site admins) get `request.gamer = None`.
+
+    Resolved tokens are kept in `token_cache`, so a client that calls
+    the API repeatedly is authenticated without touching the database.
+
+    `aauthenticate` does the same for the async views, which are plain
+    Django views outside of DRF.
+    """
+
+    def authenticate(self, request):
+        key = self.get_key(request)
+        if key is None:
+            return None
+        credentials = self.authenticate_credentials(key)
+        request.gamer = self.get_gamer(credentials[0])
+        return credentials
+
+    async def aauthenticate(self, request):
+        key = self.get_key(request)
+        if key is None:
+            return None
+        credentials = await self.aauthenticate_credentials(key)
+        request.gamer = self.get_gamer(credentials[0])
+        return credentials
+
+    def get_key(self, request):
+        """Return the token key from the Authorization header, or None without one"""
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+
+        if len(auth) == 1:
+            raise exceptions.AuthenticationFailed(_('Invalid token header. No credentials provided.'))
+        if len(auth) > 2:
+            raise exceptions.AuthenticationFailed(
+                _('Invalid token header. Token string should not contain spaces.')
+            )
+        try:
+            return auth[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed(
+                _('Invalid token header. Token string should not contain invalid characters.')
+            )
+
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is not None:
+            return cached
+
+        model = self.get_model()
+        try:
+            token = model.objects.select_related('user__attendees').get(key=key)
+        except model.DoesNotExist:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+        return self.remember(key, token)
+
+    async def aauthenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is not None:
+            return cached
+
+        model = self.get_model()
+        try:
+            token = await model.objects.select_related('user__attendees').aget(key=key)
+        except model.DoesNotExist:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+        return self.remember(key, token)
+
+    @staticmethod
+    def remember(key, token):
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+        token_cache.set(key, (token.user, token))
+        return (token.user, token)
+
+    @staticmethod
+    def get_gamer(user):
+        # The gamer was joined on to the token query, so this reads the
+        # cached relation and does not go back to the database
+        return getattr(user, 'attendees', None)
@@ -0,0 +1,54 @@
+"""Helpers shared by the benchmark management commands"""
+import datetime
+import time
+
+from django.contrib.auth.models import User
+
+from levelupapi.models import Event, EventGamer, Game, Gamer, GameType
+
+
+def best(step, repeat):
+    """Run `step` `repeat` times and return its result and best time in ms"""
+    times = []
+    for _ in range(max(repeat, 1)):
+        start = time.perf_counter()
+        result = step()
+        times.append((time.perf_counter() - start) * 1000)
+    return result, min(times)
+
+
+def seed(count):
+    """Add `count` events, with games, gamers and attendees for them
+
+    The rows are made with bulk_create and send no signals, so run this in
+    a transaction that is rolled back afterwards.
+    """
+    game_type = GameType.objects.create(label='Benchmark')
+    users = User.objects.bulk_create([
+        User(username=f'benchmark{index}', first_name='Bench', last_name=f'Mark {index}')
+        for index in range(10)
+    ])
+    gamers = Gamer.objects.bulk_create([
+        Gamer(user=user, bio='Here to benchmark') for user in users
+    ])
+    games = Game.objects.bulk_create([
+        Game(
+            game_type=game_type, title=f'Game {index}', maker='Benchmarks Inc',
+            gamer=gamers[index % len(gamers)], number_of_players=4, skill_level=3
+        )
+        for index in range(max(count // 10, 1))
+    ])
+    start = datetime.date(2022, 1, 1)
+    events = Event.objects.bulk_create([
+        Event(
+            game=games[index % len(games)], description=f'Event {index}',
+            date=start + datetime.timedelta(days=index % 365),
+            time=datetime.time(index % 24), organizer=gamers[index % len(gamers)]
+        )
+        for index in range(count)
+    ])
+    EventGamer.objects.bulk_create([
+        EventGamer(event=event, gamer=gamer)
+        for index, event in enumerate(events)
+        for gamer in gamers[:index % 4]
+    ])
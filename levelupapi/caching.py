@@ -0,0 +1,194 @@
+"""Caches shared by the API"""
+import functools
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.response import Response
+
+from levelupapi import versions
+
+
+class LRUCache:
+    """A thread safe, size bounded mapping whose entries expire
+
+    The least recently used entry is evicted once `maxsize` entries are
+    stored, and entries older than `ttl` seconds are treated as missing.
+    Hits, misses and evictions are counted for `stats()`.
+    """
+
+    def __init__(self, maxsize=1024, ttl=300, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires > self.clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def discard_where(self, predicate):
+        """Drop every entry for which `predicate(key, value)` is true"""
+        with self._lock:
+            stale = [
+                key for key, (_, value) in self._entries.items()
+                if predicate(key, value)
+            ]
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': self.hits / lookups if lookups else None,
+            }
+
+
+class ResponseCache:
+    """Cache of serialized GET responses, keyed by what they depend on
+
+    Keys include the version stamps of the collections a response shows
+    (see levelupapi.versions), so a write invalidates exactly the cached
+    responses of the collections it changes and nothing else. Responses
+    are stored in the cache named by RESPONSE_CACHE_ALIAS, which can be
+    any Django cache backend.
+    """
+
+    def __init__(self, alias, timeout):
+        self.alias = alias
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    def get(self, key):
+        data = self.backend.get(key)
+        self._count(data)
+        return data
+
+    def set(self, key, data):
+        self.backend.set(key, data, timeout=self.timeout)
+
+    async def aget(self, key):
+        """get for async views, through the backend's async API"""
+        data = await self.backend.aget(key)
+        self._count(data)
+        return data
+
+    async def aset(self, key, data):
+        await self.backend.aset(key, data, timeout=self.timeout)
+
+    def _count(self, data):
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'alias': self.alias,
+                'timeout': self.timeout,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else None,
+            }
+
+
+response_cache = ResponseCache(settings.RESPONSE_CACHE_ALIAS, settings.RESPONSE_CACHE_TIMEOUT)
+
+
+def response_key(request, collections, per_viewer=False, daily=False):
+    """The `response_cache` key of a GET response (see versions.fingerprint)"""
+    return 'levelup:response:' + versions.fingerprint(request, collections, per_viewer, daily)
+
+
+def cached_response(*collections, per_viewer=False, daily=False):
+    """Decorate a view method to serve its successful responses from `response_cache`
+
+    `collections` are the collections the response shows. Pass
+    `per_viewer=True` when the response includes fields that differ from
+    gamer to gamer, so each gamer gets their own cache entry, and
+    `daily=True` when it depends on the current date.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            key = response_key(request, collections, per_viewer, daily)
+            data = response_cache.get(key)
+            if data is not None:
+                return Response(data)
+
+            response = method(self, request, *args, **kwargs)
+            if response.status_code == 200:
+                response_cache.set(key, response.data)
+            return response
+        return wrapper
+    return decorator
+
+
+def require_shared_caches():
+    """Refuse to start several server processes with per-process stamps or calendars
+
+    The version stamps and the calendar feeds' event lists are changed by
+    the process that handles a write. With a local memory backend no other
+    process would see the change, and would keep answering with stale
+    ETags, cached responses and feeds for good.
+    """
+    if settings.WEB_CONCURRENCY <= 1:
+        return
+    for alias in (DEFAULT_CACHE_ALIAS, settings.CALENDAR_CACHE_ALIAS):
+        if isinstance(caches[alias], LocMemCache):
+            raise ImproperlyConfigured(
+                f'The {alias!r} cache is local to each process, so it cannot be used '
+                f'with WEB_CONCURRENCY={settings.WEB_CONCURRENCY}. Configure a shared '
+                'backend, e.g. Redis (see CACHES in settings).'
+            )
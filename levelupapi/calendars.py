@@ -0,0 +1,158 @@
+"""iCalendar feeds of the events each gamer organizes or attends
+
+A feed is put together from two kinds of entries in the cache named by
+CALENDAR_CACHE_ALIAS:
+
+- the VEVENT for each event, rendered once and rewritten by the handlers
+  in levelupapi.signals whenever the event or its game is saved
+- the ids of the events on each gamer's calendar, dropped by those
+  handlers when the gamer signs up for, leaves or organizes an event, and
+  looked up again with one indexed query on the next request
+
+So a calendar app polling a feed that has not changed costs two cache
+reads and no queries.
+"""
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone as django_timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+from levelupapi.models import Event, EventGamer
+
+# Lines longer than this many octets are folded (RFC 5545, section 3.1)
+LINE_LENGTH = 75
+
+HEADER = 'BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//Level Up//Events//EN\r\nCALSCALE:GREGORIAN\r\n'
+FOOTER = 'END:VCALENDAR\r\n'
+
+
+def _cache():
+    return caches[settings.CALENDAR_CACHE_ALIAS]
+
+
+def _event_key(pk):
+    return f'levelup:calendar:event:{pk}'
+
+
+def _gamer_key(pk):
+    return f'levelup:calendar:gamer:{pk}'
+
+
+def feed_key(gamer_id):
+    """The secret that lets a calendar app read a gamer's feed without their token
+
+    It is derived from SECRET_KEY, so rotating that revokes every key.
+    """
+    return salted_hmac('levelupapi.calendars.feed_key', str(gamer_id)).hexdigest()
+
+
+def check_feed_key(gamer_id, key):
+    return bool(key) and constant_time_compare(feed_key(gamer_id), key)
+
+
+def escape(text):
+    """Escape a TEXT value (RFC 5545, section 3.3.11)"""
+    return (
+        text.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+
+def fold(line):
+    """Split a content line into CRLF-separated lines of at most LINE_LENGTH octets"""
+    parts = []
+    current, size = [], 0
+    for char in line:
+        width = len(char.encode())
+        # Continuation lines start with a space, which counts towards their length
+        if size + width > LINE_LENGTH:
+            parts.append(''.join(current))
+            current, size = [' '], 1
+        current.append(char)
+        size += width
+    parts.append(''.join(current))
+    return '\r\n'.join(parts) + '\r\n'
+
+
+def utc_stamp(moment):
+    return moment.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def render_event(event, game_title):
+    """Render an event as a VEVENT component
+
+    Events are stored with a local date and time, in TIME_ZONE, and are
+    written in UTC. They have no end, so none is given.
+    """
+    date = Event._meta.get_field('date').to_python(event.date)
+    time = Event._meta.get_field('time').to_python(event.time)
+    start = django_timezone.make_aware(datetime.combine(date, time))
+    lines = [
+        'BEGIN:VEVENT',
+        f'UID:event-{event.pk}@levelup',
+        f'DTSTAMP:{utc_stamp(django_timezone.now())}',
+        f'DTSTART:{utc_stamp(start)}',
+        f'SUMMARY:{escape(event.description)}',
+        f'DESCRIPTION:{escape(game_title)}',
+        'END:VEVENT',
+    ]
+    return ''.join(fold(line) for line in lines)
+
+
+def gamer_event_ids(gamer_id):
+    """The ids of the events a gamer organizes or attends"""
+    cache = _cache()
+    ids = cache.get(_gamer_key(gamer_id))
+    if ids is None:
+        organizing = Event.objects.filter(organizer_id=gamer_id).values_list('pk', flat=True)
+        attending = EventGamer.objects.filter(gamer_id=gamer_id).values_list('event_id', flat=True)
+        ids = sorted(set(organizing) | set(attending))
+        cache.set(_gamer_key(gamer_id), ids, timeout=settings.CALENDAR_CACHE_TIMEOUT)
+    return ids
+
+
+def event_fragments(event_ids):
+    """The VEVENTs of the given events, rendering the ones not in the cache"""
+    cache = _cache()
+    found = cache.get_many([_event_key(pk) for pk in event_ids])
+    missing = [pk for pk in event_ids if _event_key(pk) not in found]
+    if missing:
+        found.update(render_events(Event.objects.filter(pk__in=missing)))
+    # Events deleted since the gamer's ids were cached are left out
+    return [found[_event_key(pk)] for pk in event_ids if _event_key(pk) in found]
+
+
+def feed(gamer_id):
+    """The iCalendar feed of a gamer's events, as bytes"""
+    return ''.join([HEADER, *event_fragments(gamer_event_ids(gamer_id)), FOOTER]).encode()
+
+
+def render_events(events):
+    """Render the events in a queryset and store their VEVENTs"""
+    fragments = {
+        _event_key(pk): render_event(Event(pk=pk, description=description, date=date, time=time), title)
+        for pk, description, date, time, title in events.values_list(
+            'pk', 'description', 'date', 'time', 'game__title'
+        )
+    }
+    _cache().set_many(fragments, timeout=settings.CALENDAR_CACHE_TIMEOUT)
+    return fragments
+
+
+def refresh_event(event, game_title):
+    """Store the VEVENT of an event that was just saved"""
+    _cache().set(
+        _event_key(event.pk), render_event(event, game_title),
+        timeout=settings.CALENDAR_CACHE_TIMEOUT
+    )
+
+
+def forget_events(event_ids):
+    _cache().delete_many([_event_key(pk) for pk in event_ids])
+
+
+def forget_gamers(gamer_ids):
+    """Drop the cached event ids of gamers whose calendars gained or lost events"""
+    _cache().delete_many([_gamer_key(pk) for pk in gamer_ids])
@@ -0,0 +1,158 @@
+"""Compression of API and report responses
+
+CompressionMiddleware compresses responses with the best encoding the
+client accepts: brotli when the `brotli` package is installed, else gzip.
+Responses smaller than COMPRESSION_MIN_LENGTH bytes are sent as they are,
+since compressing them saves less than it costs. Streaming responses, like
+the reports, are compressed chunk by chunk as they are sent, so the
+response is never held in memory whole.
+"""
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.regex_helper import _lazy_re_compile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Media types worth compressing; images and archives already are
+COMPRESSIBLE_TYPES = (
+    'application/json', 'application/x-ndjson', 'application/javascript',
+    'application/xml', 'text/',
+)
+
+_accept_encoding_re = _lazy_re_compile(r'\s*([^\s;,]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?')
+
+
+class GzipCompressor:
+    encoding = 'gzip'
+
+    def __init__(self, level):
+        # wbits=31 writes a gzip header and trailer around the deflate stream
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        """Return everything compressed so far, so the client can decode it right away"""
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class BrotliCompressor:
+    encoding = 'br'
+
+    def __init__(self, quality):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        """Return everything compressed so far, so the client can decode it right away"""
+        return self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+def accepted_encodings(header):
+    """Return the content codings an Accept-Encoding header allows
+
+    Codings given a q-value of 0 are left out.
+    """
+    accepted = set()
+    for part in header.split(','):
+        match = _accept_encoding_re.match(part)
+        if not match:
+            continue
+        coding, quality = match.groups()
+        try:
+            if quality is not None and float(quality) <= 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(coding.lower())
+    return accepted
+
+
+def compressor_for(accept_encoding):
+    """Return a compressor for the best encoding the client accepts, or None"""
+    accepted = accepted_encodings(accept_encoding)
+    if brotli is not None and ('br' in accepted or '*' in accepted):
+        return BrotliCompressor(settings.COMPRESSION_BROTLI_QUALITY)
+    if 'gzip' in accepted or '*' in accepted:
+        return GzipCompressor(settings.COMPRESSION_GZIP_LEVEL)
+    return None
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Compress responses the client can decode and that are worth compressing"""
+
+    def process_response(self, request, response):
+        if not self.compressible(response):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        compressor = compressor_for(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if compressor is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = self.compress_async(
+                    compressor, response.streaming_content
+                )
+            else:
+                response.streaming_content = self.compress_stream(
+                    compressor, response.streaming_content
+                )
+            # The length is unknown until the last chunk has been compressed
+            del response.headers['Content-Length']
+        else:
+            if len(response.content) < settings.COMPRESSION_MIN_LENGTH:
+                return response
+            compressed = compressor.compress(response.content) + compressor.finish()
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # The compressed body differs from the one the strong ETag named
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = compressor.encoding
+        return response
+
+    @staticmethod
+    def compressible(response):
+        if response.has_header('Content-Encoding') or response.status_code in (204, 304):
+            return False
+        content_type = response.get('Content-Type', '').lower()
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    @staticmethod
+    def compress_stream(compressor, chunks):
+        # Each chunk is flushed as it comes, so the client sees the report
+        # as soon as it would have uncompressed
+        for chunk in chunks:
+            data = compressor.compress(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+
+    @staticmethod
+    async def compress_async(compressor, chunks):
+        async for chunk in chunks:
+            data = compressor.compress(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
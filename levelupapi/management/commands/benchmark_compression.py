@@ -0,0 +1,125 @@
+"""Management command for weighing response compression against its cost"""
+import zlib
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from levelupapi.benchmarks import best, seed
+from levelupapi.compression import BrotliCompressor, GzipCompressor, brotli
+from levelupapi.models import Event
+from levelupapi.renderers import FastJSONRenderer
+from levelupapi.views.event import EventSerializer
+from levelupapi.views.pagination import EventPagination
+from levelupapi.views.values import ValuesSerializer
+
+# Size of the chunks the streamed payloads are cut into, like the reports'
+CHUNK_SIZE = 8192
+
+
+class Command(BaseCommand):
+    help = (
+        'Compress representative API payloads with each encoding and level and show '
+        'the bytes saved against the time spent, at a few link speeds'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Add this many events (and games and gamers for them) for the run only',
+        )
+        parser.add_argument(
+            '--rows', type=int, default=500,
+            help='How many events to put in each payload',
+        )
+        parser.add_argument(
+            '--bandwidth', type=float, nargs='+', default=[1, 10, 100],
+            help='Link speeds in Mbit/s to estimate the time on the wire for',
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='How many times to time each step; the best time is reported',
+        )
+
+    def handle(self, *args, **options):
+        self.repeat = options['repeat']
+        self.bandwidths = options['bandwidth']
+
+        with transaction.atomic():
+            if options['seed']:
+                seed(options['seed'])
+            payloads = self.payloads(options['rows'])
+            transaction.set_rollback(True)
+
+        encodings = [('gzip', level, GzipCompressor, self.gunzip) for level in (1, 6, 9)]
+        if brotli is not None:
+            encodings += [
+                ('br', quality, BrotliCompressor, brotli.decompress) for quality in (4, 5, 11)
+            ]
+        else:
+            self.stdout.write('brotli is not installed, so only gzip is measured')
+
+        speeds = ''.join(f'{speed:>8g}Mb' for speed in self.bandwidths)
+        for name, body in payloads.items():
+            self.stdout.write(f'\n{name}: {len(body)} bytes')
+            self.stdout.write(
+                f"  {'encoding':<14}{'bytes':>9}{'ratio':>7}{'comp ms':>9}{'dec ms':>8}  "
+                f'total ms at{speeds}'
+            )
+            self.report('identity', len(body), 0, 0)
+            for encoding, level, compressor_class, decompress in encodings:
+                compressed, compress_time = best(
+                    lambda: self.compress(compressor_class(level), body), self.repeat
+                )
+                _, decompress_time = best(lambda: decompress(compressed), self.repeat)
+                self.report(
+                    f'{encoding} {level}', len(compressed), compress_time, decompress_time,
+                    ratio=len(body) / len(compressed)
+                )
+                streamed, stream_time = best(
+                    lambda: self.compress_stream(compressor_class(level), body), self.repeat
+                )
+                self.report(
+                    '  streamed', len(streamed), stream_time, decompress_time,
+                    ratio=len(body) / len(streamed)
+                )
+
+    def payloads(self, rows):
+        """Render the events list with everything nested, and with ids only"""
+        events = Event.objects.with_viewer_state(None).order_by(*EventPagination.ordering)
+        payloads = {}
+        for name, options in [('events (nested)', {}), ('events (expand=)', {'expand': {}})]:
+            serializer = ValuesSerializer(EventSerializer(**options), events)
+            data = serializer.to_representation(serializer.values()[:rows])
+            payloads[name] = FastJSONRenderer().render(data)
+        return payloads
+
+    def report(self, label, size, compress_time, decompress_time, ratio=1.0):
+        """Write one row: sizes, times, and the time to send at each bandwidth"""
+        totals = ''.join(
+            f'{compress_time + decompress_time + self.wire_time(size, speed):10.2f}'
+            for speed in self.bandwidths
+        )
+        self.stdout.write(
+            f'  {label:<14}{size:>9}{ratio:>7.2f}{compress_time:>9.2f}'
+            f'{decompress_time:>8.2f}  {" " * 11}{totals}'
+        )
+
+    @staticmethod
+    def wire_time(size, megabits):
+        return size * 8 / (megabits * 1_000_000) * 1000
+
+    @staticmethod
+    def compress(compressor, body):
+        return compressor.compress(body) + compressor.finish()
+
+    @staticmethod
+    def compress_stream(compressor, body):
+        chunks = [
+            compressor.compress(body[start:start + CHUNK_SIZE]) + compressor.flush()
+            for start in range(0, len(body), CHUNK_SIZE)
+        ]
+        return b''.join(chunks) + compressor.finish()
+
+    @staticmethod
+    def gunzip(data):
+        return zlib.decompress(data, 31)
@@ -0,0 +1,113 @@
+"""Management command for load testing the list endpoints over WSGI and ASGI"""
+import asyncio
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client, override_settings
+from rest_framework.authtoken.models import Token
+
+from levelupapi.benchmarks import seed
+from levelupapi.models import Gamer
+
+
+class Command(BaseCommand):
+    help = (
+        'Send concurrent requests to the list endpoints through the WSGI handler and '
+        'the DRF views, then through the ASGI handler and the async views, and compare '
+        'requests per second and latency'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths', nargs='*', default=['/events', '/games', '/gametypes'],
+            help='Paths to request (default: the three list endpoints)',
+        )
+        parser.add_argument(
+            '--requests', type=int, default=200,
+            help='How many requests to send to each path over each interface',
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=20,
+            help='How many requests to have in flight at once',
+        )
+        parser.add_argument(
+            '--cached', action='store_true',
+            help='Request the same URL every time, so most responses come from the cache',
+        )
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Add this many events (and games and gamers for them) first. '
+                 'Unlike the other benchmarks the rows are kept',
+        )
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            seed(options['seed'])
+            call_command('reconcile_counts', stdout=self.stdout)
+            call_command('rebuild_reports', stdout=self.stdout)
+
+        gamer = Gamer.objects.select_related('user').first()
+        if gamer is None:
+            raise CommandError('There are no gamers to make requests as; try --seed')
+        token, _ = Token.objects.get_or_create(user=gamer.user)
+        self.headers = {'Authorization': f'Token {token.key}'}
+        self.concurrency = max(options['concurrency'], 1)
+
+        self.stdout.write(
+            f"{options['requests']} requests per path, {self.concurrency} at a time"
+            f"{', cached' if options['cached'] else ''}\n"
+            f"  {'path':<14}{'interface':<12}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'errors':>8}"
+        )
+        for path in options['paths']:
+            urls = [
+                path if options['cached'] else f"{path}{'&' if '?' in path else '?'}_={index}"
+                for index in range(options['requests'])
+            ]
+            # The test clients send requests to the host "testserver"
+            hosts = [*settings.ALLOWED_HOSTS, 'testserver']
+            with override_settings(ROOT_URLCONF='levelup.urls', ALLOWED_HOSTS=hosts):
+                self.report(path, 'WSGI', *self.run_wsgi(urls))
+            with override_settings(ROOT_URLCONF='levelup.async_urls', ALLOWED_HOSTS=hosts):
+                self.report(path, 'ASGI async', *asyncio.run(self.run_asgi(urls)))
+
+    def run_wsgi(self, urls):
+        def get(url):
+            start = time.perf_counter()
+            response = Client().get(url, headers=self.headers)
+            return time.perf_counter() - start, response.status_code
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            results = list(executor.map(get, urls))
+        return time.perf_counter() - start, results
+
+    async def run_asgi(self, urls):
+        client = AsyncClient()
+        slots = asyncio.Semaphore(self.concurrency)
+
+        async def get(url):
+            async with slots:
+                start = time.perf_counter()
+                response = await client.get(url, headers=self.headers)
+                return time.perf_counter() - start, response.status_code
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(get(url) for url in urls))
+        return time.perf_counter() - start, results
+
+    def report(self, path, interface, elapsed, results):
+        latencies = sorted(latency * 1000 for latency, _ in results)
+        errors = sum(1 for _, status in results if status >= 400)
+        self.stdout.write(
+            f'  {path:<14}{interface:<12}{len(results) / elapsed:>9.1f}'
+            f'{self.percentile(latencies, 50):>9.2f}{self.percentile(latencies, 99):>9.2f}'
+            f'{errors:>8}'
+        )
+
+    @staticmethod
+    def percentile(values, percent):
+        return values[max(math.ceil(len(values) * percent / 100) - 1, 0)]
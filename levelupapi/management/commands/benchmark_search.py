@@ -0,0 +1,59 @@
+"""Management command for timing searches against the index and the tables"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from levelupapi import search
+from levelupapi.benchmarks import best, seed
+
+
+class Command(BaseCommand):
+    help = (
+        'Time searches through the full-text index against substring matches '
+        'on the games and events tables'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'queries', nargs='*', default=['game 12', 'ev', 'event 9999', 'bench'],
+            help='Searches to time',
+        )
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Add this many events (and games and gamers for them) for the run only',
+        )
+        parser.add_argument(
+            '--limit', type=int, default=20,
+            help='How many results each search returns',
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='How many times to time each step; the best time is reported',
+        )
+
+    def handle(self, *args, **options):
+        if not search.indexed():
+            raise CommandError('This database has no search index to compare with')
+
+        with transaction.atomic():
+            if options['seed']:
+                seed(options['seed'])
+                # The seeded rows send no signals, so index them all at once
+                _, rebuild_time = best(search.rebuild, 1)
+                self.stdout.write(f'Indexed the seeded rows in {rebuild_time:.0f} ms')
+
+            self.stdout.write(f"  {'query':<16}{'hits':>6}{'index ms':>10}{'tables ms':>11}")
+            for query in options['queries']:
+                words = search.terms(query)
+                hits, index_time = best(
+                    lambda: search.search(query, limit=options['limit']), options['repeat']
+                )
+                _, table_time = best(
+                    lambda: search.fallback_search(words, None, options['limit']),
+                    options['repeat']
+                )
+                self.stdout.write(
+                    f'  {query:<16}{len(hits):>6}{index_time:>10.2f}{table_time:>11.2f}'
+                )
+
+            # Leave the database as it was
+            transaction.set_rollback(True)
@@ -0,0 +1,73 @@
+"""Management command for timing the list serializers and JSON renderers"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from levelupapi.benchmarks import best, seed
+from levelupapi.models import Event, Game
+from levelupapi.renderers import FastJSONRenderer, orjson
+from levelupapi.views.event import EventSerializer
+from levelupapi.views.game import GameSerializer
+from levelupapi.views.pagination import EventPagination
+from levelupapi.views.values import ValuesSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        'Time the events and games lists through their serializers and JSONRenderer '
+        'against ValuesSerializer and FastJSONRenderer, and check the bytes match'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Add this many events (and games and gamers for them) for the run only',
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='How many times to time each step; the best time is reported',
+        )
+
+    def handle(self, *args, **options):
+        self.repeat = options['repeat']
+        self.stdout.write(f"JSON encoder: {'orjson' if orjson else 'json (orjson is not installed)'}")
+
+        with transaction.atomic():
+            if options['seed']:
+                seed(options['seed'])
+
+            events = Event.objects.with_viewer_state(None).order_by(*EventPagination.ordering)
+            self.compare('events', EventSerializer, events)
+            self.compare('games', GameSerializer, Game.objects.order_by('pk'))
+
+            # Leave the database as it was
+            transaction.set_rollback(True)
+
+    def compare(self, name, serializer_class, queryset):
+        def serialize():
+            return serializer_class(
+                serializer_class.setup_eager_loading(queryset), many=True
+            ).data
+
+        def serialize_values():
+            serializer = ValuesSerializer(serializer_class(), queryset)
+            return serializer.to_representation(serializer.values())
+
+        repeat = self.repeat
+        data, serialize_time = best(serialize, repeat)
+        values_data, values_time = best(serialize_values, repeat)
+        body, render_time = best(lambda: JSONRenderer().render(data), repeat)
+        fast_body, fast_render_time = best(
+            lambda: FastJSONRenderer().render(values_data), repeat
+        )
+
+        if body != fast_body:
+            raise CommandError(f'The {name} responses differ')
+
+        self.stdout.write(
+            f'{name}: {len(data)} row(s), {len(body)} bytes\n'
+            f'  serialize  {serialize_time:9.2f} ms  -> values  {values_time:9.2f} ms\n'
+            f'  render     {render_time:9.2f} ms  -> fast    {fast_render_time:9.2f} ms\n'
+            f'  total      {serialize_time + render_time:9.2f} ms  -> '
+            f'{values_time + fast_render_time:9.2f} ms'
+        )
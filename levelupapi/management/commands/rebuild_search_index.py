@@ -0,0 +1,18 @@
+"""Management command for rebuilding the search index from scratch"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from levelupapi import search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index of games and events'
+
+    def handle(self, *args, **options):
+        if not search.indexed():
+            raise CommandError(f'{connection.vendor} has no search index; searches read the tables')
+        search.rebuild()
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM levelupapi_search')
+            count, = cursor.fetchone()
+        self.stdout.write(f'Indexed {count} game(s) and event(s)')
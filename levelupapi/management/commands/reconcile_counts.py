@@ -0,0 +1,38 @@
+"""Management command for repairing the stored event and attendee counts"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from levelupapi.models import Event, EventGamer, Game
+from levelupapi.models.counters import counted
+
+
+class Command(BaseCommand):
+    help = 'Recount Game.event_count and Event.attendees_count and fix any that drifted'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Report the rows that are wrong without changing them',
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            games = self.reconcile(
+                Game.objects.all(), 'event_count', counted(Event.objects.all(), 'game'),
+                options['dry_run']
+            )
+            events = self.reconcile(
+                Event.objects.all(), 'attendees_count', counted(EventGamer.objects.all(), 'event'),
+                options['dry_run']
+            )
+
+        self.stdout.write(f'{games} game(s) and {events} event(s) had drifted counts')
+
+    def reconcile(self, queryset, field, actual, dry_run):
+        # One UPDATE compares and sets each count, so an F() increment made
+        # while the command runs is recounted rather than overwritten
+        drifted = queryset.filter(~Q(**{field: actual}))
+        if dry_run:
+            return drifted.count()
+        return drifted.update(**{field: actual})
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:54
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_existing_rows(apps, schema_editor):
+    Event = apps.get_model('levelupapi', 'Event')
+    EventGamer = apps.get_model('levelupapi', 'EventGamer')
+    Game = apps.get_model('levelupapi', 'Game')
+
+    Game.objects.update(event_count=Coalesce(Subquery(
+        Event.objects.filter(game=OuterRef('pk')).order_by().values('game').annotate(
+            count=Count('pk')
+        ).values('count')
+    ), 0))
+    Event.objects.update(attendees_count=Coalesce(Subquery(
+        EventGamer.objects.filter(event=OuterRef('pk')).order_by().values('event').annotate(
+            count=Count('pk')
+        ).values('count')
+    ), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('levelupapi', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='attendees',
+            field=models.ManyToManyField(related_name='attending', through='levelupapi.EventGamer', to='levelupapi.gamer'),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='attendees_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='event_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='event',
+            name='game',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='levelupapi.game'),
+        ),
+        migrations.AlterField(
+            model_name='event',
+            name='organizer',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='organizing', to='levelupapi.gamer'),
+        ),
+        migrations.AlterField(
+            model_name='gamer',
+            name='user',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='attendees', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(count_existing_rows, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:07
+
+from django.db import migrations, models
+from django.db.models import Count, Min, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def remove_duplicate_attendees(apps, schema_editor):
+    EventGamer = apps.get_model('levelupapi', 'EventGamer')
+    Event = apps.get_model('levelupapi', 'Event')
+
+    # Keep the first row of every (event, gamer) pair that was signed up twice
+    duplicates = EventGamer.objects.values('event', 'gamer').annotate(
+        first=Min('pk'), rows=Count('pk')
+    ).filter(rows__gt=1)
+    for pair in duplicates:
+        EventGamer.objects.filter(event=pair['event'], gamer=pair['gamer']).exclude(
+            pk=pair['first']
+        ).delete()
+
+    Event.objects.update(attendees_count=Coalesce(Subquery(
+        EventGamer.objects.filter(event=OuterRef('pk')).order_by().values('event').annotate(
+            count=Count('pk')
+        ).values('count')
+    ), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('levelupapi', '0002_event_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_attendees, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='eventgamer',
+            constraint=models.UniqueConstraint(fields=('event', 'gamer'), name='eventgamer_event_gamer_unique'),
+        ),
+    ]
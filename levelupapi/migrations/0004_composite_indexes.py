@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('levelupapi', '0003_eventgamer_unique'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['date', 'time', 'id'], name='event_date_time_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['organizer', 'date'], name='event_organizer_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='eventgamer',
+            index=models.Index(fields=['gamer', 'event'], name='eventgamer_gamer_event_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['game_type', 'id'], name='game_game_type_id_idx'),
+        ),
+    ]
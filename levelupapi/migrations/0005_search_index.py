@@ -0,0 +1,50 @@
+from django.db import migrations
+
+# The index is not a model, so it is made with SQL for each database that
+# has full-text search; other databases go without (see levelupapi.search)
+CREATE_INDEX = {
+    'sqlite': [
+        # Prefixes of two and three characters get their own index entries,
+        # so short prefixes match as fast as whole words
+        "CREATE VIRTUAL TABLE levelupapi_search USING fts5("
+        "title, body, tokenize = 'unicode61', prefix = '2 3')",
+        # Rank title matches ten times higher than body matches
+        "INSERT INTO levelupapi_search (levelupapi_search, rank) VALUES ('rank', 'bm25(10.0, 1.0)')",
+        'INSERT INTO levelupapi_search (rowid, title, body) '
+        'SELECT id * 2, title, maker FROM levelupapi_game',
+        "INSERT INTO levelupapi_search (rowid, title, body) "
+        "SELECT id * 2 + 1, description, '' FROM levelupapi_event",
+    ],
+    'postgresql': [
+        'CREATE TABLE levelupapi_search ('
+        'id bigint PRIMARY KEY, title text NOT NULL, body text NOT NULL, '
+        "document tsvector GENERATED ALWAYS AS (setweight(to_tsvector('simple', title), 'A') "
+        "|| setweight(to_tsvector('simple', body), 'B')) STORED)",
+        'CREATE INDEX levelupapi_search_document_idx ON levelupapi_search USING gin (document)',
+        'INSERT INTO levelupapi_search (id, title, body) '
+        'SELECT id::bigint * 2, title, maker FROM levelupapi_game',
+        "INSERT INTO levelupapi_search (id, title, body) "
+        "SELECT id::bigint * 2 + 1, description, '' FROM levelupapi_event",
+    ],
+}
+
+
+def create_search_index(apps, schema_editor):
+    for statement in CREATE_INDEX.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in CREATE_INDEX:
+        schema_editor.execute('DROP TABLE IF EXISTS levelupapi_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('levelupapi', '0004_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,30 @@
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def counted(queryset, field):
+    """Correlated subquery counting the rows of `queryset` whose `field` points at the outer row"""
+    return Coalesce(Subquery(
+        queryset.filter(**{field: OuterRef('pk')}).order_by().values(field).annotate(
+            count=Count('pk')
+        ).values('count')
+    ), 0)
+
+
+class StoredCountsMixin:
+    """Keep stored counters out of ordinary saves
+
+    Counter columns listed in `counter_fields` are only changed with F()
+    updates by the handlers in levelupapi.signals. Saving an existing row
+    writes every other column, so a copy of the row that was loaded before
+    the count changed cannot overwrite the newer count.
+    """
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.counter_fields
+            ]
+        super().save(*args, **kwargs)
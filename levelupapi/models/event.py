@@ -1,19 +1,50 @@
 from django.db import models
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
 
+from .counters import StoredCountsMixin
+
+
+class EventQuerySet(models.QuerySet):
+
+    def with_viewer_state(self, gamer):
+        """Annotate each event with whether the viewing gamer has joined it
+
+        `joined` is an Exists subquery against the event/gamer table, so
+        the events are never joined to their attendees and grouped. The
+        number of attendees is kept on the event row itself.
+        """
+        from .event_gamer import EventGamer
+
+        return self.annotate(
+            joined=Exists(EventGamer.objects.filter(event=OuterRef('pk'), gamer=gamer))
+        )
+
+    def upcoming(self):
+        """Events from today on, today's included"""
+        return self.filter(date__gte=timezone.localdate())
+
+    def past(self):
+        """Events before today"""
+        return self.filter(date__lt=timezone.localdate())
+
+
+class Event(StoredCountsMixin, models.Model):
+    counter_fields = ('attendees_count',)
 
-class Event(models.Model):
     game = models.ForeignKey("Game", on_delete=models.CASCADE, related_name="events")
     description = models.CharField(max_length=55)
     date = models.DateField()
     time = models.TimeField()
     organizer = models.ForeignKey("Gamer", on_delete=models.CASCADE, related_name="organizing")
     attendees = models.ManyToManyField("Gamer", through="EventGamer", related_name="attending")
+    attendees_count = models.PositiveIntegerField(default=0, editable=False)
 
-    @property
-    def joined(self):
-        return self.__joined
-
-    @joined.setter
-    def joined(self, value):
-        self.__joined = value
+    objects = EventQuerySet.as_manager()
 
+    class Meta:
+        indexes = [
+            # The order the events list pages through
+            models.Index(fields=['date', 'time', 'id'], name='event_date_time_id_idx'),
+            models.Index(fields=['organizer', 'date'], name='event_organizer_date_idx'),
+        ]
@@ -4,3 +4,12 @@ from django.db import models
 class EventGamer(models.Model):
     gamer = models.ForeignKey("Gamer", on_delete=models.CASCADE)
     event = models.ForeignKey("Event", on_delete=models.CASCADE)
+
+    class Meta:
+        indexes = [
+            # The events a gamer attends; (event, gamer) is covered by the constraint
+            models.Index(fields=['gamer', 'event'], name='eventgamer_gamer_event_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['event', 'gamer'], name='eventgamer_event_gamer_unique'),
+        ]
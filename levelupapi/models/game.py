@@ -1,10 +1,20 @@
 from django.db import models
 
+from .counters import StoredCountsMixin
+
+
+class Game(StoredCountsMixin, models.Model):
+    counter_fields = ('event_count',)
 
-class Game(models.Model):
     game_type = models.ForeignKey("GameType", on_delete=models.CASCADE)
     title = models.CharField(max_length=50)
     maker = models.CharField(max_length=50)
     gamer = models.ForeignKey("Gamer", on_delete=models.CASCADE)
     number_of_players = models.PositiveIntegerField()
     skill_level = models.PositiveIntegerField()
+    event_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['game_type', 'id'], name='game_game_type_id_idx'),
+        ]
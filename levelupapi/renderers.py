@@ -0,0 +1,71 @@
+"""JSON renderer and parser backed by orjson when it is installed
+
+orjson encodes and decodes several times faster than the standard
+library's json module. Install it with `pip install orjson`; without it
+both classes behave exactly like DRF's own JSONRenderer and JSONParser.
+"""
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+LINE_SEPARATOR = '\u2028'.encode()
+PARAGRAPH_SEPARATOR = '\u2029'.encode()
+
+
+class FastJSONRenderer(JSONRenderer):
+    """Render responses with orjson, byte for byte as JSONRenderer would
+
+    Dates and times are handed back to DRF's encoder so they are formatted
+    the same way. Indented output (the browsable API, or an `indent`
+    parameter on the Accept header) still goes through the json module.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None or not self.renders_like_orjson(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(
+            data,
+            default=self.encoder_class().default,
+            option=(
+                orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+                | orjson.OPT_NON_STR_KEYS
+            ),
+        )
+        # Escape the line and paragraph separators as JSONRenderer does
+        return ret.replace(LINE_SEPARATOR, b'\\u2028').replace(PARAGRAPH_SEPARATOR, b'\\u2029')
+
+    def renders_like_orjson(self, accepted_media_type, renderer_context):
+        """Whether JSONRenderer would write the same compact, UTF-8 output orjson does"""
+        return (
+            orjson is not None
+            and self.get_indent(accepted_media_type, renderer_context or {}) is None
+            and self.compact
+            and self.strict
+            and not self.ensure_ascii
+        )
+
+
+class FastJSONParser(JSONParser):
+    """Parse request bodies with orjson"""
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        body = stream.read() if stream is not None else b''
+        try:
+            if encoding.lower().replace('-', '') != 'utf8':
+                body = body.decode(encoding)
+            return orjson.loads(body)
+        except (ValueError, UnicodeDecodeError) as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -0,0 +1,177 @@
+"""Full-text search over game titles and makers and event descriptions
+
+Documents are kept in the levelupapi_search table made by migration 0005:
+an FTS5 virtual table on SQLite, and on PostgreSQL a table with a
+GIN-indexed tsvector column generated from the text. The handlers in
+levelupapi.signals write a game's or event's document whenever it is
+saved and remove it when it is deleted, so a search reads the index alone
+and only loads the hits it returns.
+
+Games and events share the table. A document's key is the object's id
+times two, plus one for events, so each is written and removed by key.
+
+Other databases have no index, and search() falls back to
+case-insensitive substring matches on the games and events themselves.
+"""
+import re
+
+from django.db import connection, transaction
+from django.db.models import Q
+
+from levelupapi import versions
+from levelupapi.models import Event, Game
+
+GAME = 0
+EVENT = 1
+
+# Words past this many are ignored, which keeps the match cheap
+MAX_TERMS = 8
+
+_term_re = re.compile(r'\w+')
+
+# The document key column, and the statement that writes a document, by vendor
+_KEYS = {'sqlite': 'rowid', 'postgresql': 'id'}
+_WRITES = {
+    'sqlite': 'INSERT INTO levelupapi_search (rowid, title, body) VALUES (%s, %s, %s)',
+    'postgresql': (
+        'INSERT INTO levelupapi_search (id, title, body) VALUES (%s, %s, %s) '
+        'ON CONFLICT (id) DO UPDATE SET title = EXCLUDED.title, body = EXCLUDED.body'
+    ),
+}
+# Statements that copy every game and event in, with the id cast so
+# doubling it cannot overflow
+_COPIES = {
+    'sqlite': [
+        'INSERT INTO levelupapi_search (rowid, title, body) '
+        'SELECT id * 2, title, maker FROM levelupapi_game',
+        "INSERT INTO levelupapi_search (rowid, title, body) "
+        "SELECT id * 2 + 1, description, '' FROM levelupapi_event",
+    ],
+    'postgresql': [
+        'INSERT INTO levelupapi_search (id, title, body) '
+        'SELECT id::bigint * 2, title, maker FROM levelupapi_game',
+        "INSERT INTO levelupapi_search (id, title, body) "
+        "SELECT id::bigint * 2 + 1, description, '' FROM levelupapi_event",
+    ],
+}
+# Hits ranked best first, title matches above body matches, ties newest
+# first. Every match is ranked, so an old document that matches best is
+# never passed over for newer ones. On SQLite `rank` is bm25() with those
+# weights, set up by the migration, and lower is better.
+_SEARCHES = {
+    'sqlite': (
+        'SELECT rowid FROM levelupapi_search WHERE levelupapi_search MATCH %s '
+        '{kind} ORDER BY rank, rowid DESC LIMIT %s'
+    ),
+    'postgresql': (
+        "SELECT id FROM levelupapi_search, to_tsquery('simple', %s) query "
+        'WHERE document @@ query {kind} ORDER BY ts_rank(document, query) DESC, id DESC LIMIT %s'
+    ),
+}
+
+
+def indexed():
+    """Whether the database has a search index"""
+    return connection.vendor in _KEYS
+
+
+def document_id(kind, pk):
+    return pk * 2 + kind
+
+
+def terms(query):
+    """The words of a search, lowercased"""
+    return _term_re.findall(query.lower())[:MAX_TERMS]
+
+
+def write(kind, documents):
+    """Add or replace the documents for (pk, title, body) rows of one kind"""
+    if not indexed():
+        return
+    documents = list(documents)
+    if connection.vendor == 'sqlite':
+        # FTS5 tables have no upsert, so documents are removed before they are replaced
+        remove(kind, [pk for pk, _, _ in documents])
+    with connection.cursor() as cursor:
+        cursor.executemany(_WRITES[connection.vendor], [
+            (document_id(kind, pk), title, body) for pk, title, body in documents
+        ])
+
+
+def index_games(games):
+    write(GAME, [(game.pk, game.title, game.maker) for game in games])
+
+
+def index_events(events):
+    write(EVENT, [(event.pk, event.description, '') for event in events])
+
+
+def remove(kind, pks):
+    if not indexed():
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'DELETE FROM levelupapi_search WHERE {_KEYS[connection.vendor]} = %s',
+            [(document_id(kind, pk),) for pk in pks]
+        )
+
+
+def rebuild():
+    """Throw the index away and add every game and event again"""
+    if not indexed():
+        return
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute('DELETE FROM levelupapi_search')
+        for statement in _COPIES[connection.vendor]:
+            cursor.execute(statement)
+    # Cached searches may have missed what the index had lost
+    versions.bump(versions.GAMES, versions.EVENTS)
+
+
+def match_expression(words):
+    """The index query matching documents with a word starting with each of `words`"""
+    if connection.vendor == 'sqlite':
+        return ' '.join(f'"{word}"*' for word in words)
+    return ' & '.join(f'{word}:*' for word in words)
+
+
+def search(query, kind=None, limit=20):
+    """Return the (kind, pk) of the best `limit` matches for `query`, best first
+
+    Every word of the query has to start a word of the title or body, so
+    `fort am` finds "Fortress America". Pass `kind` to search only games
+    or only events.
+    """
+    words = terms(query)
+    if not words:
+        return []
+    if not indexed():
+        return fallback_search(words, kind, limit)
+
+    params = [match_expression(words)]
+    kind_filter = ''
+    if kind is not None:
+        kind_filter = f'AND {_KEYS[connection.vendor]} %% 2 = %s'
+        params.append(kind)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            _SEARCHES[connection.vendor].format(kind=kind_filter),
+            [*params, limit]
+        )
+        return [(key % 2, key // 2) for key, in cursor.fetchall()]
+
+
+def fallback_search(words, kind, limit):
+    """Substring matches straight from the tables, for databases without an index"""
+    hits = []
+    if kind in (None, GAME):
+        games = Game.objects.all()
+        for word in words:
+            games = games.filter(Q(title__icontains=word) | Q(maker__icontains=word))
+        hits += [(GAME, pk) for pk in games.order_by('pk').values_list('pk', flat=True)[:limit]]
+    if kind in (None, EVENT):
+        events = Event.objects.all()
+        for word in words:
+            events = events.filter(description__icontains=word)
+        hits += [(EVENT, pk) for pk in events.order_by('pk').values_list('pk', flat=True)[:limit]]
+    return hits[:limit]
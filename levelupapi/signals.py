@@ -0,0 +1,296 @@
+"""Signal handlers that keep denormalized data and caches in step with writes"""
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+from rest_framework.authtoken.models import Token
+
+from levelupapi import calendars, search, versions
+from levelupapi.suggest import game_suggestions
+from levelupapi.authentication import token_cache
+from levelupapi.models import Event, EventGamer, Game, Gamer, GameType
+from levelupapi.models.counters import counted
+
+# Sent after rows of `sender` are written with bulk_create or bulk_update,
+# which do not send post_save. `instances` are the rows as written and
+# `created` says whether they are new. After an update, `previous` holds
+# the same rows as they were before it.
+bulk_saved = Signal()
+
+
+def adjust_event_count(game_ids, delta):
+    """Add `delta` to the stored event count of each game"""
+    Game.objects.filter(pk__in=game_ids).update(event_count=F('event_count') + delta)
+
+
+def adjust_attendees_count(event_ids, delta):
+    """Add `delta` to the stored attendee count of each event"""
+    Event.objects.filter(pk__in=event_ids).update(attendees_count=F('attendees_count') + delta)
+
+
+def recount_event_count(game_ids):
+    """Set the stored event count of each game from its events"""
+    Game.objects.filter(pk__in=game_ids).update(event_count=counted(Event.objects.all(), 'game'))
+
+
+def recount_attendees_count(event_ids):
+    """Set the stored attendee count of each event from its attendees"""
+    Event.objects.filter(pk__in=event_ids).update(
+        attendees_count=counted(EventGamer.objects.all(), 'event')
+    )
+
+
+@receiver(pre_save, sender=Event)
+def remember_event_game(sender, instance, raw=False, **kwargs):
+    """Note the game an existing event was counted against, and its organizer, before it is saved"""
+    if raw or instance.pk is None:
+        return
+    instance._counted_game_id, instance._previous_organizer_id = sender.objects.filter(
+        pk=instance.pk
+    ).values_list('game_id', 'organizer_id').first() or (None, None)
+
+
+@receiver(post_save, sender=Event)
+def count_saved_event(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        adjust_event_count([instance.game_id], 1)
+        return
+
+    counted_game_id = getattr(instance, '_counted_game_id', None)
+    if counted_game_id is not None and counted_game_id != instance.game_id:
+        adjust_event_count([counted_game_id], -1)
+        adjust_event_count([instance.game_id], 1)
+
+
+@receiver(post_delete, sender=Event)
+def count_deleted_event(sender, instance, **kwargs):
+    adjust_event_count([instance.game_id], -1)
+
+
+@receiver(post_save, sender=EventGamer)
+def count_saved_attendee(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        adjust_attendees_count([instance.event_id], 1)
+
+
+@receiver(m2m_changed, sender=Event.attendees.through)
+def count_added_attendees(sender, instance, action, reverse, pk_set, **kwargs):
+    """Count gamers added with `event.attendees.add()` or `gamer.attending.add()`
+
+    `add()` inserts the through rows without sending post_save. Removal
+    deletes the through rows one by one, so it is counted by the
+    post_delete handler below rather than here.
+    """
+    if action != 'post_add' or not pk_set:
+        return
+    if reverse:
+        adjust_attendees_count(pk_set, 1)
+    else:
+        adjust_attendees_count([instance.pk], len(pk_set))
+
+
+@receiver(post_delete, sender=EventGamer)
+def count_deleted_attendee(sender, instance, **kwargs):
+    adjust_attendees_count([instance.event_id], -1)
+
+
+@receiver(bulk_saved, sender=Event)
+def count_bulk_saved_events(sender, instances, previous=(), **kwargs):
+    recount_event_count({event.game_id for event in [*instances, *previous]})
+
+
+@receiver(bulk_saved, sender=EventGamer)
+def count_bulk_saved_attendees(sender, instances, **kwargs):
+    recount_attendees_count({attendee.event_id for attendee in instances})
+
+
+def after_commit(function, *args):
+    """Call `function(*args)` once the write's transaction commits, or now outside one"""
+    transaction.on_commit(lambda: function(*args))
+
+
+# The calendar cache is changed once the write commits. A feed read in
+# between would otherwise cache the gamer's events as they were before the
+# write, and a rolled back save would leave its VEVENT behind.
+
+@receiver(post_save, sender=Event)
+def refresh_event_calendars(sender, instance, created, raw=False, **kwargs):
+    """Re-render a saved event for the calendars it is on"""
+    if raw:
+        return
+    after_commit(calendars.refresh_event, instance, instance.game.title)
+    previous_organizer_id = getattr(instance, '_previous_organizer_id', None)
+    if created or previous_organizer_id != instance.organizer_id:
+        organizer_ids = {instance.organizer_id, previous_organizer_id} - {None}
+        after_commit(calendars.forget_gamers, organizer_ids)
+
+
+@receiver(post_delete, sender=Event)
+def forget_event_calendars(sender, instance, **kwargs):
+    # Its attendees' sign ups are deleted first, which forgets their calendars
+    after_commit(calendars.forget_events, [instance.pk])
+    after_commit(calendars.forget_gamers, [instance.organizer_id])
+
+
+@receiver(post_save, sender=Game)
+def forget_game_calendars(sender, instance, created, raw=False, **kwargs):
+    """Drop the rendered events of a game, which show its title"""
+    if not created and not raw:
+        after_commit(calendars.forget_events, list(instance.events.values_list('pk', flat=True)))
+
+
+@receiver(bulk_saved, sender=Game)
+def forget_bulk_saved_game_calendars(sender, instances, **kwargs):
+    after_commit(calendars.forget_events, list(Event.objects.filter(
+        game_id__in={game.pk for game in instances}
+    ).values_list('pk', flat=True)))
+
+
+@receiver(post_save, sender=EventGamer)
+@receiver(post_delete, sender=EventGamer)
+def forget_attendee_calendar(sender, instance, raw=False, **kwargs):
+    if not raw:
+        after_commit(calendars.forget_gamers, [instance.gamer_id])
+
+
+@receiver(m2m_changed, sender=Event.attendees.through)
+def forget_added_attendee_calendars(sender, instance, action, reverse, pk_set, **kwargs):
+    """Forget the calendars of gamers added with `attendees.add()`, which sends no post_save"""
+    if action != 'post_add' or not pk_set:
+        return
+    after_commit(calendars.forget_gamers, [instance.pk] if reverse else set(pk_set))
+
+
+@receiver(bulk_saved, sender=Event)
+def forget_bulk_saved_event_calendars(sender, instances, **kwargs):
+    after_commit(calendars.forget_events, [event.pk for event in instances])
+    after_commit(calendars.forget_gamers, {event.organizer_id for event in instances})
+
+
+@receiver(bulk_saved, sender=EventGamer)
+def forget_bulk_saved_attendee_calendars(sender, instances, **kwargs):
+    after_commit(calendars.forget_gamers, {attendee.gamer_id for attendee in instances})
+
+
+@receiver(post_save, sender=Game)
+def index_saved_game(sender, instance, **kwargs):
+    search.index_games([instance])
+
+
+@receiver(post_delete, sender=Game)
+def unindex_deleted_game(sender, instance, **kwargs):
+    search.remove(search.GAME, [instance.pk])
+
+
+@receiver(bulk_saved, sender=Game)
+def index_bulk_saved_games(sender, instances, **kwargs):
+    search.index_games(instances)
+
+
+@receiver(post_save, sender=Event)
+def index_saved_event(sender, instance, **kwargs):
+    search.index_events([instance])
+
+
+@receiver(post_delete, sender=Event)
+def unindex_deleted_event(sender, instance, **kwargs):
+    search.remove(search.EVENT, [instance.pk])
+
+
+@receiver(bulk_saved, sender=Event)
+def index_bulk_saved_events(sender, instances, **kwargs):
+    search.index_events(instances)
+
+
+# The suggestions are changed once the write commits, so a rolled back
+# write never reaches the index
+
+@receiver(post_save, sender=Game)
+def suggest_saved_game(sender, instance, **kwargs):
+    pk, title, maker = instance.pk, instance.title, instance.maker
+    transaction.on_commit(lambda: game_suggestions.changed(pk, title, maker))
+
+
+@receiver(post_delete, sender=Game)
+def forget_deleted_game_suggestion(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: game_suggestions.changed(pk))
+
+
+@receiver(bulk_saved, sender=Game)
+def suggest_bulk_saved_games(sender, instances, **kwargs):
+    games = [(game.pk, game.title, game.maker) for game in instances]
+
+    def apply():
+        for game in games:
+            game_suggestions.changed(*game)
+    transaction.on_commit(apply)
+
+
+# Tokens are forgotten once the write commits. A request in between would
+# otherwise look the old credentials up again and cache them.
+
+def forget_tokens_of(user_id):
+    transaction.on_commit(
+        lambda: token_cache.discard_where(lambda key, value: value[0].pk == user_id)
+    )
+
+
+@receiver(post_delete, sender=Token)
+def forget_deleted_token(sender, instance, **kwargs):
+    key = instance.key
+    transaction.on_commit(lambda: token_cache.discard(key))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_user_tokens(sender, instance, **kwargs):
+    """Re-check tokens for a user that was changed, deactivated or removed"""
+    forget_tokens_of(instance.pk)
+
+
+@receiver(post_save, sender=Gamer)
+@receiver(post_delete, sender=Gamer)
+def forget_gamer_tokens(sender, instance, **kwargs):
+    forget_tokens_of(instance.user_id)
+
+
+# Which collections show each model, directly or nested inside another
+# object. Saving or deleting one of these models gives every collection
+# listed for it a new version stamp once the write commits.
+SHOWN_IN = {
+    GameType: (versions.GAME_TYPES, versions.GAMES, versions.EVENTS),
+    Game: (versions.GAMES, versions.EVENTS),
+    Event: (versions.EVENTS, versions.GAMES),
+    EventGamer: (versions.EVENTS,),
+    Gamer: (versions.GAMES, versions.EVENTS),
+    User: (versions.GAMES, versions.EVENTS),
+}
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def bump_collection_versions(sender, update_fields=None, **kwargs):
+    collections = SHOWN_IN.get(sender)
+    if collections is None:
+        return
+    # Logging in only touches last_login, which no collection shows
+    if sender is User and update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    versions.bump_on_commit(*collections)
+
+
+@receiver(bulk_saved)
+def bump_bulk_saved_versions(sender, **kwargs):
+    collections = SHOWN_IN.get(sender)
+    if collections is not None:
+        versions.bump_on_commit(*collections)
+
+
+@receiver(m2m_changed, sender=Event.attendees.through)
+def bump_attendance_versions(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        versions.bump_on_commit(*SHOWN_IN[EventGamer])
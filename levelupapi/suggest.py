@@ -0,0 +1,205 @@
+"""Typeahead suggestions for game titles and makers
+
+`game_suggestions` is an in-process prefix index over the start of every
+word of every game's title and maker, so "ride" suggests "Ticket to
+Ride". The word starts are kept in one sorted list and searched with
+bisect, which takes far less memory than a trie with a node per
+character, and a lookup costs microseconds and no queries.
+
+The index is built from the games table the first time it is used. The
+handlers in levelupapi.signals apply each game saved or deleted in this
+process as it happens. Writes bump the `gamenames` version stamp, and an
+index that finds a stamp it did not set rebuilds itself on its next use,
+so changes other processes make are picked up too.
+
+At most SUGGEST_INDEX_SIZE word starts are kept, those of the games with
+the most events. Lookups that come up short on a partial index are
+finished with a query.
+"""
+import threading
+import unicodedata
+from array import array
+from bisect import bisect_left, bisect_right
+
+from django.conf import settings
+from django.db.models import Q
+
+from levelupapi import versions
+from levelupapi.models import Game
+
+# Word starts are cut to this many characters, which bounds the memory
+# each takes. Longer prefixes are checked against the whole text.
+KEY_LENGTH = 24
+
+
+def normalize(text):
+    """Casefold, strip accents and collapse whitespace, for matching"""
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    return ' '.join(''.join(
+        char for char in decomposed if not unicodedata.combining(char)
+    ).split())
+
+
+def word_suffixes(text):
+    """The rest of `text` from the start of each of its words, normalized"""
+    text = normalize(text)
+    return [text[start:] for start in [0, *(
+        index + 1 for index, char in enumerate(text) if char == ' '
+    )] if start < len(text)]
+
+
+def word_starts(*texts):
+    """The keys a game is indexed under"""
+    return {suffix[:KEY_LENGTH] for text in texts for suffix in word_suffixes(text)}
+
+
+class PrefixIndex:
+    """Suggests games whose title or maker has a word starting with a prefix
+
+    Each key is stored in `_keys`, in order, with the id of its game at
+    the same position of `_ids`. `_games` holds the title and maker to
+    suggest for each indexed game.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._keys = []
+        self._ids = array('q')
+        self._games = {}
+        self._complete = True
+        # The `gamenames` stamp the index is up to date with; None until built
+        self._stamp = None
+
+    def suggest(self, prefix, limit=10):
+        """Return up to `limit` games as {id, title, maker}, by the word that matched"""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        self.refresh()
+
+        probe = prefix[:KEY_LENGTH]
+        found = {}
+        with self._lock:
+            for position in range(bisect_left(self._keys, probe), len(self._keys)):
+                if not self._keys[position].startswith(probe):
+                    break
+                pk = self._ids[position]
+                if pk in found:
+                    continue
+                title, maker = self._games[pk]
+                if len(prefix) > KEY_LENGTH and not any(
+                    suffix.startswith(prefix) for suffix in word_suffixes(f'{title} {maker}')
+                ):
+                    continue
+                found[pk] = {'id': pk, 'title': title, 'maker': maker}
+                if len(found) == limit:
+                    break
+            complete = self._complete
+
+        suggestions = list(found.values())
+        if len(suggestions) < limit and not complete:
+            suggestions += self.query(prefix, limit - len(suggestions), exclude=found)
+        return suggestions
+
+    @staticmethod
+    def query(prefix, limit, exclude=()):
+        """Look games up in the table, for prefixes a partial index may have missed"""
+        matches = Q()
+        for field in ('title', 'maker'):
+            matches |= Q(**{f'{field}__istartswith': prefix})
+            matches |= Q(**{f'{field}__icontains': f' {prefix}'})
+        return list(
+            Game.objects.filter(matches).exclude(pk__in=list(exclude))
+            .order_by('title', 'pk').values('id', 'title', 'maker')[:limit]
+        )
+
+    def refresh(self):
+        """Rebuild the index if it was never built or games changed elsewhere"""
+        stamp = self.current_stamp()
+        if stamp != self._stamp:
+            self.rebuild(stamp)
+
+    def rebuild(self, stamp=None):
+        # Read the stamp first, so a change made while the games are read
+        # is picked up by the next refresh
+        if stamp is None:
+            stamp = self.current_stamp()
+        entries, games, complete = [], {}, True
+        rows = Game.objects.order_by('-event_count', 'pk').values_list('pk', 'title', 'maker')
+        for pk, title, maker in rows.iterator():
+            keys = word_starts(title, maker)
+            if len(entries) + len(keys) > self.maxsize:
+                complete = False
+                break
+            games[pk] = (title, maker)
+            entries.extend((key, pk) for key in keys)
+        entries.sort()
+
+        with self._lock:
+            self._keys = [key for key, _ in entries]
+            self._ids = array('q', (pk for _, pk in entries))
+            self._games = games
+            self._complete = complete
+            self._stamp = stamp
+
+    def changed(self, pk, title=None, maker=None):
+        """Apply a game saved in this process, or deleted when `title` is None"""
+        previous = self.current_stamp()
+        # The stamp this write set, not whatever is in the cache by now,
+        # which may be another process's that this index has not applied
+        stamp = versions.bump(versions.GAME_NAMES)[versions.GAME_NAMES][0]
+
+        with self._lock:
+            if self._stamp != previous:
+                # Never built, or behind already; the next lookup rebuilds it
+                return
+            self._discard(pk)
+            if title is not None:
+                self._add(pk, title, maker)
+            self._stamp = stamp
+
+    def _discard(self, pk):
+        game = self._games.pop(pk, None)
+        if game is None:
+            return
+        for key in word_starts(*game):
+            start = bisect_left(self._keys, key)
+            end = bisect_right(self._keys, key, lo=start)
+            for position in range(start, end):
+                if self._ids[position] == pk:
+                    del self._keys[position]
+                    del self._ids[position]
+                    break
+
+    def _add(self, pk, title, maker):
+        keys = word_starts(title, maker)
+        if len(self._keys) + len(keys) > self.maxsize:
+            self._complete = False
+            return
+        self._games[pk] = (title, maker)
+        for key in keys:
+            position = bisect_right(self._keys, key)
+            self._keys.insert(position, key)
+            self._ids.insert(position, pk)
+
+    def clear(self):
+        with self._lock:
+            self._keys, self._ids, self._games = [], array('q'), {}
+            self._complete, self._stamp = True, None
+
+    def stats(self):
+        with self._lock:
+            return {
+                'games': len(self._games),
+                'keys': len(self._keys),
+                'maxsize': self.maxsize,
+                'complete': self._complete,
+            }
+
+    @staticmethod
+    def current_stamp():
+        return versions.get_stamps(versions.GAME_NAMES)[versions.GAME_NAMES][0]
+
+
+game_suggestions = PrefixIndex(settings.SUGGEST_INDEX_SIZE)
@@ -0,0 +1,149 @@
+"""Version stamps for the API's collections, used for conditional GETs
+
+Every collection (`games`, `events`, `gametypes`) has a stamp in the
+default cache that changes whenever anything shown in its responses
+changes. The handlers in levelupapi.signals bump the stamps on writes.
+A response's ETag is derived from the stamps it depends on, so clients
+can revalidate with `If-None-Match` and get a 304 without the view
+querying or serializing anything.
+
+The stamps live in the default cache, so deployments with more than one
+process need a shared cache backend (see CACHES in settings); with
+WEB_CONCURRENCY above one the server will not start on a local memory
+backend.
+"""
+import hashlib
+import time
+import uuid
+from datetime import datetime, timezone
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone as django_timezone
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+
+GAME_TYPES = 'gametypes'
+GAMES = 'games'
+EVENTS = 'events'
+# Not an endpoint: the titles and makers behind the game suggestions
+# (see levelupapi.suggest), which change far less often than the games
+GAME_NAMES = 'gamenames'
+
+
+def _key(collection):
+    return f'levelup:version:{collection}'
+
+
+def _new_stamp():
+    # A random version cannot collide with one handed out before a cache
+    # restart, so a client can never revalidate against a lost stamp
+    return (uuid.uuid4().hex, time.time())
+
+
+def bump(*collections):
+    """Give each collection a new version stamp, and return {collection: stamp}"""
+    stamps = {collection: _new_stamp() for collection in collections}
+    cache.set_many({_key(collection): stamp for collection, stamp in stamps.items()}, timeout=None)
+    return stamps
+
+
+def bump_on_commit(*collections):
+    """Bump the stamps once the current transaction commits, or now outside one
+
+    A stamp bumped before the write commits would let a GET in between
+    cache the old rows, and hand out an ETag for them, under the new stamp.
+    """
+    transaction.on_commit(lambda: bump(*collections))
+
+
+def get_stamps(*collections):
+    """Return {collection: (version, modified timestamp)}, creating missing stamps"""
+    keys = {_key(collection): collection for collection in collections}
+    found = cache.get_many(keys)
+    for key in set(keys) - set(found):
+        cache.add(key, _new_stamp(), timeout=None)
+        found[key] = cache.get(key)
+    return {keys[key]: stamp for key, stamp in found.items()}
+
+
+async def aget_stamps(*collections):
+    """get_stamps for async views, reading the cache without blocking the event loop"""
+    keys = {_key(collection): collection for collection in collections}
+    found = await cache.aget_many(keys)
+    for key in set(keys) - set(found):
+        await cache.aadd(key, _new_stamp(), timeout=None)
+        found[key] = await cache.aget(key)
+    return {keys[key]: stamp for key, stamp in found.items()}
+
+
+def request_stamps(request, collections):
+    """Return the stamps for `collections`, looking them up once per request"""
+    looked_up = getattr(request, '_collection_stamps', None)
+    if looked_up is None:
+        looked_up = request._collection_stamps = {}
+    if collections not in looked_up:
+        looked_up[collections] = get_stamps(*collections)
+    return looked_up[collections]
+
+
+async def arequest_stamps(request, collections):
+    """request_stamps for async views
+
+    Once awaited, fingerprint and last_modified find the stamps on the
+    request and do not touch the cache themselves.
+    """
+    looked_up = getattr(request, '_collection_stamps', None)
+    if looked_up is None:
+        looked_up = request._collection_stamps = {}
+    if collections not in looked_up:
+        looked_up[collections] = await aget_stamps(*collections)
+    return looked_up[collections]
+
+
+def fingerprint(request, collections, per_viewer=False, daily=False):
+    """Hash everything a GET response depends on into a short string
+
+    That is the stamps of `collections`, the host, path and query string,
+    and with `per_viewer` the requesting gamer, for responses that include
+    fields like `joined` that differ from gamer to gamer. With `daily` the
+    current date is included too, for responses that depend on what day
+    it is, like the upcoming events.
+    """
+    stamps = request_stamps(request, collections)
+    parts = [request.get_host(), request.path, request.META.get('QUERY_STRING', '')]
+    parts += [stamps[collection][0] for collection in collections]
+    if per_viewer:
+        # Gamer and user ids overlap, so each is tagged with what it is
+        gamer = getattr(request, 'gamer', None)
+        parts.append(f'g{gamer.pk}' if gamer is not None else f'u{request.user.pk}')
+    if daily:
+        parts.append(django_timezone.localdate().isoformat())
+    return hashlib.sha1('|'.join(parts).encode()).hexdigest()
+
+
+def last_modified(request, collections, daily=False):
+    """When anything a GET response depends on last changed"""
+    stamps = request_stamps(request, collections)
+    modified = datetime.fromtimestamp(
+        max(stamps[collection][1] for collection in collections), tz=timezone.utc
+    )
+    if daily:
+        # Nothing fetched before today's midnight is still current
+        today = django_timezone.localdate()
+        midnight = django_timezone.make_aware(datetime.combine(today, datetime.min.time()))
+        modified = max(modified, midnight)
+    return modified
+
+
+def conditional(*collections, per_viewer=False, daily=False):
+    """Decorate a view method to answer conditional GETs from version stamps"""
+    def etag_func(request, *args, **kwargs):
+        return fingerprint(request, collections, per_viewer, daily)
+
+    def last_modified_func(request, *args, **kwargs):
+        return last_modified(request, collections, daily)
+
+    return method_decorator(
+        condition(etag_func=etag_func, last_modified_func=last_modified_func)
+    )
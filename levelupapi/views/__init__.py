@@ -2,3 +2,6 @@ from .auth import login_user, register_user
 from .game_type import GameTypeView
 from .game import GameView
 from .event import EventView
+from .gamer import GamerView
+from .search import SearchView
+from .stats import cache_stats
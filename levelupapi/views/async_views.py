@@ -0,0 +1,132 @@
+"""Async read paths for the events, games and game types lists
+
+Under an ASGI server (see levelup/asgi.py) these views read with Django's
+async ORM, so a worker serves other requests while it waits on the
+database instead of holding a thread. levelup.async_urls routes them in
+front of the DRF viewsets, and ROOT_URLCONF points there when
+ASYNC_READ_VIEWS is on.
+
+They answer GET and HEAD like the viewsets' list actions do, with the
+same authentication, filters, fieldsets, pagination, response cache and
+ETags, and hand every other method to the viewset. The version stamps
+and cached responses are read through the async cache API, so a cache
+on Redis, files or the database does not block the event loop either.
+
+Under ASGI, Django reads a StreamingHttpResponse whose content is a plain
+(sync) iterator into memory before sending any of it. The report exports
+in levelupreports are streamed that way, so under an ASGI server they
+lose their constant memory use; serve them from a WSGI server when the
+exports are large.
+"""
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.urls import path
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions
+from rest_framework.request import Request
+
+from levelupapi import versions
+from levelupapi.authentication import GamerTokenAuthentication
+from levelupapi.caching import response_cache, response_key
+from levelupapi.models import GameType
+from levelupapi.renderers import FastJSONRenderer
+from levelupapi.views.event import EventView
+from levelupapi.views.game import GameView
+from levelupapi.views.game_type import GameTypeSerializer, GameTypeView
+from levelupapi.views.pagination import EventPagination
+from levelupapi.views.values import ValuesSerializer
+
+
+async def read_events(request):
+    serializer = EventView.list_serializer(request, request.gamer)
+    paginator = EventPagination()
+    page = await paginator.apaginate_queryset(
+        serializer.values(*EventPagination.ordering), request
+    )
+    data = await serializer.ato_representation(page)
+    return paginator.get_paginated_response(data).data
+
+
+async def read_games(request):
+    serializer = GameView.list_serializer(request)
+    return await serializer.ato_representation([row async for row in serializer.values()])
+
+
+async def read_game_types(request):
+    serializer = ValuesSerializer(GameTypeSerializer(), GameType.objects.all())
+    return await serializer.ato_representation([row async for row in serializer.values()])
+
+
+def read_view(read, viewset, actions, basename, *collections, per_viewer=False, daily=False):
+    """Build an async view that serves GETs with `read` and the rest with `viewset`
+
+    `read` is an async function that takes the request and returns the
+    response data. `collections`, `per_viewer` and `daily` are what the
+    viewset's list action passes to versions.conditional and
+    cached_response.
+    """
+    fallback = viewset.as_view(actions, basename=basename, detail=False)
+    authentication = GamerTokenAuthentication()
+
+    async def view(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return await sync_to_async(fallback)(request, *args, **kwargs)
+
+        try:
+            credentials = await authentication.aauthenticate(request)
+            if credentials is None:
+                raise exceptions.NotAuthenticated()
+            request.user = credentials[0]
+
+            await versions.arequest_stamps(request, collections)
+            etag = quote_etag(versions.fingerprint(request, collections, per_viewer, daily))
+            modified = int(versions.last_modified(request, collections, daily).timestamp())
+            response = get_conditional_response(request, etag=etag, last_modified=modified)
+            if response is None:
+                key = response_key(request, collections, per_viewer, daily)
+                data = await response_cache.aget(key)
+                if data is None:
+                    data = await read(Request(request))
+                    await response_cache.aset(key, data)
+                response = HttpResponse(
+                    FastJSONRenderer().render(data), content_type='application/json'
+                )
+        except exceptions.APIException as exc:
+            return exception_response(exc, authentication)
+
+        response.headers.setdefault('ETag', etag)
+        if not response.has_header('Last-Modified'):
+            response.headers['Last-Modified'] = http_date(modified)
+        patch_vary_headers(response, ('Accept',))
+        return response
+
+    return csrf_exempt(view)
+
+
+def exception_response(exc, authentication):
+    """Render an API exception the way DRF's exception handler does"""
+    if isinstance(exc.detail, (list, dict)):
+        data = exc.detail
+    else:
+        data = {'detail': exc.detail}
+    response = HttpResponse(FastJSONRenderer().render(data), content_type='application/json',
+                            status=exc.status_code)
+    if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+        response.headers['WWW-Authenticate'] = authentication.authenticate_header(None)
+    return response
+
+
+urlpatterns = [
+    path('events', read_view(
+        read_events, EventView, {'get': 'list', 'post': 'create'}, 'event',
+        versions.EVENTS, per_viewer=True, daily=True
+    )),
+    path('games', read_view(
+        read_games, GameView, {'get': 'list', 'post': 'create'}, 'game', versions.GAMES
+    )),
+    path('gametypes', read_view(
+        read_game_types, GameTypeView, {'get': 'list'}, 'gametype', versions.GAME_TYPES
+    )),
+]
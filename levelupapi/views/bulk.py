@@ -0,0 +1,47 @@
+"""Helpers shared by the bulk create, update and delete endpoints"""
+from rest_framework import serializers
+
+# Rows written per INSERT/UPDATE statement by the bulk endpoints
+BATCH_SIZE = 500
+
+
+class BatchError(Exception):
+    """Raised when a request body is not a batch at all"""
+
+
+def batch_items(request):
+    """Return the list of items sent in the body of a bulk request"""
+    if not isinstance(request.data, list):
+        raise BatchError('Expected a list of items')
+    return request.data
+
+
+def validate_batch(items, serializer_class):
+    """Validate each item of a batch on its own
+
+    Returns:
+        tuple -- (valid, errors) where valid is a list of
+        (index, validated data) pairs and errors a list of item errors
+    """
+    valid, errors = [], []
+    for index, item in enumerate(items):
+        serializer = serializer_class(data=item)
+        if serializer.is_valid():
+            valid.append((index, serializer.validated_data))
+        else:
+            errors.append(item_error(index, serializer.errors))
+    return valid, errors
+
+
+def item_error(index, errors):
+    """Describe what was wrong with the item at `index` of a batch"""
+    return {'index': index, 'errors': errors}
+
+
+def sorted_errors(errors):
+    return sorted(errors, key=lambda error: error['index'])
+
+
+class BulkDeleteSerializer(serializers.Serializer):
+    """Validates the list of primary keys sent to a bulk delete"""
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
@@ -1,61 +1,95 @@
+import copy
 from django.http import HttpResponseServerError
 from django.core.exceptions import ValidationError
+from django.contrib.auth.models import User
+from django.db import transaction
 from rest_framework.viewsets import ViewSet
+from levelupapi import versions
+from levelupapi.caching import cached_response
 from rest_framework.response import Response
 from rest_framework import serializers, status
-from levelupapi.models import Event, Gamer, Game
+from levelupapi.models import Event, EventGamer, Gamer, Game
 from rest_framework.decorators import action
-from django.db.models import Count, Q
+from levelupapi.signals import bulk_saved
+from levelupapi.views import bulk
+from levelupapi.views.fields import SparseFieldsMixin, sparse_fieldset
+from levelupapi.views.game_type import GameTypeSerializer
+from levelupapi.views.pagination import EventPagination
+from levelupapi.views.values import ValuesSerializer
 
 
 class EventView(ViewSet):
     """Level up game types"""
 
+    @cached_response(versions.EVENTS, per_viewer=True)
     def retrieve(self, request, pk=None):
         """Handle GET requests for single game type
 
         Returns:
             Response -- JSON serialized game type
         """
-        gamer = Gamer.objects.get(user=request.auth.user)
+        gamer = request.gamer
+        fieldset = sparse_fieldset(request)
 
         try:
-            event = Event.objects.annotate(
-                attendees_count=Count('attendees'),
-                joined=Count(
-                    'attendees',
-                    filter=Q(attendees=gamer)
-                )
+            event = EventSerializer.setup_eager_loading(
+                Event.objects.with_viewer_state(gamer), **fieldset
             ).get(pk=pk)
 
 
-            serializer = EventSerializer(event)
+            serializer = EventSerializer(event, **fieldset)
             return Response(serializer.data)
         except Event.DoesNotExist as ex:
             return Response({'message': ex.args[0]}, status=status.HTTP_404_NOT_FOUND)
 
 
+    @versions.conditional(versions.EVENTS, per_viewer=True, daily=True)
+    @cached_response(versions.EVENTS, per_viewer=True, daily=True)
     def list(self, request):
         """Handle GET requests to get all events
 
+        Events come back one page at a time in date, time, id order.
+        Follow the `next` and `previous` links to move between pages and
+        pass `?page_size=` to change how many events are on each page.
+
+        Narrow the events down with any of
+            ?upcoming=true    events from today on (false for past events)
+            ?from=2022-02-01  events on or after a date
+            ?to=2022-02-14    events on or before a date
+            ?game=1           events for a game
+            ?organizer=1      events organized by a gamer
+            ?joined=true      events the gamer has signed up for
+
+        and pick what each event includes with `?fields=` and `?expand=`
+        (see levelupapi.views.fields).
+
         Returns:
-            Response -- JSON serialized list of events
+            Response -- JSON serialized page of events
         """
-        gamer = Gamer.objects.get(user=request.auth.user)
-
-        # Add 'joined' property through annotate using Q
-        # instead of true/false, joined value will be binary (1 or 0)      
-        events = Event.objects.annotate(
-            attendees_count=Count('attendees'),
-            joined=Count(
-                'attendees',
-                filter=Q(attendees=gamer)
-            )
+        gamer = request.gamer
+
+        serializer = self.list_serializer(request, gamer)
+        paginator = EventPagination()
+        page = paginator.paginate_queryset(
+            serializer.values(*EventPagination.ordering), request, view=self
         )
+        return paginator.get_paginated_response(serializer.to_representation(page))
 
+    @staticmethod
+    def list_serializer(request, gamer):
+        """Build the ValuesSerializer for the events a list request asks for
+
+        Shared with the async events list in levelupapi.views.async_views.
+        """
+        filters = EventFilterSerializer(data=request.query_params.dict())
+        filters.is_valid(raise_exception=True)
 
-        serializer = EventSerializer(events, many=True)
-        return Response(serializer.data)
+        # Add whether the gamer has joined each event and how many
+        # gamers have, without grouping the events by their attendees
+        events = filters.filter(Event.objects.with_viewer_state(gamer), gamer)
+
+        # Serialize the page straight from .values() rows
+        return ValuesSerializer(EventSerializer(**sparse_fieldset(request)), events)
 
     def create(self, request):
         """Handle POST operations
@@ -65,26 +99,25 @@ class EventView(ViewSet):
         """
 
         # Uses the token passed in the `Authorization` header
-        gamer = Gamer.objects.get(user=request.auth.user)
+        gamer = request.gamer
         game = Game.objects.get(pk=request.data["gameId"])
 
 
         # Create a new Python instance of the Event class
         # and set its properties from what was sent in the
-        # body of the request from the client.
-        event = Event.objects.create(
-            game = game,
-            description = request.data["description"],
-            date = request.data["date"],
-            time = request.data["time"],
-            organizer = gamer
-        )
-
-        # Try to save the new game to the database, then
-        # serialize the game instance as JSON, and send the
-        # JSON as a response to the client request
+        # body of the request from the client. The game's
+        # event count is bumped in the same transaction.
+        # Then serialize the event instance as JSON, and send
+        # the JSON as a response to the client request
         try:
-            event.save()
+            with transaction.atomic():
+                event = Event.objects.create(
+                    game = game,
+                    description = request.data["description"],
+                    date = request.data["date"],
+                    time = request.data["time"],
+                    organizer = gamer
+                )
             serializer = EventSerializer(event)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
@@ -122,8 +155,9 @@ class EventView(ViewSet):
 
 
     def destroy(self, request, pk):
-        event = Event.objects.get(pk=pk)
-        event.delete()
+        with transaction.atomic():
+            event = Event.objects.get(pk=pk)
+            event.delete()
         return Response(None, status=status.HTTP_204_NO_CONTENT)
 
 
@@ -131,27 +165,317 @@ class EventView(ViewSet):
     def signup(self, request, pk):
         """Post request for a user to sign up for an event"""
 
-        gamer = Gamer.objects.get(user=request.auth.user)
-        event = Event.objects.get(pk=pk)
-        event.attendees.add(gamer)
+        gamer = request.gamer
+        with transaction.atomic():
+            event = Event.objects.get(pk=pk)
+            event.attendees.add(gamer)
         return Response({'message': 'Gamer added'}, status=status.HTTP_201_CREATED)
 
 
     @action(methods=['delete'], detail=True)
     def leave(self, request, pk):
-        gamer = Gamer.objects.get(user=request.auth.user)
-        event = Event.objects.get(pk=pk)
-        event.attendees.remove(gamer)
+        gamer = request.gamer
+        with transaction.atomic():
+            event = Event.objects.get(pk=pk)
+            event.attendees.remove(gamer)
         return Response({'message': 'Gamer removed'}, status=status.HTTP_204_NO_CONTENT)
 
+    @action(methods=['post', 'put', 'delete'], detail=False)
+    def bulk(self, request):
+        """Handle batches of events in a single request
 
+        POST a list of events shaped like the body of a single POST to
+        create them, PUT a list of events that also have an `id` to update
+        them, or DELETE with `{"ids": [...]}` to remove them. Every item is
+        validated on its own and the valid ones are written together in
+        one transaction; the invalid ones are reported back by index
+        without stopping the rest of the batch.
 
-class EventSerializer(serializers.ModelSerializer):
+        Returns:
+            Response -- ids written and errors for the items that were not
+        """
+        try:
+            if request.method == 'DELETE':
+                return self.bulk_destroy(request)
+            items = bulk.batch_items(request)
+        except bulk.BatchError as ex:
+            return Response({'message': ex.args[0]}, status=status.HTTP_400_BAD_REQUEST)
+
+        if request.method == 'PUT':
+            return self.bulk_update(request, items)
+        return self.bulk_create(request, items)
+
+    def bulk_create(self, request, items):
+        valid, errors = bulk.validate_batch(items, EventBulkSerializer)
+        games = self.existing_games(valid)
+
+        events = []
+        for index, data in valid:
+            if data['gameId'] not in games:
+                errors.append(bulk.item_error(index, {'gameId': ['Game does not exist.']}))
+                continue
+            events.append(Event(
+                game_id = data["gameId"],
+                description = data["description"],
+                date = data["date"],
+                time = data["time"],
+                organizer = request.gamer
+            ))
+
+        with transaction.atomic():
+            Event.objects.bulk_create(events, batch_size=bulk.BATCH_SIZE)
+            bulk_saved.send(sender=Event, instances=events, created=True)
+
+        return Response(
+            {'created': [event.id for event in events], 'errors': bulk.sorted_errors(errors)},
+            status=status.HTTP_201_CREATED if events else status.HTTP_400_BAD_REQUEST
+        )
+
+    def bulk_update(self, request, items):
+        valid, errors = bulk.validate_batch(items, EventBulkUpdateSerializer)
+        games = self.existing_games(valid)
+        existing = Event.objects.in_bulk([data['id'] for _, data in valid])
+
+        events, previous = {}, {}
+        for index, data in valid:
+            event = existing.get(data['id'])
+            if event is None:
+                errors.append(bulk.item_error(index, {'id': ['Event does not exist.']}))
+                continue
+            if data['gameId'] not in games:
+                errors.append(bulk.item_error(index, {'gameId': ['Game does not exist.']}))
+                continue
+            previous.setdefault(event.id, copy.copy(event))
+            event.game_id = data["gameId"]
+            event.description = data["description"]
+            event.date = data["date"]
+            event.time = data["time"]
+            events[event.id] = event
+
+        with transaction.atomic():
+            Event.objects.bulk_update(
+                events.values(), ['game', 'description', 'date', 'time'],
+                batch_size=bulk.BATCH_SIZE
+            )
+            bulk_saved.send(
+                sender=Event, instances=list(events.values()), created=False,
+                previous=list(previous.values())
+            )
+
+        return Response(
+            {'updated': list(events), 'errors': bulk.sorted_errors(errors)},
+            status=status.HTTP_200_OK if events else status.HTTP_400_BAD_REQUEST
+        )
+
+    def bulk_destroy(self, request):
+        serializer = bulk.BulkDeleteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data['ids']
+
+        with transaction.atomic():
+            events = Event.objects.filter(pk__in=ids)
+            found = set(events.values_list('pk', flat=True))
+            events.delete()
+
+        errors = [
+            bulk.item_error(index, {'id': ['Event does not exist.']})
+            for index, pk in enumerate(ids) if pk not in found
+        ]
+        return Response({'deleted': sorted(found), 'errors': errors}, status=status.HTTP_200_OK)
+
+    @action(methods=['post'], detail=False)
+    def attendance(self, request):
+        """Sign many gamers up for, or out of, many events at once
+
+        The body has `add` and `remove` lists of `{"event": id, "gamer": id}`
+        pairs. Organizers can sign anyone up for their own events and every
+        gamer can sign themselves up for any event. Pairs that are already
+        in the requested state are left alone, so sending the same batch
+        twice changes nothing the second time.
+
+        Returns:
+            Response -- pairs added and removed, and errors by list and index
+        """
+        serializer = AttendanceSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        to_add = serializer.validated_data['add']
+        to_remove = serializer.validated_data['remove']
+        pairs = to_add + to_remove
+
+        # Look up every event, gamer and existing sign up in the batch at once
+        organizers = dict(Event.objects.filter(
+            pk__in={pair['event'] for pair in pairs}
+        ).values_list('pk', 'organizer_id'))
+        gamers = set(Gamer.objects.filter(
+            pk__in={pair['gamer'] for pair in pairs}
+        ).values_list('pk', flat=True))
+        existing = {
+            (event_id, gamer_id): pk
+            for pk, event_id, gamer_id in EventGamer.objects.filter(
+                event_id__in=organizers, gamer_id__in=gamers
+            ).values_list('pk', 'event_id', 'gamer_id')
+        }
+
+        errors = []
+
+        def allowed(action_name, index, pair):
+            if pair['event'] not in organizers:
+                problem = {'event': ['Event does not exist.']}
+            elif pair['gamer'] not in gamers:
+                problem = {'gamer': ['Gamer does not exist.']}
+            elif request.gamer is None or request.gamer.pk not in (
+                pair['gamer'], organizers[pair['event']]
+            ):
+                problem = {'gamer': ['Only the organizer can change other gamers.']}
+            else:
+                return True
+            errors.append(dict(bulk.item_error(index, problem), list=action_name))
+            return False
+
+        added = {}
+        for index, pair in enumerate(to_add):
+            key = (pair['event'], pair['gamer'])
+            if allowed('add', index, pair) and key not in existing:
+                added[key] = EventGamer(event_id=key[0], gamer_id=key[1])
+
+        removed = {}
+        for index, pair in enumerate(to_remove):
+            key = (pair['event'], pair['gamer'])
+            if allowed('remove', index, pair) and key in existing and key not in added:
+                removed[key] = existing[key]
+
+        with transaction.atomic():
+            EventGamer.objects.bulk_create(
+                added.values(), batch_size=bulk.BATCH_SIZE, ignore_conflicts=True
+            )
+            bulk_saved.send(sender=EventGamer, instances=list(added.values()), created=True)
+            EventGamer.objects.filter(pk__in=removed.values()).delete()
+
+        return Response({
+            'added': [{'event': event, 'gamer': gamer} for event, gamer in added],
+            'removed': [{'event': event, 'gamer': gamer} for event, gamer in removed],
+            'errors': errors,
+        }, status=status.HTTP_200_OK)
+
+    @staticmethod
+    def existing_games(valid):
+        """Look up every game a batch refers to with one query"""
+        ids = {data['gameId'] for _, data in valid}
+        return set(Game.objects.filter(pk__in=ids).values_list('pk', flat=True))
+
+
+
+class UserSerializer(serializers.ModelSerializer):
+    """JSON serializer for the public part of a gamer's user account
+    """
+    class Meta:
+        model = User
+        fields = ('id', 'username', 'first_name', 'last_name', 'email')
+
+
+class GamerSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """JSON serializer for gamers along with their user account
+    """
+    user = UserSerializer()
+
+    class Meta:
+        model = Gamer
+        fields = ('id', 'bio', 'user')
+
+
+class EventGameSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """JSON serializer for the game an event is for
+    """
+    game_type = GameTypeSerializer()
+    gamer = GamerSerializer()
+
+    class Meta:
+        model = Game
+        fields = ('id', 'title', 'maker', 'number_of_players', 'skill_level', 'game_type',
+                  'gamer')
+
+
+class EventSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """JSON serializer for event types
     """
-    attendees_count = serializers.IntegerField(default=None)
+    game = EventGameSerializer()
+    organizer = GamerSerializer()
+    attendees = GamerSerializer(many=True)
+    joined = serializers.BooleanField(default=None)
+
     class Meta:
         model = Event
         fields = ('id', 'game', 'description', 'date', 'time', 'organizer', 'attendees',
                   'joined', 'attendees_count')
-        depth = 3
+
+
+class EventBulkSerializer(serializers.Serializer):
+    """Validates one event of a bulk create"""
+    gameId = serializers.IntegerField()
+    description = serializers.CharField(max_length=55)
+    date = serializers.DateField()
+    time = serializers.TimeField()
+
+
+class EventBulkUpdateSerializer(EventBulkSerializer):
+    """Validates one event of a bulk update"""
+    id = serializers.IntegerField()
+
+
+class AttendancePairSerializer(serializers.Serializer):
+    """Validates one (event, gamer) pair of a batch attendance change"""
+    event = serializers.IntegerField()
+    gamer = serializers.IntegerField()
+
+
+class AttendanceSerializer(serializers.Serializer):
+    """Validates the body of a batch attendance change"""
+    add = AttendancePairSerializer(many=True, required=False, default=list)
+    remove = AttendancePairSerializer(many=True, required=False, default=list)
+
+
+class EventFilterSerializer(serializers.Serializer):
+    """Validates the query parameters that narrow down the events list
+
+    Every filter is a range or equality on an indexed column, so they
+    combine with the keyset pagination into one index range scan. Joined
+    events are found from the gamer's sign ups, through the (gamer, event)
+    index, rather than by checking every event.
+    """
+    upcoming = serializers.BooleanField(required=False)
+    to = serializers.DateField(required=False)
+    game = serializers.IntegerField(required=False)
+    organizer = serializers.IntegerField(required=False)
+    joined = serializers.BooleanField(required=False)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        # `from` is a python keyword, so it cannot be declared above
+        fields['from'] = serializers.DateField(required=False)
+        return fields
+
+    def validate(self, attrs):
+        if 'from' in attrs and 'to' in attrs and attrs['from'] > attrs['to']:
+            raise serializers.ValidationError({'to': ['Must not be before from.']})
+        return attrs
+
+    def filter(self, events, gamer):
+        """Apply the validated filters to a queryset of events viewed by `gamer`"""
+        filters = self.validated_data
+        if 'upcoming' in filters:
+            events = events.upcoming() if filters['upcoming'] else events.past()
+        if 'from' in filters:
+            events = events.filter(date__gte=filters['from'])
+        if 'to' in filters:
+            events = events.filter(date__lte=filters['to'])
+        if 'game' in filters:
+            events = events.filter(game_id=filters['game'])
+        if 'organizer' in filters:
+            events = events.filter(organizer_id=filters['organizer'])
+        if 'joined' in filters:
+            joined = EventGamer.objects.filter(gamer=gamer).values('event_id')
+            if filters['joined']:
+                events = events.filter(pk__in=joined)
+            else:
+                events = events.exclude(pk__in=joined)
+        return events
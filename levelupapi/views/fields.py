@@ -0,0 +1,123 @@
+"""Sparse fieldsets for the API's serializers
+
+Clients pick the fields of a response with `?fields=id,date,game` and the
+relations to nest with `?expand=game,organizer`. Relations that are not
+expanded come back as their ids. Dotted paths expand inside a relation,
+so `?expand=game.gamer` nests the game and its gamer but leaves the
+game's type as an id. Without `expand` every relation is nested as
+before.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+
+def sparse_fieldset(request):
+    """Read `fields` and `expand` from the query string
+
+    Returns:
+        dict -- keyword arguments for a SparseFieldsMixin serializer
+    """
+    options = {}
+    fields = request.query_params.get('fields')
+    if fields is not None:
+        options['fields'] = [name.strip() for name in fields.split(',') if name.strip()]
+    expand = request.query_params.get('expand')
+    if expand is not None:
+        options['expand'] = parse_expand(expand)
+    return options
+
+
+def parse_expand(value):
+    """Turn `game.gamer,organizer` into {'game': {'gamer': None}, 'organizer': None}
+
+    None means the relation is expanded with everything it nests.
+    """
+    tree = {}
+    for path in value.split(','):
+        if not path.strip():
+            continue
+        node = tree
+        *parents, leaf = path.strip().split('.')
+        for name in parents:
+            if node.get(name) is None:
+                node[name] = {}
+            node = node[name]
+        node.setdefault(leaf, None)
+    return tree
+
+
+class SparseFieldsMixin:
+    """Let a serializer leave out fields and nest only the relations asked for
+
+    Takes `fields`, the names of the fields to keep, and `expand`, a tree
+    from `parse_expand` of the relations to nest. Either left out keeps
+    the serializer as declared.
+    """
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+        if expand is not None:
+            for name, field in list(self.fields.items()):
+                many = isinstance(field, serializers.ListSerializer)
+                nested = field.child if many else field
+                if not isinstance(nested, serializers.BaseSerializer):
+                    continue
+
+                source = {} if field.source == name else {'source': field.source}
+                if name not in expand:
+                    self.fields[name] = serializers.PrimaryKeyRelatedField(
+                        read_only=True, many=many, **source
+                    )
+                elif expand[name] is not None and isinstance(nested, SparseFieldsMixin):
+                    self.fields[name] = type(nested)(many=many, expand=expand[name], **source)
+
+    @classmethod
+    def setup_eager_loading(cls, queryset, **options):
+        """Load the relations the serializer will nest, and only those
+
+        Nested relations to one row are joined into the main query and
+        nested relations to many rows are loaded, in primary key order,
+        with one extra query each, so serializing a list costs the same
+        number of queries however long it is. Relations that are only
+        shown as ids are not loaded at all.
+        """
+        related, prefetches = _loading(cls(**options), queryset.model)
+        if related:
+            queryset = queryset.select_related(*related)
+        if prefetches:
+            queryset = queryset.prefetch_related(*prefetches)
+        return queryset
+
+
+def _loading(serializer, model, prefix=''):
+    """Find the select_related paths and prefetches `serializer` needs"""
+    related, prefetches = [], []
+    for field in serializer.fields.values():
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            continue
+        if not model_field.is_relation:
+            continue
+
+        path = prefix + field.source
+        related_model = model_field.related_model
+        if isinstance(field, serializers.ListSerializer):
+            child_related, child_prefetches = _loading(field.child, related_model)
+            queryset = related_model.objects.select_related(*child_related).order_by('pk')
+            if child_prefetches:
+                queryset = queryset.prefetch_related(*child_prefetches)
+            prefetches.append(Prefetch(path, queryset=queryset))
+        elif isinstance(field, serializers.ManyRelatedField):
+            prefetches.append(Prefetch(path, queryset=related_model.objects.only('pk').order_by('pk')))
+        elif isinstance(field, serializers.BaseSerializer):
+            nested_related, nested_prefetches = _loading(field, related_model, path + '__')
+            related += nested_related or [path]
+            prefetches += nested_prefetches
+    return related, prefetches
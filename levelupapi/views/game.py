@@ -3,11 +3,20 @@ from django.core.exceptions import ValidationError
 from rest_framework import status
 from django.http import HttpResponseServerError
 from rest_framework.viewsets import ViewSet
+from levelupapi import versions
+from levelupapi.caching import cached_response
 from rest_framework.response import Response
 from rest_framework import serializers
 from rest_framework import status
-from levelupapi.models import Game, GameType, Gamer, Event
+from levelupapi.models import Game, GameType
+from levelupapi.signals import bulk_saved
+from levelupapi.suggest import game_suggestions
+from levelupapi.views import bulk
+from levelupapi.views.fields import SparseFieldsMixin, sparse_fieldset
+from levelupapi.views.values import ValuesSerializer
+from django.db import transaction
 from django.db.models import Count, Q
+from rest_framework.decorators import action
 
 
 class GameView(ViewSet):
@@ -21,7 +30,7 @@ class GameView(ViewSet):
         """
 
         # Uses the token passed in the `Authorization` header
-        gamer = Gamer.objects.get(user=request.auth.user)
+        gamer = request.gamer
 
         # Use the Django ORM to get the record from the database
         # whose `id` is what the client passed as the
@@ -30,21 +39,18 @@ class GameView(ViewSet):
 
         # Create a new Python instance of the Game class
         # and set its properties from what was sent in the
-        # body of the request from the client.
-        game = Game.objects.create(
-            title = request.data["title"],
-            maker = request.data["maker"],
-            number_of_players = request.data["numberOfPlayers"],
-            skill_level = request.data["skillLevel"],
-            gamer = gamer,
-            game_type = game_type
-        )
-
-        # Try to save the new game to the database, then
-        # serialize the game instance as JSON, and send the
-        # JSON as a response to the client request
+        # body of the request from the client. Then serialize
+        # the game instance as JSON, and send the JSON as a
+        # response to the client request
         try:
-            game.save()
+            game = Game.objects.create(
+                title = request.data["title"],
+                maker = request.data["maker"],
+                number_of_players = request.data["numberOfPlayers"],
+                skill_level = request.data["skillLevel"],
+                gamer = gamer,
+                game_type = game_type
+            )
             serializer = GameSerializer(game)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
@@ -56,6 +62,7 @@ class GameView(ViewSet):
 
 
 
+    @cached_response(versions.GAMES, per_viewer=True)
     def retrieve(self, request, pk=None):
         """Handle GET requests for single game
 
@@ -64,16 +71,16 @@ class GameView(ViewSet):
         """
 
     ## TODO ---- ! user_event_count property name coming back as invalid
-        gamer = Gamer.objects.get(user=request.auth.user)
+        gamer = request.gamer
+        fieldset = sparse_fieldset(request)
         try:
-            game = Game.objects.annotate(
-                event_count=Count('events'),
+            game = GameSerializer.setup_eager_loading(Game.objects.annotate(
                 user_event_count=Count(
                     'events',
                     filter=Q(events__organizer=gamer)
                 )
-            ).get(pk=pk)
-            serializer = GameSerializer(game)
+            ), **fieldset).get(pk=pk)
+            serializer = GameSerializer(game, **fieldset)
             return Response(serializer.data)
         except Game.DoesNotExist as ex:
             return Response({'message': ex.args[0]}, status=status.HTTP_404_NOT_FOUND)
@@ -127,14 +134,29 @@ class GameView(ViewSet):
         except Exception as ex:
             return Response({'message': ex.args[0]}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    @versions.conditional(versions.GAMES)
+    @cached_response(versions.GAMES)
     def list(self, request):
         """Handle GET requests to games resource
 
+        Pick what each game includes with `?fields=` and `?expand=` (see
+        levelupapi.views.fields).
+
         Returns:
             Response -- JSON serialized list of games
         """
-        # Get all game records from database and add event count to each
-        games = Game.objects.annotate(event_count=Count('events'))
+        serializer = self.list_serializer(request)
+        return Response(serializer.to_representation(serializer.values()))
+
+    @staticmethod
+    def list_serializer(request):
+        """Build the ValuesSerializer for the games a list request asks for
+
+        Shared with the async games list in levelupapi.views.async_views.
+        """
+        # Get all game records from database. Each one carries its own
+        # event count, so there is nothing to aggregate here
+        games = Game.objects.all()
 
         # Support filtering games by type
         #    http://localhost:8000/games?type=1
@@ -144,21 +166,166 @@ class GameView(ViewSet):
         if game_type is not None:
             games = games.filter(game_type__id=game_type)
 
-        serializer = GameSerializer(games, many=True)
-        return Response(serializer.data)
+        # Serialize the games straight from .values() rows
+        return ValuesSerializer(GameSerializer(**sparse_fieldset(request)), games)
+
+    @action(methods=['get'], detail=False)
+    def suggest(self, request):
+        """Handle GET requests for games to suggest as a gamer types
+
+        `?prefix=` is matched against the start of every word of the game
+        titles and makers, so `?prefix=rid` suggests "Ticket to Ride".
+        Suggestions come from an in-process index (see levelupapi.suggest)
+        rather than the database. Pass `?limit=` for more or fewer than 10.
+
+        Returns:
+            Response -- JSON list of games with their id, title and maker
+        """
+        query = GameSuggestSerializer(data=request.query_params.dict())
+        query.is_valid(raise_exception=True)
+        return Response(game_suggestions.suggest(
+            query.validated_data['prefix'], query.validated_data['limit']
+        ))
+
+    @action(methods=['post', 'put', 'delete'], detail=False)
+    def bulk(self, request):
+        """Handle batches of games in a single request
+
+        POST a list of games shaped like the body of a single POST to
+        create them, PUT a list of games that also have an `id` to update
+        them, or DELETE with `{"ids": [...]}` to remove them. Every item is
+        validated on its own and the valid ones are written together in
+        one transaction; the invalid ones are reported back by index
+        without stopping the rest of the batch.
+
+        Returns:
+            Response -- ids written and errors for the items that were not
+        """
+        try:
+            if request.method == 'DELETE':
+                return self.bulk_destroy(request)
+            items = bulk.batch_items(request)
+        except bulk.BatchError as ex:
+            return Response({'message': ex.args[0]}, status=status.HTTP_400_BAD_REQUEST)
+
+        if request.method == 'PUT':
+            return self.bulk_update(request, items)
+        return self.bulk_create(request, items)
+
+    def bulk_create(self, request, items):
+        valid, errors = bulk.validate_batch(items, GameBulkSerializer)
+        game_types = self.existing_game_types(valid)
+
+        games = []
+        for index, data in valid:
+            if data['gameTypeId'] not in game_types:
+                errors.append(bulk.item_error(index, {'gameTypeId': ['Game type does not exist.']}))
+                continue
+            games.append(Game(
+                title = data["title"],
+                maker = data["maker"],
+                number_of_players = data["numberOfPlayers"],
+                skill_level = data["skillLevel"],
+                gamer = request.gamer,
+                game_type_id = data["gameTypeId"]
+            ))
+
+        with transaction.atomic():
+            Game.objects.bulk_create(games, batch_size=bulk.BATCH_SIZE)
+            bulk_saved.send(sender=Game, instances=games, created=True)
+
+        return Response(
+            {'created': [game.id for game in games], 'errors': bulk.sorted_errors(errors)},
+            status=status.HTTP_201_CREATED if games else status.HTTP_400_BAD_REQUEST
+        )
+
+    def bulk_update(self, request, items):
+        valid, errors = bulk.validate_batch(items, GameBulkUpdateSerializer)
+        game_types = self.existing_game_types(valid)
+        existing = Game.objects.in_bulk([data['id'] for _, data in valid])
+
+        games = {}
+        for index, data in valid:
+            game = existing.get(data['id'])
+            if game is None:
+                errors.append(bulk.item_error(index, {'id': ['Game does not exist.']}))
+                continue
+            if data['gameTypeId'] not in game_types:
+                errors.append(bulk.item_error(index, {'gameTypeId': ['Game type does not exist.']}))
+                continue
+            game.title = data["title"]
+            game.maker = data["maker"]
+            game.number_of_players = data["numberOfPlayers"]
+            game.skill_level = data["skillLevel"]
+            game.game_type_id = data["gameTypeId"]
+            games[game.id] = game
+
+        with transaction.atomic():
+            Game.objects.bulk_update(
+                games.values(),
+                ['title', 'maker', 'number_of_players', 'skill_level', 'game_type'],
+                batch_size=bulk.BATCH_SIZE
+            )
+            bulk_saved.send(sender=Game, instances=list(games.values()), created=False)
+
+        return Response(
+            {'updated': list(games), 'errors': bulk.sorted_errors(errors)},
+            status=status.HTTP_200_OK if games else status.HTTP_400_BAD_REQUEST
+        )
+
+    def bulk_destroy(self, request):
+        serializer = bulk.BulkDeleteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data['ids']
+
+        with transaction.atomic():
+            games = Game.objects.filter(pk__in=ids)
+            found = set(games.values_list('pk', flat=True))
+            games.delete()
 
+        errors = [
+            bulk.item_error(index, {'id': ['Game does not exist.']})
+            for index, pk in enumerate(ids) if pk not in found
+        ]
+        return Response({'deleted': sorted(found), 'errors': errors}, status=status.HTTP_200_OK)
 
-class GameSerializer(serializers.ModelSerializer):
+    @staticmethod
+    def existing_game_types(valid):
+        """Look up every game type a batch refers to with one query"""
+        ids = {data['gameTypeId'] for _, data in valid}
+        return set(GameType.objects.filter(pk__in=ids).values_list('pk', flat=True))
+
+
+class GameSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """JSON serializer for games
 
     Arguments:
         serializer type
     """
-    event_count = serializers.IntegerField(default=None)
     user_event_count = serializers.IntegerField(default=None)
 
     class Meta:
         model = Game
         fields = ('id', 'title', 'maker', 'number_of_players', 'skill_level', 'game_type',
                   'event_count', 'user_event_count', 'gamer' )
-        depth = 1
\ No newline at end of file
+        depth = 1
+
+
+class GameSuggestSerializer(serializers.Serializer):
+    """Validates the query parameters of a game suggestion"""
+    prefix = serializers.CharField(max_length=50)
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=10)
+
+
+class GameBulkSerializer(serializers.Serializer):
+    """Validates one game of a bulk create"""
+    title = serializers.CharField(max_length=50)
+    maker = serializers.CharField(max_length=50)
+    numberOfPlayers = serializers.IntegerField(min_value=0)
+    skillLevel = serializers.IntegerField(min_value=0)
+    gameTypeId = serializers.IntegerField()
+
+
+class GameBulkUpdateSerializer(GameBulkSerializer):
+    """Validates one game of a bulk update"""
+    id = serializers.IntegerField()
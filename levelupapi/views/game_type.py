@@ -2,6 +2,8 @@
 from django.http import HttpResponseServerError
 from django.core.exceptions import ValidationError
 from rest_framework.viewsets import ViewSet
+from levelupapi import versions
+from levelupapi.caching import cached_response
 from rest_framework.response import Response
 from rest_framework import serializers, status
 from levelupapi.models import GameType
@@ -10,6 +12,7 @@ from levelupapi.models import GameType
 class GameTypeView(ViewSet):
     """Level up game types"""
 
+    @cached_response(versions.GAME_TYPES)
     def retrieve(self, request, pk=None):
         """Handle GET requests for single game type
 
@@ -24,6 +27,8 @@ class GameTypeView(ViewSet):
             return Response({'message': ex.args[0]}, status=status.HTTP_404_NOT_FOUND) 
 
 
+    @versions.conditional(versions.GAME_TYPES)
+    @cached_response(versions.GAME_TYPES)
     def list(self, request):
         """Handle GET requests to get all game types
 
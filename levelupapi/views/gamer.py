@@ -0,0 +1,81 @@
+"""View module for handling requests about gamers"""
+import hashlib
+
+from django.http import HttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from rest_framework import exceptions
+from rest_framework.decorators import action
+from rest_framework.permissions import AllowAny
+from rest_framework.renderers import BaseRenderer
+from rest_framework.response import Response
+from rest_framework.viewsets import ViewSet
+
+from levelupapi import calendars
+
+
+class ICalendarRenderer(BaseRenderer):
+    """Lets clients ask for text/calendar
+
+    Feeds are sent as they are; only error details come through here.
+    """
+    media_type = 'text/calendar'
+    format = 'ics'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict) and 'detail' in data:
+            data = data['detail']
+        return str(data).encode(self.charset)
+
+
+class GamerView(ViewSet):
+    """Level up gamers"""
+    lookup_value_regex = '[0-9]+'
+
+    @action(methods=['get'], detail=True, url_path='calendar.ics',
+            renderer_classes=[ICalendarRenderer], permission_classes=[AllowAny])
+    def calendar(self, request, pk):
+        """Handle GET requests for the iCalendar feed of a gamer's events
+
+        Gamers can read their own feed with their token as usual. Calendar
+        apps, which cannot send the token, pass the key from
+        /gamers/<id>/calendar instead, as `?key=`.
+
+        Returns:
+            HttpResponse -- the events the gamer organizes or attends
+        """
+        pk = int(pk)
+        if not calendars.check_feed_key(pk, request.query_params.get('key')):
+            self.check_own_calendar(request, pk)
+
+        body = calendars.feed(pk)
+        etag = quote_etag(hashlib.sha1(body).hexdigest())
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(body, content_type='text/calendar; charset=utf-8')
+        response.headers['ETag'] = etag
+        return response
+
+    @action(methods=['get'], detail=True, url_path='calendar')
+    def calendar_link(self, request, pk):
+        """Handle GET requests for the address to subscribe to a gamer's calendar at
+
+        Returns:
+            Response -- JSON with the feed's `url`, key included
+        """
+        pk = int(pk)
+        self.check_own_calendar(request, pk)
+        path = reverse('gamer-calendar', kwargs={'pk': pk})
+        return Response({
+            'url': request.build_absolute_uri(f'{path}?key={calendars.feed_key(pk)}')
+        })
+
+    @staticmethod
+    def check_own_calendar(request, pk):
+        if not request.user.is_authenticated:
+            raise exceptions.NotAuthenticated()
+        gamer = getattr(request, 'gamer', None)
+        if gamer is None or gamer.pk != pk:
+            raise exceptions.PermissionDenied('Gamers can only see their own calendar.')
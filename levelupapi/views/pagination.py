@@ -0,0 +1,170 @@
+"""Keyset pagination for the list endpoints"""
+import base64
+import datetime
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Paginate a queryset by seeking past the last row of the previous page
+
+    Unlike offset pagination, every page is a single indexed range scan no
+    matter how deep the client has paged, so response time stays flat as
+    the table grows. Cursors are opaque, url-safe tokens that encode the
+    ordering values of the row at the edge of the page.
+
+    Subclasses set `ordering` to a tuple of model fields that, taken
+    together, are unique (end it with `id`) and `cursor_fields` to the
+    python types used to decode each of them.
+    """
+    ordering = ('id',)
+    cursor_fields = (int,)
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = settings.API_PAGE_SIZE
+    max_page_size = settings.API_MAX_PAGE_SIZE
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.set_page(list(self.page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset for async views, reading the page with the async ORM"""
+        return self.set_page([row async for row in self.page_queryset(queryset, request)])
+
+    def page_queryset(self, queryset, request):
+        """Narrow `queryset` down to the rows of the requested page"""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.position, self.reverse = self.decode_cursor(request)
+
+        if self.reverse:
+            queryset = queryset.order_by(*[f'-{field}' for field in self.ordering])
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if self.position is not None:
+            queryset = queryset.filter(self.seek_filter(self.position, self.reverse))
+
+        # Fetch one extra row to find out if there is another page
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, results):
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+
+        if self.reverse:
+            self.page.reverse()
+            self.has_next = self.position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.position is not None
+
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ]))
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def seek_filter(self, position, reverse):
+        """Build the row-value comparison `(a, b, c) > (x, y, z)` as a Q
+
+        Written out as `a > x OR (a = x AND b > y) OR ...` so that it works
+        on every database backend, with `a >= x` in front of it. Planners
+        cannot seek on the OR alone and walk the index from its first
+        entry; the leading bound lets them start the range scan at `x`.
+        """
+        lookup = 'lt' if reverse else 'gt'
+        condition = Q()
+        for index, field in enumerate(self.ordering):
+            clause = Q(**{f'{field}__{lookup}': position[index]})
+            for previous, value in zip(self.ordering[:index], position[:index]):
+                clause &= Q(**{previous: value})
+            condition |= clause
+        bound = Q(**{f'{self.ordering[0]}__{lookup}e': position[0]})
+        return bound & condition
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None, False
+
+        try:
+            padding = '=' * (-len(encoded) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(encoded + padding).decode('ascii'))
+            if len(payload['p']) != len(self.cursor_fields):
+                raise ValueError(encoded)
+            position = [
+                parse(value)
+                for parse, value in zip(self.cursor_fields, payload['p'])
+            ]
+            reverse = bool(payload.get('r', False))
+        except (TypeError, ValueError, KeyError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+        return position, reverse
+
+    def encode_cursor(self, instance, reverse):
+        position = [
+            self.cursor_value(self.ordering_value(instance, field))
+            for field in self.ordering
+        ]
+        payload = {'p': position}
+        if reverse:
+            payload['r'] = 1
+        encoded = base64.urlsafe_b64encode(
+            json.dumps(payload, separators=(',', ':')).encode('ascii')
+        ).decode('ascii').rstrip('=')
+
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.cursor_query_param)
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    @staticmethod
+    def ordering_value(instance, field):
+        # Pages can hold model instances or .values() rows
+        if isinstance(instance, dict):
+            return instance[field]
+        return getattr(instance, field)
+
+    @staticmethod
+    def cursor_value(value):
+        if isinstance(value, (datetime.date, datetime.time)):
+            return value.isoformat()
+        return value
+
+
+class EventPagination(KeysetPagination):
+    """Events are paged in calendar order"""
+    ordering = ('date', 'time', 'id')
+    cursor_fields = (datetime.date.fromisoformat, datetime.time.fromisoformat, int)
@@ -0,0 +1,76 @@
+"""View module for searching games and events"""
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.viewsets import ViewSet
+
+from levelupapi import search, versions
+from levelupapi.caching import cached_response
+from levelupapi.models import Event, Game
+
+
+class SearchView(ViewSet):
+    """Level up search"""
+
+    @versions.conditional(versions.GAMES, versions.EVENTS)
+    @cached_response(versions.GAMES, versions.EVENTS)
+    def list(self, request):
+        """Handle GET requests to search games and events
+
+        `?q=` is matched against game titles and makers and event
+        descriptions. Every word has to start a word of what is found, so
+        `?q=fort am` finds "Fortress America". Narrow the search with
+        `?type=games` or `?type=events` and pass `?limit=` for more or fewer
+        than 20 results.
+
+        Returns:
+            Response -- JSON serialized games and events, best match first
+        """
+        query = SearchQuerySerializer(data=request.query_params.dict())
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+
+        hits = search.search(params['q'], SEARCH_KINDS.get(params.get('type')), params['limit'])
+
+        # Load the hits of each kind with one query
+        found = {}
+        for kind, name, model, serializer_class in [
+            (search.GAME, 'game', Game, GameResultSerializer),
+            (search.EVENT, 'event', Event, EventResultSerializer),
+        ]:
+            rows = model.objects.filter(
+                pk__in=[pk for hit_kind, pk in hits if hit_kind == kind]
+            ).values(*serializer_class().fields)
+            for row in serializer_class(rows, many=True).data:
+                found[(kind, row['id'])] = {'type': name, **row}
+        return Response([found[hit] for hit in hits if hit in found])
+
+
+SEARCH_KINDS = {'games': search.GAME, 'events': search.EVENT}
+
+
+class SearchQuerySerializer(serializers.Serializer):
+    """Validates the query parameters of a search"""
+    q = serializers.CharField(max_length=200)
+    type = serializers.ChoiceField(choices=list(SEARCH_KINDS), required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+
+    def validate_q(self, value):
+        if not search.terms(value):
+            raise serializers.ValidationError('Must contain a word to search for.')
+        return value
+
+
+class GameResultSerializer(serializers.Serializer):
+    """JSON serializer for a game found by a search"""
+    id = serializers.IntegerField()
+    title = serializers.CharField()
+    maker = serializers.CharField()
+
+
+class EventResultSerializer(serializers.Serializer):
+    """JSON serializer for an event found by a search"""
+    id = serializers.IntegerField()
+    description = serializers.CharField()
+    date = serializers.DateField()
+    time = serializers.TimeField()
+    game = serializers.IntegerField()
@@ -0,0 +1,24 @@
+"""View module for monitoring the API's in-process caches"""
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+from levelupapi.authentication import token_cache
+from levelupapi.caching import response_cache
+from levelupapi.suggest import game_suggestions
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def cache_stats(request):
+    '''Report the size and hit ratio of this process's caches
+
+    Method arguments:
+      request -- The full HTTP request object
+    '''
+    data = {
+        'token_cache': token_cache.stats(),
+        'response_cache': response_cache.stats(),
+        'game_suggestions': game_suggestions.stats(),
+    }
+    return Response(data)
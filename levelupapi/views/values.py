@@ -0,0 +1,160 @@
+"""Read-only serialization of list responses straight from .values() rows
+
+A ModelSerializer builds a model instance for every row and then walks
+its field objects one attribute at a time. For the big list responses
+that is most of the time spent on a request. ValuesSerializer reads the
+same serializer's fields once, up front, and turns them into a plan of
+.values() columns, so each row becomes a dict with plain lookups.
+
+The output is the same as the serializer's, field for field. That holds
+for serializers made of model fields, annotations, nested serializers
+and primary key fields, which is every serializer in this app. Anything
+else raises TypeError when the plan is built.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.fields import empty
+
+# Fields that represent a value read from the database as the value itself
+AS_IS = (
+    serializers.CharField, serializers.IntegerField, serializers.BooleanField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+VALUE, DEFAULT, NESTED, MANY = 'value', 'default', 'nested', 'many'
+
+
+class ValuesSerializer:
+    """Serialize the rows of `queryset` the way `serializer` would
+
+    `serializer` is an unbound instance, e.g. `EventSerializer(fields=...)`,
+    and `queryset` has any filters and annotations the serializer reads.
+    Relations to many rows cost one extra query each, however many rows
+    there are.
+    """
+
+    def __init__(self, serializer, queryset):
+        self.queryset = queryset
+        self.plan = _plan(serializer, queryset.model, '', set(queryset.query.annotations))
+
+    def values(self, *extra):
+        """The queryset as .values() rows with every column the plan reads
+
+        `extra` names more columns to fetch, like the ones a paginator
+        needs to build its cursors.
+        """
+        return self.queryset.values(*dict.fromkeys(['pk', *_keys(self.plan), *extra]))
+
+    def to_representation(self, rows):
+        """Turn rows from `values()` into the serializer's list of dicts"""
+        rows = list(rows)
+        pks = [row['pk'] for row in rows]
+        related = {
+            node[1]: self.group_many(node, self.many_rows(node, pks))
+            for node in self.plan if node[0] == MANY
+        }
+        return [_build(self.plan, row, related) for row in rows]
+
+    async def ato_representation(self, rows):
+        """to_representation for async views, reading relations to many with the async ORM"""
+        pks = [row['pk'] for row in rows]
+        related = {}
+        for node in self.plan:
+            if node[0] == MANY:
+                many_rows = [row async for row in self.many_rows(node, pks)]
+                related[node[1]] = self.group_many(node, many_rows)
+        return [_build(self.plan, row, related) for row in rows]
+
+    def many_rows(self, node, pks):
+        """Query the rows of a relation to many for every one of `pks`"""
+        _, _, path, pk_key, children = node
+        rows = self.queryset.model.objects.filter(pk__in=pks).order_by('pk', pk_key)
+        if children is None:
+            return rows.values('pk', pk_key)
+        return rows.values(*dict.fromkeys(['pk', pk_key, *_keys(children)]))
+
+    @staticmethod
+    def group_many(node, rows):
+        """Serialize the related rows from many_rows()
+
+        Returns:
+            dict -- the serialized related rows, by the pk of their owner
+        """
+        _, _, path, pk_key, children = node
+        grouped = {}
+        for row in rows:
+            if row[pk_key] is None:
+                continue
+            item = row[pk_key] if children is None else _build(children, row, {})
+            grouped.setdefault(row['pk'], []).append(item)
+        return grouped
+
+
+def _plan(serializer, model, prefix, annotations):
+    """List what to read from a row for each of the serializer's fields"""
+    plan = []
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        source = field.source
+
+        try:
+            model_field = model._meta.get_field(source)
+        except FieldDoesNotExist:
+            if source in annotations:
+                plan.append((VALUE, name, source, _converter(field)))
+            elif field.default is not empty:
+                plan.append((DEFAULT, name, field.get_default()))
+            else:
+                raise TypeError(f'{name} cannot be read from .values()')
+            continue
+
+        related_model = model_field.related_model
+        if isinstance(field, (serializers.ListSerializer, serializers.ManyRelatedField)):
+            if prefix:
+                raise TypeError(f'{name} is a relation to many inside a nested serializer')
+            pk_key = f'{source}__{related_model._meta.pk.name}'
+            children = None
+            if isinstance(field, serializers.ListSerializer):
+                children = _plan(field.child, related_model, f'{source}__', set())
+            plan.append((MANY, name, source, pk_key, children))
+        elif isinstance(field, serializers.BaseSerializer):
+            pk_key = f'{prefix}{source}__{related_model._meta.pk.name}'
+            children = _plan(field, related_model, f'{prefix}{source}__', set())
+            plan.append((NESTED, name, pk_key, children))
+        else:
+            plan.append((VALUE, name, prefix + source, _converter(field)))
+    return plan
+
+
+def _converter(field):
+    return None if isinstance(field, AS_IS) else field.to_representation
+
+
+def _keys(plan):
+    """The .values() columns a plan reads, leaving out relations to many"""
+    keys = []
+    for node in plan:
+        if node[0] == VALUE:
+            keys.append(node[2])
+        elif node[0] == NESTED:
+            keys.append(node[2])
+            keys += _keys(node[3])
+    return keys
+
+
+def _build(plan, row, related):
+    data = {}
+    for node in plan:
+        kind, name = node[0], node[1]
+        if kind == VALUE:
+            value = row[node[2]]
+            convert = node[3]
+            data[name] = value if value is None or convert is None else convert(value)
+        elif kind == DEFAULT:
+            data[name] = node[2]
+        elif kind == NESTED:
+            data[name] = None if row[node[2]] is None else _build(node[3], row, related)
+        else:
+            data[name] = related[name].get(row['pk'], [])
+    return data
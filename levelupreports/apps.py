@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class LevelupreportsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'levelupreports'
+
+    def ready(self):
+        # Connect the handlers that keep the report tables up to date
+        from levelupreports import signals  # pylint: disable=unused-import,import-outside-toplevel
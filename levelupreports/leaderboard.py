@@ -0,0 +1,70 @@
+"""Keep the leaderboard's score table in step with the games and events it counts
+
+Each gamer has a GamerScore row with the number of games they own,
+events they organize and events they attend, and a score that weighs
+them by SCORE_WEIGHTS. Single writes add to or take from the counts with
+F() updates; bulk writes recount the gamers they touch. The leaderboard
+then reads the top of an index instead of grouping the games, events
+and sign ups on every request.
+"""
+from django.db import transaction
+from django.db.models import F
+
+from levelupapi.models import Event, EventGamer, Game, Gamer
+from levelupapi.models.counters import counted
+from levelupreports.models import GamerScore
+from levelupreports.snapshots import full_name
+
+# How much each game owned, event organized and event attended adds to a score
+SCORE_WEIGHTS = {
+    'games_owned': 1,
+    'events_organized': 3,
+    'events_attended': 2,
+}
+
+# What the leaderboard can be ranked by
+RANKINGS = ('score', *SCORE_WEIGHTS)
+
+
+def add_gamer(gamer):
+    """Give a new gamer their row, with nothing to their name yet"""
+    GamerScore.objects.get_or_create(gamer=gamer, defaults={'full_name': full_name(gamer.user)})
+
+
+def adjust(gamer_ids, field, delta):
+    """Add `delta` to a count of each gamer, and its weight to their score"""
+    GamerScore.objects.filter(gamer_id__in=gamer_ids).update(**{
+        field: F(field) + delta,
+        'score': F('score') + delta * SCORE_WEIGHTS[field],
+    })
+
+
+def recount(gamer_ids=None):
+    """Set the counts and score of each gamer, or of everyone, from their games and events"""
+    scores = GamerScore.objects.all()
+    if gamer_ids is not None:
+        scores = scores.filter(gamer_id__in=gamer_ids)
+    with transaction.atomic():
+        scores.update(
+            games_owned=counted(Game.objects.all(), 'gamer'),
+            events_organized=counted(Event.objects.all(), 'organizer'),
+            events_attended=counted(EventGamer.objects.all(), 'gamer'),
+        )
+        scores.update(score=sum(
+            F(field) * weight for field, weight in SCORE_WEIGHTS.items()
+        ))
+
+
+def rename_user(user):
+    GamerScore.objects.filter(gamer__user_id=user.pk).update(full_name=full_name(user))
+
+
+def rebuild(batch_size=2000):
+    """Throw the score table away and count every gamer again"""
+    with transaction.atomic():
+        GamerScore.objects.all().delete()
+        GamerScore.objects.bulk_create((
+            GamerScore(gamer_id=gamer.pk, full_name=full_name(gamer.user))
+            for gamer in Gamer.objects.select_related('user').iterator(chunk_size=batch_size)
+        ), batch_size=batch_size)
+        recount()
@@ -0,0 +1,24 @@
+"""Management command for rebuilding the report tables from scratch"""
+from django.core.management.base import BaseCommand
+
+from levelupreports import leaderboard, snapshots
+from levelupreports.models import GamerScore, UserEvent, UserGame
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the games by user, events by user and leaderboard report tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=2000,
+            help='How many rows to read and insert at a time',
+        )
+
+    def handle(self, *args, **options):
+        snapshots.rebuild(batch_size=options['batch_size'])
+        leaderboard.rebuild(batch_size=options['batch_size'])
+        self.stdout.write(
+            f'Rebuilt {UserGame.objects.count()} game row(s), '
+            f'{UserEvent.objects.count()} event row(s) '
+            f'and {GamerScore.objects.count()} gamer score(s)'
+        )
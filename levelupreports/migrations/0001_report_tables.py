@@ -0,0 +1,76 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def copy_existing_rows(apps, schema_editor):
+    Game = apps.get_model('levelupapi', 'Game')
+    Event = apps.get_model('levelupapi', 'Event')
+    UserGame = apps.get_model('levelupreports', 'UserGame')
+    UserEvent = apps.get_model('levelupreports', 'UserEvent')
+
+    UserGame.objects.bulk_create([
+        UserGame(
+            game_id=game.pk, title=game.title, maker=game.maker,
+            number_of_players=game.number_of_players, skill_level=game.skill_level,
+            game_type_id=game.game_type_id, gamer_id=game.gamer_id,
+            full_name=f'{game.gamer.user.first_name} {game.gamer.user.last_name}',
+        )
+        for game in Game.objects.select_related('gamer__user').iterator()
+    ], batch_size=2000)
+
+    UserEvent.objects.bulk_create([
+        UserEvent(
+            event_id=event.pk, game_id=event.game_id, game_name=event.game.title,
+            description=event.description, date=event.date, time=event.time,
+            gamer_id=event.organizer_id,
+            full_name=f'{event.organizer.user.first_name} {event.organizer.user.last_name}',
+        )
+        for event in Event.objects.select_related('game', 'organizer__user').iterator()
+    ], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('levelupapi', '0002_event_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserEvent',
+            fields=[
+                ('event', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to='levelupapi.event')),
+                ('game_name', models.CharField(max_length=50)),
+                ('description', models.CharField(max_length=55)),
+                ('date', models.DateField()),
+                ('time', models.TimeField()),
+                ('full_name', models.CharField(max_length=301)),
+                ('game', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='levelupapi.game')),
+                ('gamer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='levelupapi.gamer')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['gamer', 'event'], name='userevent_gamer_event_idx'), models.Index(fields=['game'], name='userevent_game_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='UserGame',
+            fields=[
+                ('game', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to='levelupapi.game')),
+                ('title', models.CharField(max_length=50)),
+                ('maker', models.CharField(max_length=50)),
+                ('number_of_players', models.PositiveIntegerField()),
+                ('skill_level', models.PositiveIntegerField()),
+                ('full_name', models.CharField(max_length=301)),
+                ('game_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='levelupapi.gametype')),
+                ('gamer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='levelupapi.gamer')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['gamer', 'game'], name='usergame_gamer_game_idx')],
+            },
+        ),
+        migrations.RunPython(copy_existing_rows, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_existing_rows(apps, schema_editor):
+    Gamer = apps.get_model('levelupapi', 'Gamer')
+    Game = apps.get_model('levelupapi', 'Game')
+    Event = apps.get_model('levelupapi', 'Event')
+    EventGamer = apps.get_model('levelupapi', 'EventGamer')
+    GamerScore = apps.get_model('levelupreports', 'GamerScore')
+
+    def counts(model, field):
+        return dict(model.objects.values_list(field).annotate(count=Count('pk')).order_by())
+
+    games = counts(Game, 'gamer')
+    organized = counts(Event, 'organizer')
+    attended = counts(EventGamer, 'gamer')
+
+    # The weights of levelupreports.leaderboard.SCORE_WEIGHTS when this was written
+    GamerScore.objects.bulk_create([
+        GamerScore(
+            gamer_id=gamer.pk,
+            full_name=f'{gamer.user.first_name} {gamer.user.last_name}',
+            games_owned=games.get(gamer.pk, 0),
+            events_organized=organized.get(gamer.pk, 0),
+            events_attended=attended.get(gamer.pk, 0),
+            score=(
+                games.get(gamer.pk, 0) + 3 * organized.get(gamer.pk, 0)
+                + 2 * attended.get(gamer.pk, 0)
+            ),
+        )
+        for gamer in Gamer.objects.select_related('user').iterator()
+    ], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('levelupapi', '0005_search_index'),
+        ('levelupreports', '0001_report_tables'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GamerScore',
+            fields=[
+                ('gamer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to='levelupapi.gamer')),
+                ('full_name', models.CharField(max_length=301)),
+                ('games_owned', models.PositiveIntegerField(default=0)),
+                ('events_organized', models.PositiveIntegerField(default=0)),
+                ('events_attended', models.PositiveIntegerField(default=0)),
+                ('score', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-score', 'gamer'], name='gamerscore_score_idx'), models.Index(fields=['-games_owned', 'gamer'], name='gamerscore_games_idx'), models.Index(fields=['-events_organized', 'gamer'], name='gamerscore_organized_idx'), models.Index(fields=['-events_attended', 'gamer'], name='gamerscore_attended_idx')],
+            },
+        ),
+        migrations.RunPython(count_existing_rows, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,3 @@
+from .user_game import UserGame
+from .user_event import UserEvent
+from .gamer_score import GamerScore
@@ -0,0 +1,27 @@
+from django.db import models
+
+
+class GamerScore(models.Model):
+    """A gamer's row of the leaderboard, kept in step with their games and events
+
+    The counts are only changed with F() updates by the handlers in
+    levelupreports.signals (see levelupreports.leaderboard).
+    """
+    gamer = models.OneToOneField(
+        "levelupapi.Gamer", on_delete=models.CASCADE, primary_key=True, related_name="+"
+    )
+    full_name = models.CharField(max_length=301)
+    games_owned = models.PositiveIntegerField(default=0)
+    events_organized = models.PositiveIntegerField(default=0)
+    events_attended = models.PositiveIntegerField(default=0)
+    score = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            # The leaderboard reads the top of one of these, and a gamer's
+            # rank counts the entries above theirs
+            models.Index(fields=['-score', 'gamer'], name='gamerscore_score_idx'),
+            models.Index(fields=['-games_owned', 'gamer'], name='gamerscore_games_idx'),
+            models.Index(fields=['-events_organized', 'gamer'], name='gamerscore_organized_idx'),
+            models.Index(fields=['-events_attended', 'gamer'], name='gamerscore_attended_idx'),
+        ]
@@ -0,0 +1,21 @@
+from django.db import models
+
+
+class UserEvent(models.Model):
+    """A row of the events by user report, kept in step with the events"""
+    event = models.OneToOneField(
+        "levelupapi.Event", on_delete=models.CASCADE, primary_key=True, related_name="+"
+    )
+    game = models.ForeignKey("levelupapi.Game", on_delete=models.CASCADE, related_name="+")
+    game_name = models.CharField(max_length=50)
+    description = models.CharField(max_length=55)
+    date = models.DateField()
+    time = models.TimeField()
+    gamer = models.ForeignKey("levelupapi.Gamer", on_delete=models.CASCADE, related_name="+")
+    full_name = models.CharField(max_length=301)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['gamer', 'event'], name='userevent_gamer_event_idx'),
+            models.Index(fields=['game'], name='userevent_game_idx'),
+        ]
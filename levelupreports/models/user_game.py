@@ -0,0 +1,20 @@
+from django.db import models
+
+
+class UserGame(models.Model):
+    """A row of the games by user report, kept in step with the games"""
+    game = models.OneToOneField(
+        "levelupapi.Game", on_delete=models.CASCADE, primary_key=True, related_name="+"
+    )
+    title = models.CharField(max_length=50)
+    maker = models.CharField(max_length=50)
+    number_of_players = models.PositiveIntegerField()
+    skill_level = models.PositiveIntegerField()
+    game_type = models.ForeignKey("levelupapi.GameType", on_delete=models.CASCADE, related_name="+")
+    gamer = models.ForeignKey("levelupapi.Gamer", on_delete=models.CASCADE, related_name="+")
+    full_name = models.CharField(max_length=301)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['gamer', 'game'], name='usergame_gamer_game_idx'),
+        ]
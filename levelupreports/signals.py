@@ -0,0 +1,138 @@
+"""Signal handlers that keep the report tables in step with writes"""
+from django.contrib.auth.models import User
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from levelupapi.models import Event, EventGamer, Game, Gamer
+from levelupapi.signals import bulk_saved
+from levelupreports import leaderboard, snapshots
+
+# Rows are removed from the report tables by their cascading foreign keys
+# when a game, event or gamer is deleted, so only saves are handled here.
+# Fixture (raw) saves are skipped; run `rebuild_reports` after loaddata.
+
+
+@receiver(post_save, sender=Game)
+def snapshot_game(sender, instance, raw=False, **kwargs):
+    if not raw:
+        snapshots.refresh_games([instance.pk])
+
+
+@receiver(post_save, sender=Event)
+def snapshot_event(sender, instance, raw=False, **kwargs):
+    if not raw:
+        snapshots.refresh_events([instance.pk])
+
+
+@receiver(post_save, sender=Gamer)
+def snapshot_gamer(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    snapshots.rename_user(instance.user)
+    if created:
+        leaderboard.add_gamer(instance)
+    else:
+        leaderboard.rename_user(instance.user)
+
+
+@receiver(post_save, sender=User)
+def snapshot_user(sender, instance, raw=False, **kwargs):
+    if not raw:
+        snapshots.rename_user(instance)
+        leaderboard.rename_user(instance)
+
+
+@receiver(bulk_saved, sender=Game)
+def snapshot_bulk_saved_games(sender, instances, **kwargs):
+    snapshots.refresh_games([game.pk for game in instances])
+
+
+@receiver(bulk_saved, sender=Event)
+def snapshot_bulk_saved_events(sender, instances, **kwargs):
+    snapshots.refresh_events([event.pk for event in instances])
+
+
+# The leaderboard's counts are adjusted as games, events and sign ups come
+# and go. Deletes are handled too, since the score rows outlive them.
+
+
+@receiver(pre_save, sender=Game)
+def remember_game_owner(sender, instance, raw=False, **kwargs):
+    if raw or instance.pk is None:
+        return
+    instance._previous_gamer_id = sender.objects.filter(
+        pk=instance.pk
+    ).values_list('gamer_id', flat=True).first()
+
+
+@receiver(post_save, sender=Game)
+def score_saved_game(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous_gamer_id = None if created else getattr(instance, '_previous_gamer_id', None)
+    if previous_gamer_id != instance.gamer_id:
+        if previous_gamer_id is not None:
+            leaderboard.adjust([previous_gamer_id], 'games_owned', -1)
+        leaderboard.adjust([instance.gamer_id], 'games_owned', 1)
+
+
+@receiver(post_delete, sender=Game)
+def score_deleted_game(sender, instance, **kwargs):
+    leaderboard.adjust([instance.gamer_id], 'games_owned', -1)
+
+
+@receiver(post_save, sender=Event)
+def score_saved_event(sender, instance, created, raw=False, **kwargs):
+    # The organizer an existing event had is noted by levelupapi.signals
+    if raw:
+        return
+    previous_organizer_id = None if created else getattr(instance, '_previous_organizer_id', None)
+    if previous_organizer_id != instance.organizer_id:
+        if previous_organizer_id is not None:
+            leaderboard.adjust([previous_organizer_id], 'events_organized', -1)
+        leaderboard.adjust([instance.organizer_id], 'events_organized', 1)
+
+
+@receiver(post_delete, sender=Event)
+def score_deleted_event(sender, instance, **kwargs):
+    leaderboard.adjust([instance.organizer_id], 'events_organized', -1)
+
+
+@receiver(post_save, sender=EventGamer)
+def score_saved_attendee(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        leaderboard.adjust([instance.gamer_id], 'events_attended', 1)
+
+
+@receiver(m2m_changed, sender=Event.attendees.through)
+def score_added_attendees(sender, instance, action, reverse, pk_set, **kwargs):
+    """Score gamers added with `attendees.add()`; removals send post_delete"""
+    if action != 'post_add' or not pk_set:
+        return
+    if reverse:
+        leaderboard.adjust([instance.pk], 'events_attended', len(pk_set))
+    else:
+        leaderboard.adjust(pk_set, 'events_attended', 1)
+
+
+@receiver(post_delete, sender=EventGamer)
+def score_deleted_attendee(sender, instance, **kwargs):
+    leaderboard.adjust([instance.gamer_id], 'events_attended', -1)
+
+
+@receiver(bulk_saved, sender=Game)
+def score_bulk_saved_games(sender, instances, created, **kwargs):
+    # Bulk updates cannot change who owns a game
+    if created:
+        leaderboard.recount({game.gamer_id for game in instances})
+
+
+@receiver(bulk_saved, sender=Event)
+def score_bulk_saved_events(sender, instances, created, **kwargs):
+    if created:
+        leaderboard.recount({event.organizer_id for event in instances})
+
+
+@receiver(bulk_saved, sender=EventGamer)
+def score_bulk_saved_attendees(sender, instances, **kwargs):
+    leaderboard.recount({attendee.gamer_id for attendee in instances})
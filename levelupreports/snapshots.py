@@ -0,0 +1,97 @@
+"""Keep the report tables in step with the games, events and gamers they copy"""
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+
+from levelupapi.models import Event, Game
+from levelupreports.models import UserEvent, UserGame
+
+
+def full_name(user):
+    return f'{user.first_name} {user.last_name}'
+
+
+def user_game_row(game):
+    return UserGame(
+        game_id=game.pk,
+        title=game.title,
+        maker=game.maker,
+        number_of_players=game.number_of_players,
+        skill_level=game.skill_level,
+        game_type_id=game.game_type_id,
+        gamer_id=game.gamer_id,
+        full_name=full_name(game.gamer.user),
+    )
+
+
+def user_event_row(event):
+    return UserEvent(
+        event_id=event.pk,
+        game_id=event.game_id,
+        game_name=event.game.title,
+        description=event.description,
+        date=event.date,
+        time=event.time,
+        gamer_id=event.organizer_id,
+        full_name=full_name(event.organizer.user),
+    )
+
+
+def refresh_games(game_ids):
+    """Copy the current state of the given games into the report table"""
+    games = Game.objects.filter(pk__in=game_ids).select_related('gamer__user')
+    UserGame.objects.bulk_create(
+        [user_game_row(game) for game in games],
+        update_conflicts=True,
+        unique_fields=['game'],
+        update_fields=[
+            'title', 'maker', 'number_of_players', 'skill_level', 'game_type',
+            'gamer', 'full_name'
+        ],
+    )
+    # Events show the title of their game
+    UserEvent.objects.filter(game_id__in=game_ids).update(game_name=Subquery(
+        Game.objects.filter(pk=OuterRef('game_id')).values('title')[:1]
+    ))
+
+
+def refresh_events(event_ids):
+    """Copy the current state of the given events into the report table"""
+    events = Event.objects.filter(pk__in=event_ids).select_related('game', 'organizer__user')
+    UserEvent.objects.bulk_create(
+        [user_event_row(event) for event in events],
+        update_conflicts=True,
+        unique_fields=['event'],
+        update_fields=[
+            'game', 'game_name', 'description', 'date', 'time', 'gamer', 'full_name'
+        ],
+    )
+
+
+def rename_user(user):
+    """Update the name shown next to everything the user's gamer owns or organizes"""
+    name = full_name(user)
+    UserGame.objects.filter(gamer__user_id=user.pk).update(full_name=name)
+    UserEvent.objects.filter(gamer__user_id=user.pk).update(full_name=name)
+
+
+def rebuild(batch_size=2000):
+    """Throw away both report tables and copy every game and event again"""
+    with transaction.atomic():
+        UserGame.objects.all().delete()
+        UserEvent.objects.all().delete()
+
+        games = Game.objects.select_related('gamer__user').order_by('pk')
+        _copy(games.iterator(chunk_size=batch_size), user_game_row, UserGame, batch_size)
+
+        events = Event.objects.select_related('game', 'organizer__user').order_by('pk')
+        _copy(events.iterator(chunk_size=batch_size), user_event_row, UserEvent, batch_size)
+
+
+def _copy(instances, build_row, model, batch_size):
+    batch = []
+    for instance in instances:
+        batch.append(build_row(instance))
+        if len(batch) >= batch_size:
+            model.objects.bulk_create(batch)
+            batch = []
+    model.objects.bulk_create(batch)
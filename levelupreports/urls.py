@@ -1,7 +1,9 @@
 from django.urls import path
-from .views import UserGameList, UserEventList
+from .views import GamerRank, Leaderboard, UserGameList, UserEventList
 
 urlpatterns = [
     path('reports/usergames', UserGameList.as_view()),
     path('reports/userevents', UserEventList.as_view()),
+    path('reports/leaderboard', Leaderboard.as_view()),
+    path('reports/leaderboard/<int:gamer_id>', GamerRank.as_view()),
 ]
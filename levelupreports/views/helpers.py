@@ -1,3 +1,20 @@
+import csv
+import json
+from itertools import groupby
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.http import StreamingHttpResponse
+from django.template.loader import get_template
+from django.utils.cache import patch_vary_headers
+
+# Media types for each format a report can be downloaded in
+REPORT_FORMATS = {
+    'html': 'text/html; charset=utf-8',
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
 
 
 def dict_fetch_all(cursor):
@@ -7,3 +24,176 @@ def dict_fetch_all(cursor):
         dict(zip(columns, row))
         for row in cursor.fetchall()
     ]
+
+
+def dict_fetch_iter(cursor, batch_size=1000):
+    """Yield the rows from a cursor as dictionaries, `batch_size` at a time
+
+    Unlike dict_fetch_all, only one batch of rows is held in memory at
+    once, so it can be used for results of any size.
+    """
+    columns = [col[0] for col in cursor.description]
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        for row in rows:
+            yield dict(zip(columns, row))
+
+
+def group_by_gamer(rows, collection, build_item):
+    """Nest flat report rows under the gamer each one belongs to
+
+    The rows must be ordered by gamer_id. Each gamer's entry is yielded as
+    soon as their last row has been read, so only one gamer's items are
+    held in memory at a time and the rows are read in a single pass.
+
+    Arguments:
+        rows -- iterable of row dictionaries with gamer_id and full_name
+        collection -- key to gather each gamer's items under, e.g. "games"
+        build_item -- function that turns a row into the item to gather
+    """
+    for gamer_id, gamer_rows in groupby(rows, key=lambda row: row['gamer_id']):
+        first = next(gamer_rows)
+        yield {
+            "gamer_id": gamer_id,
+            "full_name": first['full_name'],
+            collection: [build_item(first)] + [build_item(row) for row in gamer_rows]
+        }
+
+
+def stream_report(heading, item_template, items, chunk_size=8192):
+    """Render a report page piece by piece for a StreamingHttpResponse
+
+    The page header and footer are rendered once and `item_template` is
+    rendered for each item with the item as `user`. Rendered pieces are
+    gathered into chunks of about `chunk_size` characters before they are
+    handed to the server.
+    """
+    header = get_template('users/report_header.html')
+    item = get_template(item_template)
+    footer = get_template('users/report_footer.html')
+
+    chunk = [header.render({"heading": heading})]
+    size = len(chunk[0])
+
+    for user in items:
+        piece = item.render({"user": user})
+        chunk.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            yield ''.join(chunk)
+            chunk, size = [], 0
+
+    chunk.append(footer.render({}))
+    yield ''.join(chunk)
+
+
+def report_page(heading, item_template, items):
+    """Stream a report page rendered by stream_report
+
+    Like export_rows, the response varies on Accept, which the format of
+    a report is picked from.
+    """
+    response = StreamingHttpResponse(stream_report(heading, item_template, items))
+    patch_vary_headers(response, ('Accept',))
+    return response
+
+
+def report_format(request):
+    """Pick the format to send a report in
+
+    An explicit `?format=html|json|ndjson|csv` wins. Otherwise the most
+    preferred media type in the Accept header that a report can be sent
+    as is used, falling back to html (which is what browsers ask for).
+    """
+    requested = request.GET.get('format')
+    if requested in REPORT_FORMATS:
+        return requested
+
+    accepted = []
+    for position, media_range in enumerate(request.headers.get('Accept', '').split(',')):
+        media_type, *params = [part.strip() for part in media_range.split(';')]
+        quality = 1.0
+        for param in params:
+            if param.startswith('q='):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        accepted.append((-quality, position, media_type.lower()))
+
+    for _, _, media_type in sorted(accepted):
+        for name, content_type in REPORT_FORMATS.items():
+            if media_type == content_type.split(';')[0]:
+                return name
+
+    return 'html'
+
+
+def export_rows(fmt, sql, filename, params=None):
+    """Stream the rows of a report query straight to the client as `fmt`
+
+    Rows are written out as flat records in the order the query returns
+    them, one fetch batch at a time, without being grouped by gamer first,
+    so exports of any size run in constant memory.
+    """
+    response = StreamingHttpResponse(
+        _write_rows(fmt, sql, params), content_type=REPORT_FORMATS[fmt]
+    )
+    if fmt == 'csv':
+        response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+    # Caches must not hand one format to a client that asked for another
+    patch_vary_headers(response, ('Accept',))
+    return response
+
+
+def _write_rows(fmt, sql, params=None, chunk_size=8192):
+    with connection.cursor() as db_cursor:
+        db_cursor.execute(sql, params)
+        columns = [col[0] for col in db_cursor.description]
+        pieces = ROW_WRITERS[fmt](columns, dict_fetch_iter(db_cursor))
+
+        chunk, size = [], 0
+        for piece in pieces:
+            chunk.append(piece)
+            size += len(piece)
+            if size >= chunk_size:
+                yield ''.join(chunk)
+                chunk, size = [], 0
+        yield ''.join(chunk)
+
+
+def _write_json(columns, rows):
+    yield '['
+    separator = ''
+    for row in rows:
+        yield separator + json.dumps(row, cls=DjangoJSONEncoder)
+        separator = ','
+    yield ']'
+
+
+def _write_ndjson(columns, rows):
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder) + '\n'
+
+
+class _Echo:
+    """File-like object that hands back whatever csv.writer writes to it"""
+
+    def write(self, value):
+        return value
+
+
+def _write_csv(columns, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([row[column] for column in columns])
+
+
+ROW_WRITERS = {
+    'json': _write_json,
+    'ndjson': _write_ndjson,
+    'csv': _write_csv,
+}
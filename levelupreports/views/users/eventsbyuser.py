@@ -1,89 +1,65 @@
 """Module for generating events by user report"""
-from django.shortcuts import render
 from django.db import connection
 from django.views import View
 
-from levelupreports.views.helpers import dict_fetch_all
+from levelupreports.models import UserEvent
+from levelupreports.views.helpers import (
+    dict_fetch_iter, export_rows, group_by_gamer, report_format, report_page
+)
 
+# Read from the report table that is kept up to date as events change,
+# ordered by gamer so each gamer's rows arrive together and can be
+# grouped as they are read. The (gamer, event) index serves the order.
+EVENTS_BY_USER_SQL = f"""
+    SELECT event_id AS id, game_name, description, date, time, gamer_id, full_name
+    FROM {UserEvent._meta.db_table}
+    ORDER BY gamer_id, event_id
+"""
+
+
+def build_event(row):
+    """Pick the event details out of an events by user row"""
+    return {
+        "id": row['id'],
+        "game_name": row['game_name'],
+        "description": row['description'],
+        "date": row['date'],
+        "time": row['time'],
+    }
 
-class UserEventList(View):
-    def get(self, request):
-        with connection.cursor() as db_cursor:
 
-            # TODO: Write a query to get all events along with the eventr first name, last name, and id
-            db_cursor.execute("""
-                SELECT * FROM EVENTS_BY_USER
-            """)
-            # Pass the db_cursor to the dict_fetch_all function to turn the fetch_all() response into a dictionary
-            dataset = dict_fetch_all(db_cursor)
+def events_by_user():
+    """Yield each gamer with the events they organize, one gamer at a time
 
-            # Take the flat data from the dataset, and build the
-            # following data structure for each eventr.
-            # This will be the structure of the events_by_user list:
-            #
-            # [
-            # {
-            #     "gamer_id": 1,
-            #     "full_name": "Molly Ringwald",
-            #     "events": [
-            #       {
-            #         "id": 5,
-            #         "game_name": "Fortress America",
-            #         "description": "fun game night with friends",
-            #         "date": "2020-12-23",
-            #         "time": "19:00"
-            #       }
-            #     ]
-            # }
-            # ]
+    Each item has this structure:
 
-            events_by_user = []
+    {
+        "gamer_id": 1,
+        "full_name": "Molly Ringwald",
+        "events": [
+          {
+            "id": 5,
+            "game_name": "Fortress America",
+            "description": "fun game night with friends",
+            "date": "2020-12-23",
+            "time": "19:00"
+          }
+        ]
+    }
+    """
+    with connection.cursor() as db_cursor:
+        db_cursor.execute(EVENTS_BY_USER_SQL)
 
-            for row in dataset:
-                # TODO: Create a dictionary called event that includes 
-                # the game_name, description, date,
-                # and time from the row dictionary
-                event = {
-                    "id": row['id'],
-                    "game_name": row['game_name'],
-                    "description": row['description'],
-                    "date": row['date'],
-                    "time": row['time'],
-                }
-                
-                # This is using a generator comprehension to find the user_dict in the events_by_user list
-                # The next function grabs the dictionary at the beginning of the generator, if the generator is empty it returns None
-                # This code is equivalent to:
-                # user_dict = None
-                # for user_event in events_by_user:
-                #     if user_event['gamer_id'] == row['gamer_id']:
-                #         user_dict = user_event
-                
-                user_dict = next(
-                    (
-                        user_event for user_event in events_by_user
-                        if user_event['gamer_id'] == row['gamer_id']
-                    ),
-                    None
-                )
-                
-                if user_dict:
-                    # If the user_dict is already in the events_by_user list, append the event to the events list
-                    user_dict['events'].append(event)
-                else:
-                    # If the user is not on the events_by_user list, create and add the user to the list
-                    events_by_user.append({
-                        "gamer_id": row['gamer_id'],
-                        "full_name": row['full_name'],
-                        "events": [event]
-                    })
-        
-        # The template string must match the file name of the html template
-        template = 'users/list_with_events.html'
-        
-        # The context will be a dictionary that the template can access to show data
-        context = {
-            "userevent_list": events_by_user
-        }
+        yield from group_by_gamer(dict_fetch_iter(db_cursor), "events", build_event)
+
+
+class UserEventList(View):
+    def get(self, request):
+        # Machine readable formats are written straight from the rows
+        fmt = report_format(request)
+        if fmt != 'html':
+            return export_rows(fmt, EVENTS_BY_USER_SQL, 'events_by_user')
 
-        return render(request, template, context)
+        # Render the page one gamer at a time as the rows come out of the
+        # database, instead of loading the whole report into memory first
+        return report_page("User Events", 'users/events_for_user.html', events_by_user())
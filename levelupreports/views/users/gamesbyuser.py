@@ -1,99 +1,68 @@
 """Module for generating games by user report"""
-from django.shortcuts import render
 from django.db import connection
 from django.views import View
 
-from levelupreports.views.helpers import dict_fetch_all
+from levelupreports.models import UserGame
+from levelupreports.views.helpers import (
+    dict_fetch_iter, export_rows, group_by_gamer, report_format, report_page
+)
 
+# Read from the report table that is kept up to date as games change,
+# ordered by gamer so each gamer's rows arrive together and can be
+# grouped as they are read. The (gamer, game) index serves the order.
+GAMES_BY_USER_SQL = f"""
+    SELECT game_id AS id, title, maker, number_of_players, skill_level, game_type_id,
+        gamer_id, full_name
+    FROM {UserGame._meta.db_table}
+    ORDER BY gamer_id, game_id
+"""
+
+
+def build_game(row):
+    """Pick the game details out of a games by user row"""
+    return {
+        "id": row['id'],
+        "title": row['title'],
+        "maker": row['maker'],
+        "number_players": row['number_of_players'],
+        "skill_level": row['skill_level'],
+        'game_type_id': row['game_type_id']
+    }
 
-class UserGameList(View):
-    def get(self, request):
-        with connection.cursor() as db_cursor:
 
-            # TODO: Write a query to get all games along with the gamer first name, last name, and id
-            db_cursor.execute("""
-                SELECT * FROM GAMES_BY_USER
-            """)
-            # Pass the db_cursor to the dict_fetch_all function to turn the fetch_all() response into a dictionary
-            dataset = dict_fetch_all(db_cursor)
+def games_by_user():
+    """Yield each gamer with the games they own, one gamer at a time
 
-            # Take the flat data from the dataset, and build the
-            # following data structure for each gamer.
-            # This will be the structure of the games_by_user list:
-            #
-            # [
-            #   {
-            #     "id": 1,
-            #     "full_name": "Admina Straytor",
-            #     "games": [
-            #       {
-            #         "id": 1,
-            #         "title": "Foo",
-            #         "maker": "Bar Games",
-            #         "skill_level": 3,
-            #         "number_of_players": 4,
-            #         "game_type_id": 2
-            #       },
-            #       {
-            #         "id": 2,
-            #         "title": "Foo 2",
-            #         "maker": "Bar Games 2",
-            #         "skill_level": 3,
-            #         "number_of_players": 4,
-            #         "game_type_id": 2
-            #       }
-            #     ]
-            #   },
-            # ]
+    Each item has this structure:
 
-            games_by_user = []
+    {
+        "gamer_id": 1,
+        "full_name": "Admina Straytor",
+        "games": [
+          {
+            "id": 1,
+            "title": "Foo",
+            "maker": "Bar Games",
+            "number_players": 4,
+            "skill_level": 3,
+            "game_type_id": 2
+          }
+        ]
+    }
+    """
+    with connection.cursor() as db_cursor:
+        db_cursor.execute(GAMES_BY_USER_SQL)
 
-            for row in dataset:
-                # TODO: Create a dictionary called game that includes 
-                # the name, number_of_players, maker,
-                # game_type_id, and skill_level from the row dictionary
-                game = {
-                    "id": row['id'],
-                    "title": row['title'],
-                    "maker": row['maker'],
-                    "number_players": row['number_of_players'],
-                    "skill_level": row['skill_level'],
-                    'game_type_id': row['game_type_id']
-                }
-                
-                # This is using a generator comprehension to find the user_dict in the games_by_user list
-                # The next function grabs the dictionary at the beginning of the generator, if the generator is empty it returns None
-                # This code is equivalent to:
-                # user_dict = None
-                # for user_game in games_by_user:
-                #     if user_game['gamer_id'] == row['gamer_id']:
-                #         user_dict = user_game
-                
-                user_dict = next(
-                    (
-                        user_game for user_game in games_by_user
-                        if user_game['gamer_id'] == row['gamer_id']
-                    ),
-                    None
-                )
-                
-                if user_dict:
-                    # If the user_dict is already in the games_by_user list, append the game to the games list
-                    user_dict['games'].append(game)
-                else:
-                    # If the user is not on the games_by_user list, create and add the user to the list
-                    games_by_user.append({
-                        "gamer_id": row['gamer_id'],
-                        "full_name": row['full_name'],
-                        "games": [game]
-                    })
-        
-        # The template string must match the file name of the html template
-        template = 'users/list_with_games.html'
-        
-        # The context will be a dictionary that the template can access to show data
-        context = {
-            "usergame_list": games_by_user
-        }
+        yield from group_by_gamer(dict_fetch_iter(db_cursor), "games", build_game)
+
+
+class UserGameList(View):
+    def get(self, request):
+        # Machine readable formats are written straight from the rows
+        fmt = report_format(request)
+        if fmt != 'html':
+            return export_rows(fmt, GAMES_BY_USER_SQL, 'games_by_user')
 
-        return render(request, template, context)
+        # Render the page one gamer at a time as the rows come out of the
+        # database, instead of loading the whole report into memory first
+        return report_page("User Games", 'users/games_for_user.html', games_by_user())
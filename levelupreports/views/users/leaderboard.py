@@ -0,0 +1,92 @@
+"""Module for generating the gamer leaderboard"""
+from django.db import connection
+from django.http import HttpResponseBadRequest, JsonResponse
+from django.views import View
+
+from levelupreports.leaderboard import RANKINGS
+from levelupreports.models import GamerScore
+from levelupreports.views.helpers import (
+    dict_fetch_all, dict_fetch_iter, export_rows, report_format, report_page
+)
+
+# Default and largest number of gamers on the leaderboard
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 100
+
+
+def leaderboard_sql(ranking, where=''):
+    """Read gamers from the score table, best first by `ranking`
+
+    The order is served by the (ranking, gamer) index, and each gamer's
+    rank is one more than the number of gamers with more, counted from the
+    same index. Gamers who tie share a rank.
+    """
+    table = GamerScore._meta.db_table
+    return f"""
+        SELECT gamer_id, full_name, games_owned, events_organized, events_attended, score,
+            (SELECT COUNT(*) FROM {table} AS above WHERE above.{ranking} > scores.{ranking}) + 1
+                AS rank
+        FROM {table} AS scores
+        {where}
+        ORDER BY {ranking} DESC, gamer_id
+        LIMIT %s
+    """
+
+
+def leaderboard(ranking, limit):
+    """Yield the top `limit` gamers by `ranking`, one at a time
+
+    Each item has this structure:
+
+    {
+        "gamer_id": 1,
+        "full_name": "Admina Straytor",
+        "games_owned": 2,
+        "events_organized": 1,
+        "events_attended": 3,
+        "score": 11,
+        "rank": 1
+    }
+    """
+    with connection.cursor() as db_cursor:
+        db_cursor.execute(leaderboard_sql(ranking), [limit])
+
+        yield from dict_fetch_iter(db_cursor)
+
+
+def ranking_param(request):
+    """The column to rank by, from `?by=`, or None if it cannot be ranked by"""
+    ranking = request.GET.get('by', 'score')
+    return ranking if ranking in RANKINGS else None
+
+
+class Leaderboard(View):
+    def get(self, request):
+        ranking = ranking_param(request)
+        if ranking is None:
+            return HttpResponseBadRequest(f"by must be one of {', '.join(RANKINGS)}")
+        try:
+            limit = min(max(int(request.GET.get('limit', DEFAULT_LIMIT)), 1), MAX_LIMIT)
+        except ValueError:
+            return HttpResponseBadRequest('limit must be a number')
+
+        fmt = report_format(request)
+        if fmt != 'html':
+            return export_rows(fmt, leaderboard_sql(ranking), 'leaderboard', [limit])
+
+        return report_page("Leaderboard", 'users/leaderboard_row.html', leaderboard(ranking, limit))
+
+
+class GamerRank(View):
+    def get(self, request, gamer_id):
+        ranking = ranking_param(request)
+        if ranking is None:
+            return HttpResponseBadRequest(f"by must be one of {', '.join(RANKINGS)}")
+
+        with connection.cursor() as db_cursor:
+            db_cursor.execute(leaderboard_sql(ranking, 'WHERE gamer_id = %s'), [gamer_id, 1])
+            rows = dict_fetch_all(db_cursor)
+
+        if not rows:
+            return JsonResponse({'message': 'Gamer does not exist.'}, status=404)
+        return JsonResponse(rows[0])
@@ -1,3 +1,11 @@
 from .game_tests import GameTests
 from .event_tests import EventTests
-from .game_type_tests import GameTypeTests
\ No newline at end of file
+from .game_type_tests import GameTypeTests
+from .auth_tests import AuthTests
+from .report_tests import LeaderboardTests, ReportTests, ReportViewTests
+from .query_plan_tests import QueryPlanTests
+from .renderer_tests import RendererTests, ValuesSerializerTests
+from .compression_tests import CompressionTests
+from .async_tests import AsyncReadTests
+from .gamer_tests import CalendarTests
+from .search_tests import SearchTests
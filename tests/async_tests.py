@@ -0,0 +1,77 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+
+from levelupapi.models import Event, Game, GameType, Gamer
+from tests.helpers import clear_caches
+
+@override_settings(ROOT_URLCONF='levelup.async_urls')
+class AsyncReadTests(TestCase):
+    def setUp(self):
+        """
+        Seed a gamer with a game and a couple of events, one of them joined
+        """
+        clear_caches()
+
+        user = User.objects.create_user(
+            username="molly", password="Admin8*", first_name="Molly", last_name="Ringwald"
+        )
+        gamer = Gamer.objects.create(user=user, bio="Here to play")
+        game_type = GameType.objects.create(label="Board Game")
+        game = Game.objects.create(
+            title="Fortress America", maker="Milton Bradley", number_of_players=4,
+            skill_level=3, game_type=game_type, gamer=gamer
+        )
+        for day in range(1, 4):
+            event = Event.objects.create(
+                game=game, description="fun game night with friends", date=f"2020-12-0{day}",
+                time="19:00", organizer=gamer
+            )
+        event.attendees.add(gamer)
+        self.token = Token.objects.create(user=user)
+        self.auth = {"headers": {"Authorization": f"Token {self.token.key}"}}
+
+    async def test_same_as_sync_views(self):
+        """
+        Ensure the async list views answer exactly as the DRF viewsets do.
+        """
+        for url in ["/events?page_size=2", "/events?expand=&joined=true", "/games?fields=id,title",
+                    "/gametypes"]:
+            with override_settings(ROOT_URLCONF='levelup.urls'):
+                expected = await self.async_client.get(url, **self.auth)
+            await sync_to_async(clear_caches)()
+            response = await self.async_client.get(url, **self.auth)
+            await sync_to_async(clear_caches)()
+
+            self.assertEqual(response.status_code, 200, url)
+            self.assertEqual(response.content, expected.content, url)
+            self.assertEqual(response["Content-Type"], "application/json")
+
+    async def test_conditional_and_errors(self):
+        """
+        Ensure the async views revalidate with ETags and report errors like DRF.
+        """
+        response = await self.async_client.get("/events", **self.auth)
+        response = await self.async_client.get(
+            "/events", headers={**self.auth["headers"], "If-None-Match": response["ETag"]}
+        )
+        self.assertEqual(response.status_code, 304)
+
+        response = await self.async_client.get("/events")
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response["WWW-Authenticate"], "Token")
+
+        response = await self.async_client.get("/events?from=someday", **self.auth)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("from", response.json())
+
+    def test_writes_go_to_viewsets(self):
+        """
+        Ensure requests other than GET are still handled by the viewsets.
+        """
+        response = self.client.post("/events", {
+            "gameId": 1, "description": "Another night", "date": "2020-12-09", "time": "19:00"
+        }, content_type="application/json", **self.auth)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Event.objects.count(), 4)
@@ -0,0 +1,88 @@
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework.authtoken.models import Token
+
+from tests.helpers import clear_caches
+
+class AuthTests(APITestCase):
+    def setUp(self):
+        """
+        Create a new Gamer, collect the auth Token
+        """
+        clear_caches()
+
+        # Define the URL path for registering a Gamer
+        url = '/register'
+
+        # Define the Gamer properties
+        gamer = {
+            "username": "steve",
+            "password": "Admin8*",
+            "email": "steve@stevebrownlee.com",
+            "address": "100 Infinity Way",
+            "phone_number": "555-1212",
+            "first_name": "Steve",
+            "last_name": "Brownlee",
+            "bio": "Love those gamez!!"
+        }
+
+        # Initiate POST request and capture the response
+        response = self.client.post(url, gamer, format='json')
+
+        # Store the TOKEN from the response data
+        self.token = Token.objects.get(pk=response.data['token'])
+
+        # Use the TOKEN to authenticate the requests
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+
+        # Assert that the response status code is 201 (CREATED)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_token_is_cached(self):
+        """
+        Ensure a repeat caller is authenticated without querying the database.
+        """
+
+        # The first request looks the token up and lists the game types
+        with self.assertNumQueries(2):
+            response = self.client.get("/gametypes")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # The second request only lists the game types. It uses a different
+        # query string so that it is not answered from the response cache
+        with self.assertNumQueries(1):
+            response = self.client.get("/gametypes?again=1")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_deleted_token_is_rejected(self):
+        """
+        Ensure a token stops working as soon as its deletion commits.
+        """
+
+        # Authenticate once so the token is cached
+        response = self.client.get("/gametypes")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.token.delete()
+
+        # Assert that the response status code is 401 (UNAUTHORIZED)
+        response = self.client.get("/gametypes")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_is_rejected(self):
+        """
+        Ensure a cached token stops working when its user is deactivated.
+        """
+
+        # Authenticate once so the token is cached
+        response = self.client.get("/gametypes")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.token.user.is_active = False
+            self.token.user.save()
+
+        # Assert that the response status code is 401 (UNAUTHORIZED)
+        response = self.client.get("/gametypes")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
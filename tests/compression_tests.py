@@ -0,0 +1,82 @@
+import gzip
+import unittest
+from django.contrib.auth.models import User
+from django.test import override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from levelupapi import compression
+from levelupapi.models import Event, Game, GameType, Gamer
+from tests.helpers import clear_caches
+
+@override_settings(COMPRESSION_MIN_LENGTH=500)
+class CompressionTests(APITestCase):
+    def setUp(self):
+        """
+        Seed a gamer with a game and enough events to pass the size threshold
+        """
+        clear_caches()
+
+        user = User.objects.create_user(
+            username="molly", password="Admin8*", first_name="Molly", last_name="Ringwald"
+        )
+        gamer = Gamer.objects.create(user=user, bio="Here to play")
+        game_type = GameType.objects.create(label="Board Game")
+        game = Game.objects.create(
+            title="Fortress America", maker="Milton Bradley", number_of_players=4,
+            skill_level=3, game_type=game_type, gamer=gamer
+        )
+        for day in range(1, 10):
+            Event.objects.create(
+                game=game, description="fun game night with friends", date=f"2020-12-0{day}",
+                time="19:00", organizer=gamer
+            )
+        token = Token.objects.create(user=user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+    def test_compress_large_response(self):
+        """
+        Ensure responses over the threshold are gzipped for clients that accept it.
+        """
+        response = self.client.get("/events", HTTP_ACCEPT_ENCODING="gzip, deflate")
+
+        # Assert that the body is gzipped and decompresses to the JSON payload
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertTrue(response["ETag"].startswith('W/"'))
+        body = gzip.decompress(response.content)
+        self.assertIn(b"fun game night with friends", body)
+        self.assertEqual(int(response["Content-Length"]), len(response.content))
+
+    def test_skip_small_or_unaccepted(self):
+        """
+        Ensure small responses and clients that do not accept gzip get plain bodies.
+        """
+        response = self.client.get("/gametypes", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+        response = self.client.get("/events", HTTP_ACCEPT_ENCODING="gzip;q=0, identity")
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertIn(b"fun game night with friends", response.content)
+
+    def test_compress_streamed_report(self):
+        """
+        Ensure streamed reports are compressed chunk by chunk.
+        """
+        response = self.client.get("/reports/userevents", HTTP_ACCEPT_ENCODING="gzip")
+
+        # Assert that the report is still streamed and decompresses to the page
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        content = gzip.decompress(b"".join(response.streaming_content)).decode()
+        self.assertIn("<h2>Molly Ringwald</h2>", content)
+        self.assertTrue(content.rstrip().endswith("</html>"))
+
+    @unittest.skipIf(compression.brotli is None, "brotli is not installed")
+    def test_prefer_brotli(self):
+        """
+        Ensure brotli is chosen over gzip when it is installed and accepted.
+        """
+        response = self.client.get("/events", HTTP_ACCEPT_ENCODING="gzip, br")
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertIn(b"fun game night with friends", compression.brotli.decompress(response.content))
@@ -1,13 +1,23 @@
+import datetime
+import io
+from django.core.management import call_command
 from rest_framework import status
 from rest_framework.test import APITestCase
 from rest_framework.authtoken.models import Token
-from levelupapi.models import Event, Game, GameType
+from django.contrib.auth.models import User
+from django.test import RequestFactory
+from django.utils import timezone
+from levelupapi import versions
+from levelupapi.models import Event, Game, GameType, Gamer
+from levelupreports.models import UserEvent
+from tests.helpers import clear_caches
 
 class EventTests(APITestCase):
     def setUp(self):
         """
         Create a new Gamer, collect the auth Token, and create a sample Game
         """
+        clear_caches()
 
         # Define the URL path for registering a Gamer
         url = '/register'
@@ -120,6 +130,17 @@ class EventTests(APITestCase):
         self.assertEqual(response.data["date"], event.date)
         self.assertEqual(response.data["time"], event.time)
         self.assertEqual(response.data["organizer"]['id'], event.organizer_id)
+        self.assertIs(response.data["joined"], False)
+        self.assertEqual(response.data["attendees_count"], 0)
+
+        # Sign up for the event and assert that it now shows as joined
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f'{url}/signup')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response = self.client.get(url)
+        self.assertIs(response.data["joined"], True)
+        self.assertEqual(response.data["attendees_count"], 1)
 
 
     def test_change_event(self):
@@ -201,3 +222,356 @@ class EventTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
 
+
+    def test_list_events_paginated(self):
+        """
+        Ensure events are listed a page at a time in date order.
+        """
+
+        # Create events out of order so the ordering is not just insertion order
+        for date, time in [("2022-03-01", "18:00:00"), ("2022-02-22", "12:00:00"),
+                           ("2022-03-01", "09:00:00")]:
+            event = Event()
+            event.game_id = 1
+            event.description = "Let's play sorry!"
+            event.date = date
+            event.time = time
+            event.organizer_id = 1
+            event.save()
+
+        # Initiate GET request for the first page and capture the response
+        response = self.client.get("/events?page_size=2")
+
+        # Assert that the response status code is 200 (OK)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # Assert that the first page holds the two earliest events
+        self.assertEqual(
+            [(event["date"], event["time"]) for event in response.data["results"]],
+            [("2022-02-22", "12:00:00"), ("2022-03-01", "09:00:00")]
+        )
+        self.assertIsNone(response.data["previous"])
+        self.assertIsNotNone(response.data["next"])
+
+        # Follow the next link to the last page
+        response = self.client.get(response.data["next"])
+        self.assertEqual(
+            [(event["date"], event["time"]) for event in response.data["results"]],
+            [("2022-03-01", "18:00:00")]
+        )
+        self.assertIsNone(response.data["next"])
+
+        # Follow the previous link back to the two events before it
+        response = self.client.get(response.data["previous"])
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertEqual(response.data["results"][1]["time"], "09:00:00")
+        self.assertIsNone(response.data["previous"])
+
+        # Assert that a tampered cursor is rejected
+        response = self.client.get("/events?cursor=not-a-cursor")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+    def test_list_events_query_count(self):
+        """
+        Ensure listing events costs a fixed number of queries.
+        """
+
+        # Create a few more gamers to sign up for the events
+        gamers = [
+            Gamer.objects.create(
+                bio="Here to play",
+                user=User.objects.create_user(username=f"gamer{index}", password="Admin8*")
+            )
+            for index in range(3)
+        ]
+
+        # Create events that every gamer attends
+        for day in range(1, 6):
+            event = Event()
+            event.game_id = 1
+            event.description = "Let's play sorry!"
+            event.date = f"2022-02-0{day}"
+            event.time = "12:00:00"
+            event.organizer_id = 1
+            event.save()
+            event.attendees.add(*gamers)
+
+        # Authenticate (token, user and gamer), load the events and the attendees
+        with self.assertNumQueries(3):
+            response = self.client.get("/events")
+
+        # Assert that the response status code is 200 (OK)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # Assert that the nested attendee values are correct
+        self.assertEqual(len(response.data["results"]), 5)
+        attendee = response.data["results"][0]["attendees"][0]
+        self.assertEqual(attendee["user"]["username"], "gamer0")
+        self.assertNotIn("password", attendee["user"])
+
+
+    def test_stored_counts(self):
+        """
+        Ensure the stored event and attendee counts follow every write.
+        """
+
+        # Hold on to a copy of the game from before it has any events
+        stale_game = Game.objects.get(pk=1)
+
+        # Create an event through the API and sign up for it
+        event = {
+            "gameId": 1,
+            "description": "Let's play sorry!",
+            "date": "2022-02-22",
+            "time": "12:00:00",
+        }
+        response = self.client.post("/events", event, format='json')
+        url = f'/events/{response.data["id"]}'
+        self.client.post(f'{url}/signup')
+        self.client.post(f'{url}/signup')
+
+        # Another gamer joins from the gamer side of the relationship
+        other = Gamer.objects.create(
+            bio="Here to play",
+            user=User.objects.create_user(username="other", password="Admin8*")
+        )
+        other.attending.add(response.data["id"])
+
+        # Saving the stale copy must not overwrite the newer count
+        stale_game.save()
+
+        # Assert that the counts are correct
+        self.assertEqual(Game.objects.get(pk=1).event_count, 1)
+        self.assertEqual(Event.objects.get(pk=response.data["id"]).attendees_count, 2)
+
+        # Leave the event and delete the other gamer, which cascades
+        self.client.delete(f'{url}/leave')
+        other.delete()
+        self.assertEqual(Event.objects.get(pk=response.data["id"]).attendees_count, 0)
+
+        # Break the count on purpose and let the management command repair it
+        Game.objects.filter(pk=1).update(event_count=7)
+        output = io.StringIO()
+        call_command('reconcile_counts', stdout=output)
+        self.assertIn('1 game(s) and 0 event(s)', output.getvalue())
+        self.assertEqual(Game.objects.get(pk=1).event_count, 1)
+
+        # Assert that deleting the event updates the game
+        self.client.delete(url)
+        self.assertEqual(Game.objects.get(pk=1).event_count, 0)
+
+
+    def test_list_events_not_modified(self):
+        """
+        Ensure the events list is revalidated with a 304 until attendance changes.
+        """
+
+        # Create a new instance of Event
+        event = Event()
+        event.game_id = 1
+        event.description = "Let's play sorry!"
+        event.date = "2022-02-22"
+        event.time = "12:00:00"
+        event.organizer_id = 1
+        event.save()
+
+        # Initiate GET request and capture the ETag from the response
+        response = self.client.get("/events")
+        etag = response['ETag']
+
+        # Assert that asking again with the ETag returns 304 (NOT MODIFIED)
+        response = self.client.get("/events", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # Sign up for the event, which changes the list once it commits
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.client.post(f'/events/{event.id}/signup')
+            response = self.client.get("/events", HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertTrue(callbacks)
+
+        # Assert that the old ETag no longer matches
+        response = self.client.get("/events", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIs(response.data["results"][0]["joined"], True)
+
+
+    def test_bulk_events(self):
+        """
+        Ensure events can be created, updated and deleted in batches.
+        """
+
+        # Create a second game to move events to
+        game = Game.objects.create(
+            title="Clue", maker="Hasbro", skill_level=3, number_of_players=6,
+            game_type_id=1, gamer_id=1
+        )
+
+        # Define a batch where the second event refers to a missing game
+        events = [
+            {"gameId": 1, "description": "Sorry night", "date": "2022-02-22", "time": "12:00:00"},
+            {"gameId": 99, "description": "Mystery night", "date": "2022-02-23", "time": "12:00:00"},
+            {"gameId": 1, "description": "Sorry again", "date": "2022-02-24", "time": "12:00:00"},
+        ]
+
+        # Initiate POST request and capture the response
+        response = self.client.post("/events/bulk", events, format='json')
+
+        # Assert that the valid events were created and the invalid one reported
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data["created"]), 2)
+        self.assertEqual(response.data["errors"][0]["index"], 1)
+        self.assertIn("gameId", response.data["errors"][0]["errors"])
+        self.assertEqual(Game.objects.get(pk=1).event_count, 2)
+        self.assertEqual(UserEvent.objects.count(), 2)
+
+        # Move the first event to the other game
+        first, second = response.data["created"]
+        response = self.client.put("/events/bulk", [
+            {"id": first, "gameId": game.id, "description": "Clue night",
+             "date": "2022-02-22", "time": "12:00:00"},
+        ], format='json')
+        self.assertEqual(response.data["updated"], [first])
+        self.assertEqual(Game.objects.get(pk=1).event_count, 1)
+        self.assertEqual(Game.objects.get(pk=game.id).event_count, 1)
+        self.assertEqual(UserEvent.objects.get(pk=first).game_name, "Clue")
+
+        # Delete both events and one that does not exist
+        response = self.client.delete("/events/bulk", {"ids": [first, second, 99]}, format='json')
+        self.assertEqual(response.data["deleted"], [first, second])
+        self.assertEqual(response.data["errors"][0]["index"], 2)
+        self.assertEqual(Event.objects.count(), 0)
+
+    def test_batch_attendance(self):
+        """
+        Ensure many gamers can be signed up for and out of events at once.
+        """
+
+        # Seed two events organized by the current gamer and a second gamer
+        first = Event.objects.create(
+            game_id=1, organizer_id=1, description="Sorry night",
+            date="2022-02-22", time="12:00:00"
+        )
+        second = Event.objects.create(
+            game_id=1, organizer_id=1, description="Sorry again",
+            date="2022-02-23", time="12:00:00"
+        )
+        user = User.objects.create_user(username="joe", password="pw")
+        other = Gamer.objects.create(user=user, bio="Another gamer")
+
+        # Sign both gamers up for both events, plus one missing event
+        pairs = [
+            {"event": first.id, "gamer": 1},
+            {"event": first.id, "gamer": other.id},
+            {"event": second.id, "gamer": other.id},
+            {"event": 99, "gamer": 1},
+        ]
+        response = self.client.post("/events/attendance", {"add": pairs}, format='json')
+
+        # Assert that the valid pairs were added and the invalid one reported
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["added"]), 3)
+        self.assertEqual(response.data["errors"][0]["index"], 3)
+        self.assertEqual(response.data["errors"][0]["list"], "add")
+        self.assertEqual(Event.objects.get(pk=first.id).attendees_count, 2)
+        self.assertEqual(Event.objects.get(pk=second.id).attendees_count, 1)
+
+        # Sending the same batch again changes nothing
+        response = self.client.post("/events/attendance", {"add": pairs[:3]}, format='json')
+        self.assertEqual(response.data["added"], [])
+        self.assertEqual(Event.objects.get(pk=first.id).attendees_count, 2)
+
+        # Remove the other gamer from both events
+        response = self.client.post("/events/attendance", {
+            "remove": [{"event": first.id, "gamer": other.id}, {"event": second.id, "gamer": other.id}]
+        }, format='json')
+        self.assertEqual(len(response.data["removed"]), 2)
+        self.assertEqual(Event.objects.get(pk=first.id).attendees_count, 1)
+        self.assertEqual(Event.objects.get(pk=second.id).attendees_count, 0)
+
+        # The other gamer cannot sign the organizer out of their own event
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + Token.objects.create(user=user).key)
+        response = self.client.post("/events/attendance", {
+            "remove": [{"event": first.id, "gamer": 1}]
+        }, format='json')
+        self.assertEqual(response.data["removed"], [])
+        self.assertIn("gamer", response.data["errors"][0]["errors"])
+
+    def test_filter_events(self):
+        """
+        Ensure the events list can be narrowed down by date, game, organizer and attendance.
+        """
+
+        # Seed a past event, an event today and an event next week
+        today = timezone.localdate()
+        past, current, later = [
+            Event.objects.create(
+                game_id=1, organizer_id=1, description=description,
+                date=today + datetime.timedelta(days=days), time="12:00:00"
+            )
+            for description, days in [("Last week", -7), ("Today", 0), ("Next week", 7)]
+        ]
+        later.attendees.add(1)
+
+        def ids(query):
+            response = self.client.get(f"/events?{query}")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return [event["id"] for event in response.data["results"]]
+
+        # Assert that each filter returns only the matching events
+        self.assertEqual(ids("upcoming=true"), [current.id, later.id])
+        self.assertEqual(ids("upcoming=false"), [past.id])
+        self.assertEqual(ids(f"from={today}&to={today}"), [current.id])
+        self.assertEqual(ids("joined=true"), [later.id])
+        self.assertEqual(ids("joined=false"), [past.id, current.id])
+        self.assertEqual(ids("organizer=1&game=1"), [past.id, current.id, later.id])
+        self.assertEqual(ids("game=2"), [])
+
+        # Assert that invalid filters are rejected
+        response = self.client.get(f"/events?from={today}&to={past.date}")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get("/events?from=someday")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_sparse_fieldsets(self):
+        """
+        Ensure clients can pick the fields and nested relations of each event.
+        """
+
+        # Seed an event the current gamer attends
+        event = Event.objects.create(
+            game_id=1, organizer_id=1, description="Sorry night",
+            date="2022-02-22", time="12:00:00"
+        )
+        event.attendees.add(1)
+
+        # Ask for ids only: authenticate, load the events and the attendee ids
+        with self.assertNumQueries(3):
+            response = self.client.get("/events?fields=id,game,attendees&expand=")
+        self.assertEqual(response.data["results"], [{"id": event.id, "game": 1, "attendees": [1]}])
+
+        # Expand the game and its owner but not its type
+        response = self.client.get(f"/events/{event.id}?fields=game&expand=game.gamer")
+        self.assertEqual(response.data["game"]["game_type"], 1)
+        self.assertEqual(response.data["game"]["gamer"]["user"]["username"], "steve")
+        self.assertEqual(set(response.data), {"game"})
+
+        # Without expand every relation is nested as before
+        response = self.client.get(f"/events/{event.id}")
+        self.assertEqual(response.data["organizer"]["user"]["username"], "steve")
+
+
+    def test_viewers_do_not_share_responses(self):
+        """
+        Ensure a user without a gamer never gets the cached events of a gamer with their id.
+        """
+        gamer_request = RequestFactory().get("/events")
+        gamer_request.user, gamer_request.gamer = User(pk=9), Gamer(pk=1)
+        user_request = RequestFactory().get("/events")
+        user_request.user, user_request.gamer = User(pk=1), None
+
+        self.assertNotEqual(
+            versions.fingerprint(gamer_request, (versions.EVENTS,), per_viewer=True),
+            versions.fingerprint(user_request, (versions.EVENTS,), per_viewer=True),
+        )
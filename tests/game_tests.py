@@ -1,14 +1,21 @@
+from unittest import mock
+
+from django.db import transaction
 from rest_framework import status
 from rest_framework.test import APITestCase
 from rest_framework.authtoken.models import Token
 
+from levelupapi import versions
 from levelupapi.models import GameType, Game
+from levelupapi.suggest import PrefixIndex
+from tests.helpers import clear_caches
 
 class GameTests(APITestCase):
     def setUp(self):
         """
         Create a new Gamer, collect the auth Token, and create a sample GameType
         """
+        clear_caches()
 
         # Define the URL path for registering a Gamer
         url = '/register'
@@ -201,3 +208,120 @@ class GameTests(APITestCase):
 
         # Assert that the response status code is 404 (NOT FOUND)
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+
+    def test_bulk_create_games(self):
+        """
+        Ensure games can be created in a batch with per-game errors.
+        """
+
+        # Define a batch where the second game is missing its maker
+        games = [
+            {"title": "Clue", "maker": "Milton Bradley", "skillLevel": 5,
+             "numberOfPlayers": 6, "gameTypeId": 1},
+            {"title": "Sorry", "skillLevel": 2, "numberOfPlayers": 4, "gameTypeId": 1},
+        ]
+
+        # Initiate POST request and capture the response
+        response = self.client.post("/games/bulk", games, format='json')
+
+        # Assert that the valid game was created and the invalid one reported
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data["created"]), 1)
+        self.assertEqual(response.data["errors"][0]["index"], 1)
+        self.assertIn("maker", response.data["errors"][0]["errors"])
+
+        # Assert that the values are correct
+        game = Game.objects.get(pk=response.data["created"][0])
+        self.assertEqual(game.title, "Clue")
+        self.assertEqual(game.gamer_id, self.token.user_id)
+
+        # Assert that a body that is not a list is rejected
+        response = self.client.post("/games/bulk", games[0], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_suggest_games(self):
+        """
+        Ensure games are suggested by the start of any word of their title or maker
+        """
+        for title, maker in [("Ticket to Ride", "Days of Wonder"), ("Clue", "Milton Bradley")]:
+            self.client.post("/games", {
+                "title": title, "maker": maker, "skillLevel": 2, "numberOfPlayers": 4,
+                "gameTypeId": 1
+            }, format='json')
+        ticket, clue = Game.objects.order_by('pk')
+
+        def suggested(prefix, **params):
+            response = self.client.get("/games/suggest", {"prefix": prefix, **params})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return [game["id"] for game in response.data]
+
+        self.assertEqual(suggested("rid"), [ticket.id])
+        self.assertEqual(suggested("CL"), [clue.id])
+        self.assertEqual(suggested("milton b"), [clue.id])
+        self.assertEqual(suggested("chess"), [])
+        response = self.client.get("/games/suggest", {"prefix": "days"})
+        self.assertEqual(
+            response.data, [{"id": ticket.id, "title": "Ticket to Ride", "maker": "Days of Wonder"}]
+        )
+
+        # The index was built by the first lookup; later keystrokes are answered from memory
+        with self.assertNumQueries(0):
+            suggested("t")
+            suggested("ti")
+
+        # Changes made through the API are applied to the index once they commit
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(f"/games/{clue.id}", {
+                "title": "Clue Junior", "maker": "Hasbro", "skillLevel": 2, "numberOfPlayers": 4,
+                "gameTypeId": 1
+            }, format='json')
+        self.assertEqual(suggested("jun"), [clue.id])
+        self.assertEqual(suggested("milton"), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f"/games/{ticket.id}")
+        self.assertEqual(suggested("rid"), [])
+
+        # A change that is rolled back never reaches the index
+        with self.captureOnCommitCallbacks(execute=True), transaction.atomic():
+            Game.objects.get(pk=clue.id).delete()
+            transaction.set_rollback(True)
+        self.assertEqual(suggested("jun"), [clue.id])
+
+        # A game another process renames while this one writes is picked up
+        # on the next lookup, rather than passed over
+        index = PrefixIndex(maxsize=1000)
+        index.rebuild()
+        bump = versions.bump
+
+        def racing_bump(*collections):
+            stamps = bump(*collections)
+            Game.objects.filter(pk=clue.id).update(title="Clue Master")
+            bump(*collections)
+            return stamps
+        with mock.patch.object(versions, "bump", racing_bump):
+            index.changed(clue.id, "Clue Junior", "Hasbro")
+        self.assertEqual([game["id"] for game in index.suggest("master")], [clue.id])
+
+        # Creating a game changes the names once
+        with mock.patch.object(versions, "bump", wraps=bump) as bumps:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post("/games", {
+                    "title": "Sorry", "maker": "Parker Brothers", "skillLevel": 1, "numberOfPlayers": 4,
+                    "gameTypeId": 1
+                }, format='json')
+        self.assertEqual(
+            [call for call in bumps.call_args_list if versions.GAME_NAMES in call.args], [
+                mock.call(versions.GAME_NAMES)
+            ]
+        )
+
+        # A partial index finishes short lookups with a query
+        index = PrefixIndex(maxsize=2)
+        index.rebuild()
+        self.assertFalse(index.stats()["complete"])
+        self.assertEqual([game["id"] for game in index.suggest("has")], [clue.id])
+
+        response = self.client.get("/games/suggest")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
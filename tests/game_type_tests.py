@@ -1,12 +1,18 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.test import override_settings
 from rest_framework import status
 from rest_framework.test import APITestCase
 from rest_framework.authtoken.models import Token
+from levelupapi.caching import require_shared_caches
 from levelupapi.models import GameType
+from tests.helpers import clear_caches
 
 class GameTypeTests(APITestCase):
     def setUp(self):
         """create a new Gamer and collect the auth Token
         """
+        clear_caches()
+
         # Define the URL path for registering a Gamer
         url = '/register'
 
@@ -139,3 +145,52 @@ class GameTypeTests(APITestCase):
 
         # Assert that the response status code is 404 (NOT FOUND)
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+    def test_list_game_types_not_modified(self):
+        """ Ensure an unchanged game_type list is revalidated with a 304"""
+
+        # Initiate GET request and capture the ETag from the response
+        response = self.client.get('/gametypes')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+
+        # Assert that asking again with the ETag returns 304 (NOT MODIFIED)
+        response = self.client.get('/gametypes', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # Create a new game_type, which changes the list
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/gametypes', {"label": "RPG"}, format='json')
+
+        # Assert that the old ETag no longer matches
+        response = self.client.get('/gametypes', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]['label'], "RPG")
+
+
+    def test_list_game_types_cached(self):
+        """ Ensure a repeated game_type list is served from the response cache"""
+
+        # The first request lists the game types from the database
+        response = self.client.get('/gametypes')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # Assert that the second request does not query the database at all
+        with self.assertNumQueries(0):
+            response = self.client.get('/gametypes')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # Change a game_type and assert that the list reflects it
+        with self.captureOnCommitCallbacks(execute=True):
+            game_type = GameType.objects.create(label="Board Game")
+        response = self.client.get('/gametypes')
+        self.assertEqual(response.data[0]['label'], game_type.label)
+
+
+    def test_stamps_need_a_shared_cache(self):
+        """ Ensure several processes cannot keep their version stamps to themselves"""
+        require_shared_caches()
+        with override_settings(WEB_CONCURRENCY=2):
+            with self.assertRaises(ImproperlyConfigured):
+                require_shared_caches()
@@ -0,0 +1,146 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from levelupapi.models import Event, Game, GameType, Gamer
+from tests.helpers import clear_caches
+
+
+class CalendarTests(APITestCase):
+    def setUp(self):
+        """
+        Seed two gamers, a game, and events the first gamer organizes, has
+        joined, and has nothing to do with
+        """
+        clear_caches()
+
+        self.gamer = Gamer.objects.create(
+            user=User.objects.create_user(username="steve", password="Admin8*"), bio="Gamez"
+        )
+        self.other = Gamer.objects.create(
+            user=User.objects.create_user(username="molly", password="Admin8*"), bio="Hi"
+        )
+        self.token = Token.objects.create(user=self.gamer.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+
+        game_type = GameType.objects.create(label="Board Game")
+        self.game = Game.objects.create(
+            title="Sorry", maker="Milton Bradley", number_of_players=4, skill_level=2,
+            game_type=game_type, gamer=self.gamer
+        )
+        self.organized = Event.objects.create(
+            game=self.game, description="Sorry night, bring snacks; and friends",
+            date="2022-02-01", time="19:30", organizer=self.gamer
+        )
+        self.joined = Event.objects.create(
+            game=self.game, description="Rematch", date="2022-02-08", time="18:00",
+            organizer=self.other
+        )
+        self.joined.attendees.add(self.gamer)
+        self.other_event = Event.objects.create(
+            game=self.game, description="Private game", date="2022-02-09", time="18:00",
+            organizer=self.other
+        )
+        self.url = f'/gamers/{self.gamer.id}/calendar.ics'
+
+    def test_calendar_feed(self):
+        """
+        Ensure the feed is a valid iCalendar with the events the gamer organizes or attends
+        """
+        response = self.client.get(self.url, HTTP_ACCEPT='text/calendar')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        body = response.content.decode()
+        self.assertTrue(body.startswith('BEGIN:VCALENDAR\r\nVERSION:2.0\r\n'))
+        self.assertTrue(body.endswith('END:VCALENDAR\r\n'))
+        self.assertIn(f'UID:event-{self.organized.id}@levelup\r\n', body)
+        self.assertIn(f'UID:event-{self.joined.id}@levelup\r\n', body)
+        self.assertNotIn(f'UID:event-{self.other_event.id}@levelup', body)
+        self.assertIn('DTSTART:20220201T193000Z\r\n', body)
+        self.assertIn('SUMMARY:Sorry night\\, bring snacks\\; and friends\r\n', body)
+        self.assertTrue(all(len(line.encode()) <= 75 for line in body.split('\r\n')))
+
+        # Polling an unchanged feed needs no queries, and revalidating it no body
+        with self.assertNumQueries(0):
+            again = self.client.get(self.url)
+        self.assertEqual(again.content, response.content)
+        not_modified = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_calendar_follows_changes(self):
+        """
+        Ensure signing up, leaving, creating and changing events update the feed
+        """
+        self.client.get(self.url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/events/{self.other_event.id}/signup')
+        self.assertIn(f'UID:event-{self.other_event.id}@', self.client.get(self.url).content.decode())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f'/events/{self.joined.id}/leave')
+        self.assertNotIn(f'UID:event-{self.joined.id}@', self.client.get(self.url).content.decode())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/events', {
+                "gameId": self.game.id, "description": "New night", "date": "2022-03-01",
+                "time": "20:00"
+            }, format='json')
+        self.assertIn(f'UID:event-{response.data["id"]}@', self.client.get(self.url).content.decode())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(f'/events/{self.organized.id}', {
+                "gameId": self.game.id, "description": "Moved night", "date": "2022-02-02",
+                "time": "19:30"
+            }, format='json')
+        body = self.client.get(self.url).content.decode()
+        self.assertIn('SUMMARY:Moved night\r\n', body)
+        self.assertIn('DTSTART:20220202T193000Z\r\n', body)
+
+        # A change that is rolled back never reaches the feed
+        with self.captureOnCommitCallbacks(execute=True), transaction.atomic():
+            self.organized.description = "Cancelled night"
+            self.organized.save()
+            transaction.set_rollback(True)
+        self.assertIn('SUMMARY:Moved night\r\n', self.client.get(self.url).content.decode())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.game.title = "Sorry!"
+            self.game.save()
+        self.assertIn('DESCRIPTION:Sorry!\r\n', self.client.get(self.url).content.decode())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.put('/games/bulk', [{
+                "id": self.game.id, "title": "Sorry Deluxe", "maker": "Milton Bradley",
+                "numberOfPlayers": 4, "skillLevel": 2, "gameTypeId": self.game.game_type_id
+            }], format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('DESCRIPTION:Sorry Deluxe\r\n', self.client.get(self.url).content.decode())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f'/events/{self.organized.id}')
+        self.assertNotIn(f'UID:event-{self.organized.id}@', self.client.get(self.url).content.decode())
+
+    def test_calendar_access(self):
+        """
+        Ensure only the gamer, or a calendar app with their feed key, can read the feed
+        """
+        response = self.client.get(f'/gamers/{self.other.id}/calendar.ics')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.get(f'/gamers/{self.other.id}/calendar')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        link = self.client.get(f'/gamers/{self.gamer.id}/calendar').data['url']
+        self.assertTrue(link.startswith(f'http://testserver{self.url}?key='))
+
+        self.client.credentials()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(
+            self.client.get(f'{self.url}?key=wrong').status_code, status.HTTP_401_UNAUTHORIZED
+        )
+        response = self.client.get(link)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(f'UID:event-{self.organized.id}@', response.content.decode())
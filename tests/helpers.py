@@ -0,0 +1,10 @@
+from django.core.cache import caches
+
+from levelupapi.authentication import token_cache
+
+
+def clear_caches():
+    """Empty every cache, since they outlive each test's database transaction"""
+    for cache in caches.all():
+        cache.clear()
+    token_cache.clear()
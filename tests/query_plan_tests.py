@@ -0,0 +1,78 @@
+import datetime
+import re
+import unittest
+from django.db import connection
+from django.test import TestCase
+
+from levelupapi.models import Event, EventGamer, Game
+from levelupapi.views.pagination import EventPagination
+
+# A line of SQLite's EXPLAIN QUERY PLAN that reads a whole table, or walks
+# a whole index, from the start rather than seeking into it
+FULL_SCAN = re.compile(r'SCAN (levelupapi_\w+)\b')
+# Walking an index in order, which a bare ORDER BY ... LIMIT does and stops
+# after LIMIT rows
+ORDERED_SCAN = re.compile(r'SCAN (levelupapi_\w+) USING (COVERING )?INDEX')
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'Query plans are checked on SQLite')
+class QueryPlanTests(TestCase):
+    def assertUsesIndexes(self, queryset, ordered=False):
+        """Assert that no table in the plan of `queryset` is read in full
+
+        Every table has to be searched through an index. With `ordered`,
+        for a query that is only ordered and limited, a table may also be
+        walked in the order of an index.
+        """
+        plan = queryset.explain()
+        for line in plan.splitlines():
+            if ordered and ORDERED_SCAN.search(line):
+                continue
+            self.assertIsNone(FULL_SCAN.search(line), plan)
+
+    def test_event_pages(self):
+        """
+        Ensure events are paged through in (date, time, id) order from an index.
+        """
+        events = Event.objects.order_by(*EventPagination.ordering)
+        self.assertUsesIndexes(events[:20], ordered=True)
+
+        position = [datetime.date(2022, 2, 22), datetime.time(12), 10]
+        seek = EventPagination().seek_filter(position, reverse=False)
+        self.assertUsesIndexes(events.filter(seek)[:20])
+
+        # Paging back seeks the other way
+        seek = EventPagination().seek_filter(position, reverse=True)
+        self.assertUsesIndexes(events.reverse().filter(seek)[:20])
+
+    def test_upcoming_events(self):
+        """
+        Ensure the upcoming events are read from the (date, time, id) index.
+        """
+        events = Event.objects.upcoming().order_by(*EventPagination.ordering)
+        self.assertUsesIndexes(events[:20])
+
+    def test_events_by_organizer(self):
+        """
+        Ensure an organizer's events are read by organizer and date.
+        """
+        events = Event.objects.filter(organizer_id=1, date__gte=datetime.date(2022, 1, 1))
+        self.assertUsesIndexes(events.order_by('date'))
+
+    def test_attendance(self):
+        """
+        Ensure sign ups are found by event and gamer in either direction.
+        """
+        self.assertUsesIndexes(EventGamer.objects.filter(event_id=1, gamer_id=1))
+        self.assertUsesIndexes(EventGamer.objects.filter(gamer_id=1).values('event_id'))
+        self.assertUsesIndexes(Event.objects.with_viewer_state(1).filter(pk=1))
+
+        # The events a gamer joined are found from their sign ups
+        joined = EventGamer.objects.filter(gamer_id=1).values('event_id')
+        self.assertUsesIndexes(Event.objects.filter(pk__in=joined).order_by('date'))
+
+    def test_games_by_type(self):
+        """
+        Ensure games of one type are read in id order from an index.
+        """
+        self.assertUsesIndexes(Game.objects.filter(game_type_id=1).order_by('id'))
@@ -0,0 +1,114 @@
+import datetime
+import decimal
+import io
+from unittest import mock
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from levelupapi import renderers
+from levelupapi.models import Event, Game, GameType, Gamer
+from levelupapi.renderers import FastJSONParser, FastJSONRenderer
+from levelupapi.views.event import EventSerializer
+from levelupapi.views.game import GameSerializer
+from levelupapi.views.values import ValuesSerializer
+from tests.helpers import clear_caches
+
+class RendererTests(SimpleTestCase):
+    data = {
+        "id": 1,
+        "title": "Sorry\u2028night \U0001f3b2",
+        "date": datetime.date(2022, 2, 22),
+        "time": datetime.time(12, 30),
+        "created": datetime.datetime(2022, 2, 22, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+        "price": decimal.Decimal("1.50"),
+        "players": [1, 2, None, True],
+        "nested": {"score": 1.5},
+    }
+
+    def test_render(self):
+        """
+        Ensure FastJSONRenderer writes the same bytes as JSONRenderer.
+        """
+        self.assertEqual(FastJSONRenderer().render(self.data), JSONRenderer().render(self.data))
+
+        # Indented output and the json module fallback match as well
+        context = {"indent": 4}
+        self.assertEqual(
+            FastJSONRenderer().render(self.data, renderer_context=context),
+            JSONRenderer().render(self.data, renderer_context=context)
+        )
+        with mock.patch.object(renderers, "orjson", None):
+            self.assertEqual(FastJSONRenderer().render(self.data), JSONRenderer().render(self.data))
+
+    def test_parse(self):
+        """
+        Ensure FastJSONParser reads JSON bodies and rejects invalid ones.
+        """
+        body = '{"title": "Sorry é", "players": [1, 2]}'.encode()
+        self.assertEqual(
+            FastJSONParser().parse(io.BytesIO(body)),
+            {"title": "Sorry é", "players": [1, 2]}
+        )
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b'{"title": NaN}'))
+
+
+class ValuesSerializerTests(TestCase):
+    def setUp(self):
+        """
+        Seed two gamers, a game each, and events with and without attendees
+        """
+        clear_caches()
+
+        game_type = GameType.objects.create(label="Board Game")
+        gamers = [
+            Gamer.objects.create(
+                bio="Here to play",
+                user=User.objects.create_user(
+                    username=f"gamer{index}", first_name="Gämer", last_name=str(index),
+                    password="Admin8*"
+                )
+            )
+            for index in range(2)
+        ]
+        for index, gamer in enumerate(gamers):
+            game = Game.objects.create(
+                title=f"Game {index}", maker="Hasbro", skill_level=2, number_of_players=4,
+                game_type=game_type, gamer=gamer
+            )
+            event = Event.objects.create(
+                game=game, organizer=gamer, description="Let's play",
+                date="2022-02-22", time="12:00:00"
+            )
+            event.attendees.add(*gamers[index:])
+        self.gamer = gamers[1]
+
+    def assertSameAsSerializer(self, serializer_class, queryset, **options):
+        """Assert that ValuesSerializer renders exactly what the serializer does"""
+        expected = serializer_class(
+            serializer_class.setup_eager_loading(queryset, **options), many=True, **options
+        ).data
+        serializer = ValuesSerializer(serializer_class(**options), queryset)
+        actual = serializer.to_representation(serializer.values())
+        self.assertEqual(FastJSONRenderer().render(actual), JSONRenderer().render(expected))
+
+    def test_events(self):
+        """
+        Ensure events read from .values() rows match EventSerializer byte for byte.
+        """
+        events = Event.objects.with_viewer_state(self.gamer).order_by("pk")
+        self.assertSameAsSerializer(EventSerializer, events)
+        self.assertSameAsSerializer(EventSerializer, events, expand={})
+        self.assertSameAsSerializer(
+            EventSerializer, events, fields=["id", "game", "attendees"], expand={"game": {"gamer": None}}
+        )
+
+    def test_games(self):
+        """
+        Ensure games read from .values() rows match GameSerializer byte for byte.
+        """
+        games = Game.objects.order_by("pk")
+        self.assertSameAsSerializer(GameSerializer, games)
+        self.assertSameAsSerializer(GameSerializer, games, fields=["id", "title", "gamer"], expand={})
@@ -0,0 +1,247 @@
+import io
+import json
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from levelupapi.models import Event, Game, GameType, Gamer
+from levelupreports import leaderboard
+from levelupreports.models import GamerScore, UserGame
+from levelupreports.views.helpers import group_by_gamer
+from tests.helpers import clear_caches
+
+class ReportTests(SimpleTestCase):
+    def test_group_by_gamer(self):
+        """
+        Ensure flat report rows ordered by gamer are nested under their gamer.
+        """
+
+        # Define rows for two gamers, ordered by gamer
+        rows = [
+            {"gamer_id": 1, "full_name": "Admina Straytor", "id": 6},
+            {"gamer_id": 2, "full_name": "Molly Ringwald", "id": 5},
+            {"gamer_id": 2, "full_name": "Molly Ringwald", "id": 7},
+        ]
+
+        grouped = group_by_gamer(iter(rows), "games", lambda row: row["id"])
+
+        # Assert that each gamer appears once with all of their items
+        self.assertEqual(list(grouped), [
+            {"gamer_id": 1, "full_name": "Admina Straytor", "games": [6]},
+            {"gamer_id": 2, "full_name": "Molly Ringwald", "games": [5, 7]},
+        ])
+
+
+class ReportViewTests(TestCase):
+    def setUp(self):
+        """
+        Seed a gamer with a game and an event
+        """
+        clear_caches()
+
+        user = User.objects.create_user(
+            username="molly", password="Admin8*", first_name="Molly", last_name="Ringwald"
+        )
+        self.gamer = Gamer.objects.create(user=user, bio="Here to play")
+        gamer = self.gamer
+        game_type = GameType.objects.create(label="Board Game")
+        self.game = game = Game.objects.create(
+            title="Fortress America", maker="Milton Bradley", number_of_players=4,
+            skill_level=3, game_type=game_type, gamer=gamer
+        )
+        Event.objects.create(
+            game=game, description="fun game night with friends", date="2020-12-23",
+            time="19:00", organizer=gamer
+        )
+
+    def test_user_events_report(self):
+        """
+        Ensure the events by user report streams each gamer's events.
+        """
+
+        response = self.client.get('/reports/userevents')
+
+        # Assert that the report is streamed and lists the event under its organizer
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content).decode()
+        self.assertIn("<h2>Molly Ringwald</h2>", content)
+        self.assertIn("fun game night with friends", content)
+        self.assertTrue(content.rstrip().endswith("</html>"))
+
+    def test_user_games_report(self):
+        """
+        Ensure the games by user report streams each gamer's games.
+        """
+
+        response = self.client.get('/reports/usergames')
+
+        # Assert that the report is streamed and lists the game under its owner
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content).decode()
+        self.assertIn("<h2>Molly Ringwald</h2>", content)
+        self.assertIn("Title: Fortress America", content)
+
+    def test_user_events_export_formats(self):
+        """
+        Ensure the events by user report can be downloaded as JSON, NDJSON and CSV.
+        """
+
+        # Ask for JSON with the format query parameter
+        response = self.client.get('/reports/userevents?format=json')
+        self.assertEqual(response['Content-Type'], 'application/json')
+        rows = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(rows[0]["full_name"], "Molly Ringwald")
+        self.assertEqual(rows[0]["game_name"], "Fortress America")
+
+        # Ask for NDJSON through the Accept header
+        response = self.client.get(
+            '/reports/userevents', HTTP_ACCEPT='application/x-ndjson, text/html;q=0.5'
+        )
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0])["description"], "fun game night with friends")
+
+        # Ask for CSV and check the header row
+        response = self.client.get('/reports/userevents', HTTP_ACCEPT='text/csv')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(
+            lines[0], "id,game_name,description,date,time,gamer_id,full_name"
+        )
+        self.assertEqual(len(lines), 2)
+
+    def test_reports_vary_on_accept(self):
+        """
+        Ensure caches keep the formats of a report apart, since Accept picks the format.
+        """
+        for url in ['/reports/userevents', '/reports/usergames', '/reports/leaderboard']:
+            for accept in ['text/html', 'text/csv', 'application/json']:
+                response = self.client.get(url, HTTP_ACCEPT=accept)
+                b''.join(response.streaming_content)
+                self.assertIn('Accept', response['Vary'], (url, accept))
+
+    def test_report_tables_follow_writes(self):
+        """
+        Ensure the report tables change with the games, events and users they copy.
+        """
+
+        # Rename the gamer's user and the game
+        self.gamer.user.first_name = "Mollie"
+        self.gamer.user.save()
+        self.game.title = "Risk"
+        self.game.save()
+
+        response = self.client.get('/reports/userevents?format=json')
+        rows = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(rows[0]["full_name"], "Mollie Ringwald")
+        self.assertEqual(rows[0]["game_name"], "Risk")
+
+        # Deleting the game takes its events out of both reports
+        self.game.delete()
+        response = self.client.get('/reports/usergames?format=json')
+        self.assertEqual(json.loads(b''.join(response.streaming_content)), [])
+
+    def test_rebuild_reports(self):
+        """
+        Ensure the rebuild command restores report rows that went missing.
+        """
+
+        UserGame.objects.all().delete()
+        call_command('rebuild_reports', stdout=io.StringIO())
+
+        response = self.client.get('/reports/usergames?format=json')
+        rows = json.loads(b''.join(response.streaming_content))
+        self.assertEqual([row["title"] for row in rows], ["Fortress America"])
+
+
+class LeaderboardTests(TestCase):
+    def setUp(self):
+        """
+        Seed three gamers with games, events and sign ups between them
+        """
+        clear_caches()
+
+        self.molly, self.steve, self.admina = [
+            Gamer.objects.create(
+                user=User.objects.create_user(username=first.lower(), first_name=first, last_name=last),
+                bio="Here to play"
+            )
+            for first, last in [("Molly", "Ringwald"), ("Steve", "Brownlee"), ("Admina", "Straytor")]
+        ]
+        game_type = GameType.objects.create(label="Board Game")
+        self.game = Game.objects.create(
+            title="Fortress America", maker="Milton Bradley", number_of_players=4,
+            skill_level=3, game_type=game_type, gamer=self.molly
+        )
+        self.sorry = Game.objects.create(
+            title="Sorry", maker="Hasbro", number_of_players=4, skill_level=1,
+            game_type=game_type, gamer=self.steve
+        )
+        self.event = Event.objects.create(
+            game=self.game, description="Game night", date="2020-12-23", time="19:00",
+            organizer=self.molly
+        )
+        self.event.attendees.add(self.steve, self.admina)
+
+    def rows(self, query=''):
+        response = self.client.get(f'/reports/leaderboard?format=json{query}')
+        return json.loads(b''.join(response.streaming_content))
+
+    def test_leaderboard(self):
+        """
+        Ensure gamers are ranked by score, or any count, with ties sharing a rank.
+        """
+
+        # Molly owns a game and organizes an event; Steve owns a game and attends
+        self.assertEqual(self.rows()[0], {
+            "gamer_id": self.molly.id, "full_name": "Molly Ringwald", "games_owned": 1,
+            "events_organized": 1, "events_attended": 0, "score": 4, "rank": 1,
+        })
+        self.assertEqual(
+            [(row["gamer_id"], row["score"], row["rank"]) for row in self.rows()],
+            [(self.molly.id, 4, 1), (self.steve.id, 3, 2), (self.admina.id, 2, 3)]
+        )
+        self.assertEqual(
+            [(row["gamer_id"], row["rank"]) for row in self.rows('&by=events_attended&limit=2')],
+            [(self.steve.id, 1), (self.admina.id, 1)]
+        )
+
+        # A gamer's rank is looked up on its own
+        response = self.client.get(f'/reports/leaderboard/{self.admina.id}?by=games_owned')
+        self.assertEqual(response.json()["rank"], 3)
+        response = self.client.get('/reports/leaderboard/999')
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get('/reports/leaderboard?by=password')
+        self.assertEqual(response.status_code, 400)
+
+        # The page lists the gamers in order
+        response = self.client.get('/reports/leaderboard')
+        page = b''.join(response.streaming_content).decode()
+        self.assertLess(page.index("1. Molly Ringwald"), page.index("2. Steve Brownlee"))
+
+    def test_leaderboard_follows_writes(self):
+        """
+        Ensure the scores change with every kind of write, as a recount would have them.
+        """
+
+        def scores():
+            return list(GamerScore.objects.order_by('gamer_id').values())
+
+        self.event.attendees.remove(self.admina)
+        self.steve.attending.add(
+            Event.objects.create(
+                game=self.sorry, description="Rematch", date="2020-12-30", time="19:00",
+                organizer=self.admina
+            )
+        )
+        self.game.delete()
+        self.admina.user.first_name = "Ada"
+        self.admina.user.save()
+
+        incremental = scores()
+        leaderboard.rebuild()
+        self.assertEqual(incremental, scores())
+        self.assertEqual(
+            [(row["gamer_id"], row["score"]) for row in self.rows()],
+            [(self.steve.id, 3), (self.admina.id, 3), (self.molly.id, 0)]
+        )
+        self.assertEqual(self.rows()[1]["full_name"], "Ada Straytor")
@@ -0,0 +1,138 @@
+import io
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from levelupapi import search
+from levelupapi.models import Event, Game, GameType, Gamer
+from tests.helpers import clear_caches
+
+
+class SearchTests(APITestCase):
+    def setUp(self):
+        """
+        Seed a gamer with a few games and an event to search for
+        """
+        clear_caches()
+
+        self.gamer = Gamer.objects.create(
+            user=User.objects.create_user(username="steve", password="Admin8*"), bio="Gamez"
+        )
+        token = Token.objects.create(user=self.gamer.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+        game_type = GameType.objects.create(label="Board Game")
+        self.fortress = self.create_game(game_type, "Fortress America", "Milton Bradley")
+        self.ticket = self.create_game(game_type, "Ticket to Ride", "Days of Wonder")
+        self.days = self.create_game(game_type, "Days of Wonder Anniversary", "Unknown")
+        self.event = Event.objects.create(
+            game=self.fortress, description="Fortress night at Steve's", date="2022-02-01",
+            time="19:00", organizer=self.gamer
+        )
+
+    def create_game(self, game_type, title, maker):
+        return Game.objects.create(
+            title=title, maker=maker, number_of_players=4, skill_level=3,
+            game_type=game_type, gamer=self.gamer
+        )
+
+    def hits(self, query):
+        response = self.client.get('/search', {'q': query} if isinstance(query, str) else query)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [(hit['type'], hit['id']) for hit in response.data]
+
+    def test_search(self):
+        """
+        Ensure games and events are found by word prefixes, best match first
+        """
+        self.assertCountEqual(
+            self.hits('fort'), [('game', self.fortress.id), ('event', self.event.id)]
+        )
+        self.assertEqual(self.hits('fort am'), [('game', self.fortress.id)])
+        self.assertEqual(self.hits('MILT'), [('game', self.fortress.id)])
+        self.assertEqual(self.hits({'q': 'fort', 'type': 'events'}), [('event', self.event.id)])
+        self.assertEqual(self.hits('chess'), [])
+
+        response = self.client.get('/search', {'q': 'fortress night'})
+        self.assertEqual(response.data, [{
+            'type': 'event', 'id': self.event.id, 'description': "Fortress night at Steve's",
+            'date': '2022-02-01', 'time': '19:00:00', 'game': self.fortress.id,
+        }])
+
+        for query in [{}, {'q': '!!'}, {'q': 'fort', 'type': 'gamers'}, {'q': 'fort', 'limit': 0}]:
+            response = self.client.get('/search', query)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_search_ranking(self):
+        """
+        Ensure title matches rank above matches on the maker alone
+        """
+        if not search.indexed():
+            self.skipTest(f'{connection.vendor} has no search index')
+
+        self.assertEqual(
+            self.hits('days wonder'), [('game', self.days.id), ('game', self.ticket.id)]
+        )
+        self.assertEqual(self.hits({'q': 'days', 'limit': 1}), [('game', self.days.id)])
+
+        # An old game that matches best outranks any number of newer events
+        catan = self.create_game(self.fortress.game_type, "Catan", "Kosmos")
+        Event.objects.bulk_create([
+            Event(game=catan, description=f"Catan night number {night} at the club",
+                  date="2022-03-01", time="19:00", organizer=self.gamer)
+            for night in range(1200)
+        ])
+        search.rebuild()
+        self.assertEqual(self.hits({'q': 'catan', 'limit': 1}), [('game', catan.id)])
+
+    def test_search_follows_changes(self):
+        """
+        Ensure creating, changing and deleting games and events update the results
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            self.fortress.title = "Axis and Allies"
+            self.fortress.save()
+        self.assertEqual(self.hits('axis'), [('game', self.fortress.id)])
+        self.assertEqual(self.hits('fort'), [('event', self.event.id)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/events/bulk', [{
+                "gameId": self.ticket.id, "description": "Ride night", "date": "2022-03-01",
+                "time": "20:00"
+            }], format='json')
+        self.assertEqual(self.hits('ride night'), [('event', response.data['created'][0])])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.put('/games/bulk', [{
+                "id": self.ticket.id, "title": "Ticket to Ride Europe", "maker": "Days of Wonder",
+                "numberOfPlayers": 5, "skillLevel": 3, "gameTypeId": self.ticket.game_type_id
+            }], format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.hits('europe'), [('game', self.ticket.id)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f'/events/{self.event.id}')
+        self.assertEqual(self.hits('fort'), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.fortress.delete()
+        self.assertEqual(self.hits('axis'), [])
+
+    def test_rebuild_search_index(self):
+        """
+        Ensure the rebuild command restores documents the index lost
+        """
+        if not search.indexed():
+            self.skipTest(f'{connection.vendor} has no search index')
+
+        search.remove(search.GAME, [self.fortress.id])
+        self.assertEqual(self.hits({'q': 'fort', 'type': 'games'}), [])
+
+        output = io.StringIO()
+        call_command('rebuild_search_index', stdout=output)
+        self.assertIn('Indexed 4', output.getvalue())
+        self.assertEqual(self.hits({'q': 'fort', 'type': 'games'}), [('game', self.fortress.id)])